@@ -1,9 +1,8 @@
-from collections import defaultdict
 from pathlib import Path
 
 import cv2
 import numpy as np
-from shapely.geometry import Polygon, Point
+from shapely.geometry import Polygon
 
 from ultralytics import YOLO
 from ultralytics.utils.files import increment_path
@@ -18,9 +17,10 @@ from multiprocessing import Manager
 
 import json
 from ultralytics import solutions
+from ultralytics.solutions.track_history import TrackHistory
 
-# 追蹤路線歷史
-track_history = defaultdict(list)
+# 追蹤路線歷史（每個追蹤 ID 最多保留 30 個座標點，超過 30 幀未出現的 ID 會被移除）
+track_history = TrackHistory(capacity=30, max_age=30)
 
 # Firebase 初始化
 cred = credentials.Certificate("code/firebase/parking-test_key.json")
@@ -59,22 +59,6 @@ def upload_firestore(parking_name, area_name, total_space, occupied_space, empty
     print(f"total_space={total_space}, occupied_space={occupied_space}, empty_space={empty_space}, max_empty_space={max_empty_space}, min_empty_space={min_empty_space}, assigned_space_id={assigned_space_id}")
     print(f"Data uploaded to {parking_name}/{area_name}.")
 
-# 取得空車位 ID
-def get_empty_space_ids(json_data, occupied_polygons):
-    empty_space_ids = []
-    for spot in json_data:
-        # 將座標轉換為多邊形（Polygon）物件
-        spot_polygon = Polygon(spot["points"])
-
-        # 根據實際情況調整緩衝區大小
-        buffer_size = 0.1
-
-        # spot_polygon.intersects(occupied_polygon) 判斷車位的多邊形是否與任何已被佔用的車位（occupied_polygons）發生相交
-        if not any(spot_polygon.buffer(buffer_size).intersects(occupied_polygon.buffer(buffer_size)) for occupied_polygon in occupied_polygons):
-            empty_space_ids.append(spot["id"])
-    
-    return empty_space_ids
-
 # 分配車位 ID
 def assign_parking_space(empty_space_ids):
     if empty_space_ids:
@@ -197,7 +181,9 @@ def process_video(
     frames_dir.mkdir(parents=True, exist_ok=True)
 
     # 初始化停車管理系統
-    management = solutions.ParkingManagement(weights, margin=1, occupied_region_color=(0, 0, 255), available_region_color=(0, 255, 0))
+    # enter_time/exit_time：車位狀態需持續多少秒才切換，避免單幀漏檢造成閃爍
+    # coverage_thresh：單一物件框覆蓋車位面積的比例達到此值才視為佔用
+    management = solutions.ParkingManagement(weights, margin=1, occupied_region_color=(0, 0, 255), available_region_color=(0, 255, 0), enter_time=1.0, exit_time=2.0, coverage_thresh=0.3)
 
     # 從JSON文件中提取車位的邊界框數據
     polygon_json_path = Path("./code/boxes_json") / f"{area_name}_id.json"
@@ -221,15 +207,12 @@ def process_video(
             track_ids = results[0].boxes.id.int().cpu().tolist()    # 偵測到的物件的唯一追蹤 ID
             clss = results[0].boxes.cls.cpu().tolist()  # 偵測到的物件的類別索引
 
-            # 將邊界框轉換為多邊形
-            # occupied_polygons = [Polygon([(box[0], box[1]), (box[2], box[1]), (box[2], box[3]), (box[0], box[3])]) for box in boxes]
-
-            # 更新空車位 IDs
-            # empty_space_ids = get_empty_space_ids(json_data, occupied_polygons)
-            # print(empty_space_ids)
-
             # 處理檢測結果並更新停車區域狀態，回傳已占用車位數量
-            management.process_data(json_data, frame, boxes, clss)
+            management.process_data(json_data, frame, boxes, clss, timestamp=vid_frame_count / fps)
+
+            # 車位狀態變化事件 (slot_id, old, new, timestamp)
+            for slot_id, old, new, timestamp in management.events:
+                print(f"{area_name} slot {slot_id}: {old} -> {new} at {timestamp:.2f}s")
 
             # 取出空車位、已被使用車位數量
             occupied_space = management.labels_dict['Occupancy']    # 已占用車位
@@ -243,26 +226,16 @@ def process_video(
 
             # annotator = Annotator(frame, line_width=line_thickness, example=str(names))
 
-            # 繪製物件的邊界框和標籤
-            for box, track_id, cls in zip(boxes, track_ids, clss):
-                # 計算邊界框中心點
-                bbox_center = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2  # Bbox 中心
-                
-                # 將當前邊界框中心的座標追加到追蹤歷史中
-                track = track_history[track_id]
-                track.append((float(bbox_center[0]), float(bbox_center[1])))
-
-                # 追蹤歷史中最多只保留最近的 30 個座標點
-                if len(track) > 30:
-                    track.pop(0)
-
-                # 在調用 np.hstack 之前確保 track_history[cls] 不為空
-                if track_history[cls]:
-                    # 將追蹤歷史中的座標轉換為繪製多邊形所需的格式
-                    points = np.hstack(track_history[cls]).astype(np.int32).reshape((-1, 1, 2))
+            # 將邊界框中心的座標追加到追蹤歷史中
+            track_history.update(track_ids, [((box[0] + box[2]) / 2, (box[1] + box[3]) / 2) for box in boxes])
 
-                    # 繪製追蹤線
-                    cv2.polylines(frame, [points], isClosed=False, color=colors(cls, True), thickness=track_thickness)
+            # 繪製物件的追蹤線
+            for track_id, cls in zip(track_ids, clss):
+                # 將追蹤歷史中的座標轉換為繪製多邊形所需的格式
+                points = track_history[track_id].astype(np.int32).reshape((-1, 1, 2))
+                cv2.polylines(frame, [points], isClosed=False, color=colors(cls, True), thickness=track_thickness)
+        else:
+            track_history.update([], [])  # 沒有追蹤物件時仍需累計幀數，以移除過期的追蹤 ID
 
         # 繪製計數區域，更新車位資訊
         for region in counting_regions:
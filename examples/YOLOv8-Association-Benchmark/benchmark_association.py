@@ -0,0 +1,79 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+from ultralytics.trackers.utils.matching import (
+    iou_distance,
+    linear_assignment,
+    sparse_iou_distance,
+    sparse_linear_assignment,
+)
+
+
+def run(sizes=(100, 1000, 5000), thresh=0.8, repeats=3, seed=0):
+    """
+    Time dense and sparse IoU association of random tracks and jittered detections at a constant crowd density.
+
+    The dense path is `iou_distance()` with `linear_assignment()`, used by BYTETracker and BOTSORT, and the sparse path
+    is `sparse_iou_distance()` with `sparse_linear_assignment()`, used by SoATracker above `sparse_size` pairs.
+
+    Args:
+        sizes (tuple): Numbers of tracks to benchmark, 90% of them get a detection.
+        thresh (float): Threshold for considering an assignment valid.
+        repeats (int): Runs per size, the fastest is reported.
+        seed (int): Random seed of the boxes.
+
+    Returns:
+        (List[dict]): Per size, 'objects', 'dense_ms', 'sparse_ms' and 'equal', whether both paths match the same pairs.
+    """
+    rng = np.random.default_rng(seed)
+    out = []
+    for n in sizes:
+        xy, wh = rng.uniform(0, 1000 * (n / 300) ** 0.5, (n, 2)), rng.uniform(10, 60, (n, 2))  # 300 per 1000x1000
+        a = np.c_[xy, xy + wh].astype(np.float32)
+        b = (a + rng.normal(0, 5, a.shape))[rng.random(n) > 0.1].astype(np.float32)
+        dense, sparse = [], []
+        for _ in range(repeats):
+            t0 = perf_counter()
+            m1 = linear_assignment(iou_distance(list(a), list(b)), thresh=thresh)[0]
+            t1 = perf_counter()
+            i, j, cost = sparse_iou_distance(a, b)
+            m2 = sparse_linear_assignment(i, j, cost, (len(a), len(b)), thresh=thresh)[0]
+            t2 = perf_counter()
+            dense.append(t1 - t0)
+            sparse.append(t2 - t1)
+        out.append(
+            {
+                "objects": n,
+                "dense_ms": min(dense) * 1e3,
+                "sparse_ms": min(sparse) * 1e3,
+                "equal": np.array_equal(m1, m2),
+            }
+        )
+    print(f"{'objects':>10}{'dense (ms)':>14}{'sparse (ms)':>14}{'equal':>8}")
+    for r in out:
+        print(f"{r['objects']:>10}{r['dense_ms']:>14.1f}{r['sparse_ms']:>14.1f}{str(r['equal']):>8}")
+    return out
+
+
+def parse_opt():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000], help="numbers of tracks")
+    parser.add_argument("--thresh", type=float, default=0.8, help="maximum IoU cost of a match")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per size, the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the boxes")
+    return parser.parse_args()
+
+
+def main(opt):
+    """Main function."""
+    run(**vars(opt))
+
+
+if __name__ == "__main__":
+    opt = parse_opt()
+    main(opt)
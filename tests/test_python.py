@@ -1,6 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import contextlib
+import importlib
 from copy import copy
 from pathlib import Path
 
@@ -24,6 +25,7 @@ from ultralytics.utils import (
     WINDOWS,
     Retry,
     checks,
+    ops,
 )
 from ultralytics.utils.downloads import download, is_url
 from ultralytics.utils.torch_utils import TORCH_1_9
@@ -128,6 +130,35 @@ def test_predict_grey_and_4ch():
         f.unlink()  # cleanup
 
 
+def test_predict_pipeline():
+    """Test that pipelined prediction with 'pipeline=True' matches sequential prediction in order and results."""
+    model = YOLO(MODEL)
+    sources = [SOURCE, ASSETS / "zidane.jpg"] * 2
+    results = model(sources, imgsz=32)
+    results_pipeline = model(sources, imgsz=32, pipeline=True)
+    assert [r.path for r in results] == [r.path for r in results_pipeline]
+    for r, rp in zip(results, results_pipeline):
+        assert torch.allclose(r.boxes.data, rp.boxes.data)
+        assert set(rp.speed) == {"preprocess", "inference", "postprocess"}
+    for _ in model(sources, imgsz=32, pipeline=True, stream=True):
+        break  # stopping early must not hang the pipeline threads
+
+
+def test_predict_fused_preprocess():
+    """Test that batched tensor letterboxing with 'fused_preprocess=True' matches the per-image LetterBox path."""
+    from ultralytics.data.augment import LetterBox
+
+    ims = [cv2.imread(str(SOURCE)), cv2.imread(str(ASSETS / "zidane.jpg"))]
+    for batch, auto in ((ims, False), (ims[:1] * 2, True)):
+        ref = np.stack([LetterBox(64, auto=auto)(image=x) for x in batch])[..., ::-1].transpose(0, 3, 1, 2) / 255
+        im = ops.letterbox_batch(batch, 64, auto=auto)
+        assert im.shape == ref.shape
+        assert np.abs(im.numpy() - ref).max() < 2 / 255
+    model = YOLO(MODEL)
+    results = model(ims, imgsz=64, fused_preprocess=True)
+    assert [r.orig_shape for r in results] == [x.shape[:2] for x in ims]
+
+
 @pytest.mark.slow
 @pytest.mark.skipif(not ONLINE, reason="environment is offline")
 @pytest.mark.skipif(not is_url("https://youtu.be/G17sBkb38XQ"), reason="YouTube URL issue")
@@ -153,6 +184,7 @@ def test_track_stream():
     video_url = "https://ultralytics.com/assets/decelera_portrait_min.mov"
     model = YOLO(MODEL)
     model.track(video_url, imgsz=160, tracker="bytetrack.yaml")
+    model.track(video_url, imgsz=160, tracker="bytetrack_soa.yaml")
     model.track(video_url, imgsz=160, tracker="botsort.yaml", save_frames=True)  # test frame saving also
 
     # Test Global Motion Compensation (GMC) methods
@@ -166,6 +198,680 @@ def test_track_stream():
         model.track(video_url, imgsz=160, tracker=tracker)
 
 
+def test_track_soa():
+    """Test that SoATracker returns the same tracks as BYTETracker, and one SoATracker per stream when batched."""
+    from types import SimpleNamespace
+
+    from ultralytics.trackers import BYTETracker, SoATracker
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+
+    def scene(seed, n=40):
+        """Detections of n objects moving at constant velocity over 40 frames."""
+        rng = np.random.default_rng(seed)
+        pos, vel, wh = rng.uniform(0, 640, (n, 2)), rng.normal(0, 3, (n, 2)), rng.uniform(10, 40, (n, 2))
+        frames = []
+        for _ in range(40):
+            pos += vel
+            keep = rng.random(n) > 0.15  # random missed detections
+            xywh = np.c_[pos + rng.normal(0, 1, pos.shape), wh][keep].astype(np.float32)
+            conf = rng.uniform(0.05, 1.0, len(xywh)).astype(np.float32)
+            frames.append(SimpleNamespace(xywh=xywh, conf=conf, cls=np.zeros(len(xywh), dtype=np.float32)))
+        return frames
+
+    args = IterableSimpleNamespace(**yaml_load(ROOT / "cfg/trackers/bytetrack.yaml"))
+    frames = scene(0)
+    results = []
+    for tracker_class in BYTETracker, SoATracker:  # create in turn, as both reset the shared track ID counter
+        tracker = tracker_class(args)
+        results.append([tracker.update(f).reshape(-1, 8) for f in frames])
+    assert all(np.allclose(a, b, atol=1e-3) for a, b in zip(*results))
+
+    streams = [scene(i, n=20) for i in range(3)]
+    trackers = [SoATracker(args) for _ in streams]
+    single = [[tracker.update(f) for tracker, f in zip(trackers, x)] for x in zip(*streams)]
+    tracker = SoATracker(args, streams=3)
+    batched = [tracker.update_batch(x) for x in zip(*streams)]
+    assert all(np.allclose(a, b, atol=1e-3) for x, y in zip(single, batched) for a, b in zip(x, y))
+
+
+def test_sparse_assignment():
+    """Test that sparse IoU association on overlapping pairs matches dense linear assignment."""
+    import runpy
+
+    from ultralytics.trackers.utils import matching
+    from ultralytics.utils.metrics import bbox_ioa
+
+    rng = np.random.default_rng(0)
+    xy, wh = rng.uniform(0, 1000, (300, 2)), rng.uniform(10, 60, (300, 2))
+    a = np.c_[xy, xy + wh].astype(np.float32)
+    b = (a + rng.normal(0, 5, a.shape))[rng.random(300) > 0.1].astype(np.float32)
+    i, j, cost = matching.sparse_iou_distance(a, b)
+    dense = 1 - bbox_ioa(a, b, iou=True)
+    assert np.allclose(dense[i, j], cost) and np.all(np.delete(dense.ravel(), i * len(b) + j) == 1)
+    m1, ua1, ub1 = matching.linear_assignment(dense, thresh=0.8)
+    m2, ua2, ub2 = matching.sparse_linear_assignment(i, j, cost, dense.shape, thresh=0.8)
+    assert np.array_equal(m1, m2) and np.array_equal(ua1, ua2) and np.array_equal(ub1, ub2)
+
+    benchmark = runpy.run_path(str(ROOT.parent / "examples/YOLOv8-Association-Benchmark/benchmark_association.py"))
+    assert [r["objects"] for r in benchmark["run"]((50, 200), repeats=1) if r["equal"]] == [50, 200]
+
+
+def test_gmc_adaptive():
+    """Test that adaptive GMC follows a panning camera between estimates and skips estimation for a static one."""
+    import cv2
+
+    from ultralytics.trackers.utils.gmc import GMC
+
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (600, 900, 3), dtype=np.uint8), (7, 7), 2)
+    for pan, kwargs in ((3, {"interval": 3}), (0, {"static": 5})):
+        gmc = GMC("orb", mask=True, regions=[[0, 0, 100, 30]], **kwargs)
+        frames = [background[50:410, 50 + pan * f : 690 + pan * f] for f in range(30)]
+        shift = np.array([gmc.apply(im, np.array([[320.0, 180, 50, 50]]))[0, 2] for im in frames])
+        assert abs(shift.sum() + pan * 29) < 2 and np.allclose(shift[4:], -pan, atol=0.5)  # catches up after 3 frames
+        assert gmc.estimates == 10 and gmc.calls == 30 and gmc.profile.t > 0
+
+
+def test_gmc_default():
+    """Test that ECC and sparse optical flow with the default options measure a known camera pan on every frame."""
+    import cv2
+
+    from ultralytics.trackers.utils.gmc import GMC
+
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (600, 900, 3), dtype=np.uint8), (7, 7), 2)
+    frames = [background[50 + 2 * f : 290 + 2 * f, 50 + 3 * f : 370 + 3 * f] for f in range(3)]  # pan (3, 2) px
+    for method in "sparseOptFlow", "ecc":
+        gmc = GMC(method)
+        H = np.array([gmc.apply(im) for im in frames])
+        assert np.array_equal(H[0], np.eye(2, 3)), method  # no previous frame
+        assert np.allclose(H[1:, :, :2], np.eye(2), atol=0.01) and np.allclose(H[1:, :, 2], [-3, -2], atol=0.1), method
+        assert gmc.estimates == gmc.calls == 3, method
+
+
+def test_botsort_reid(tmp_path):
+    """Test BoT-SORT appearance matching with neck feature embeddings kept in an array-backed feature store."""
+    from types import SimpleNamespace
+
+    from ultralytics.trackers.bot_sort import BOTSORT
+    from ultralytics.trackers.utils.reid import FeatureStore, NeckEmbedder
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+
+    store = FeatureStore(history=3, rows=2)
+    rows = store.add(np.eye(4)[:3])  # grows to 4 rows
+    for k in range(4):
+        store.update(rows[:1], np.eye(4)[k : k + 1])
+    assert len(store.lengths) == 4 and store[rows[0]].argmax(1).tolist() == [1, 2, 3]  # oldest first
+    store.retain(rows[1:2])
+    assert sorted(store.add(np.ones((3, 4)))) == sorted({0, 1, 2, 3} - {rows[1]})  # freed rows are reused
+
+    model = YOLO(MODEL)
+    embedder = NeckEmbedder(model.model.model[-1])
+    boxes = np.array([[50.0, 400, 250, 900], [660, 380, 810, 880], [0, 230, 800, 760]])
+    model(SOURCE, imgsz=320)
+    feats = embedder.embed(0, boxes, (1080, 810))
+    assert feats.shape[0] == 3 and np.allclose(np.linalg.norm(feats, axis=1), 1, atol=1e-5)
+    assert np.allclose(embedder.inference(None, np.array([[0, 0, 1, 1, 0.9, 0, 2]])), feats[2:])
+    embedder.remove()
+
+    cfg = yaml_load(ROOT / "cfg/trackers/botsort.yaml")
+    cfg.update(with_reid=True, gmc_method="none")
+    tracker = BOTSORT(IterableSimpleNamespace(**cfg))
+    tracker.encoder = embedder
+    dets = SimpleNamespace(xywh=np.array([[150.0, 150, 100, 100], [450, 150, 100, 100]]), conf=np.array([0.9, 0.9]))
+    dets.cls = np.zeros(2)
+    ids = []
+    for f in range(5):  # two still objects swapping their appearance keep their IDs, as IoU gates appearance
+        embedder.features = np.eye(2, 8, dtype=np.float32)[[f % 2, 1 - f % 2]]
+        ids.append(tracker.update(dets)[:, 4].tolist())
+    assert ids[1:] == [ids[1]] * 4 and sorted(tracker.feature_store.lengths[:2]) == [5, 5]
+
+    file = tmp_path / "botsort_reid.yaml"
+    file.write_text(yaml.safe_dump(cfg))
+    model.track(SOURCE, imgsz=320, tracker=str(file))
+    assert model.predictor.trackers[0].encoder is model.predictor.embedder is not None
+
+
+def test_parking_occupancy():
+    """Test that the slot-ID mask marks the slots containing box centres as occupied."""
+    from ultralytics.solutions.parking_management import ParkingOccupancy
+
+    regions = [{"points": [[0, 0], [100, 0], [100, 100], [0, 100]]}, {"points": [[100, 0], [200, 0], [150, 100]]}]
+    occupancy = ParkingOccupancy(regions)
+    boxes = np.array([[20.0, 20, 60, 60], [130, 10, 170, 30], [300, 300, 320, 320]])  # slot 0, slot 1, outside
+    assert occupancy(boxes, (480, 640, 3)).tolist() == [True, True]
+    assert occupancy(boxes[[0, 2]], (480, 640, 3)).tolist() == [True, False]
+    assert occupancy(np.zeros((0, 4)), (240, 320)).tolist() == [False, False] and occupancy.mask.shape == (240, 320)
+
+
+def test_slot_state_machine():
+    """Test that slot hysteresis needs persistent observations to flip a slot and reports only the changes."""
+    from ultralytics.solutions.parking_management import SlotStateMachine
+
+    slots = SlotStateMachine(["a", "b"], enter=2, exit=3, exit_time=1.0)
+    assert slots.update([False, True], timestamp=0) == [("a", None, False, 0.0), ("b", None, True, 0.0)]
+    assert slots.update([True, False], timestamp=1) == []  # spurious detection and first missed detection
+    assert slots.update([False, False], timestamp=2) == []  # 'a' streak broken
+    assert slots.update([True, False], timestamp=3) == [("b", True, False, 3.0)]  # 3 frames over 2 seconds
+    assert slots.update([True, False], timestamp=4) == [("a", False, True, 4.0)]
+    assert all(slots.update([False, False], timestamp=t) == [] for t in (4.1, 4.2, 4.3))  # 3 frames in 0.2 seconds
+    assert slots.update([False, False], timestamp=5.1) == [("a", True, False, 5.1)]
+    assert slots.state.tolist() == [False, False]
+
+
+def test_parking_coverage():
+    """Test that slot coverage from summed-area tables matches exact box-slot overlap fractions."""
+    from ultralytics.solutions.parking_management import ParkingOccupancy
+
+    regions = [
+        {"points": [[0, 0], [100, 0], [100, 100], [0, 100]], "id": 7},
+        {"points": [[200, 0], [300, 0], [300, 50]]},
+    ]
+    occupancy = ParkingOccupancy(regions, coverage_thresh=0.4, stride=2)
+    boxes = np.array([[0.0, 0, 50, 100], [50, 50, 250, 100], [200, 0, 300, 50]])
+    expected = [[0.5, 0.25, 0], [0, 0, 1]]  # slot 1 is a triangle fully inside the third box
+    assert np.allclose(occupancy.coverage(boxes), expected, atol=0.05)
+    assert occupancy(boxes[:2], None).tolist() == [True, False]
+    assert occupancy(boxes[1:2], None).tolist() == [False, False]  # 25% of slot 0 is below the threshold
+
+
+def test_heatmap_accumulation():
+    """Test that cached stamps and lazy decay accumulate the same heatmap as decaying and drawing every frame."""
+    from ultralytics.engine.results import Results
+    from ultralytics.solutions import Heatmap
+
+    im = np.zeros((120, 160, 3), dtype=np.uint8)
+    heatmap = Heatmap({0: "person"}, decay_factor=0.5, view_img=False)
+    reference = np.zeros(im.shape[:2], dtype=np.float32)
+    y, x = np.ogrid[:120, :160]
+    for f in range(30):  # lazy decay renormalizes after 14 frames
+        boxes = np.array([[10 + 3 * f, 20, 50 + 3 * f, 70, 1, 0.9, 0], [100, 80 - f, 130, 100 - f, 2, 0.8, 0]])
+        heatmap.generate_heatmap(im.copy(), [Results(im, "", {0: "person"}, boxes=torch.tensor(boxes))], render=False)
+        reference *= 0.5
+        for x1, y1, x2, y2 in boxes[:, :4].astype(int):
+            cx, cy, r = (x1 + x2) // 2, (y1 + y2) // 2, min(x2 - x1, y2 - y1) // 2
+            circle = (x - cx) ** 2 + (y - cy) ** 2 <= r**2
+            reference[y1:y2, x1:x2] += 2 * circle[y1:y2, x1:x2]
+    assert np.allclose(heatmap.heatmap * heatmap.decay, reference, rtol=1e-4, atol=1e-6)
+    assert (
+        heatmap.generate_heatmap(im.copy(), [Results(im, "", {0: "person"}, boxes=torch.zeros(0, 7))]).shape == im.shape
+    )
+
+
+def test_counting_engine():
+    """Test that the headless counting engine counts tracks crossing a line or entering a polygon once."""
+    from ultralytics.solutions.object_counter import CountingEngine
+
+    def boxes(centres):
+        """Boxes of size 10 around the given centres."""
+        c = np.array(centres, dtype=np.float64)
+        return np.concatenate((c - 5, c + 5), 1)
+
+    line = CountingEngine([(0, 50), (100, 50)], line_dist_thresh=15)
+    frames = [[(20, 20), (80, 20), (20, 0), (50, 20)], [(30, 80), (90, 80), (20, 5), (50, 40)], [(30, 20), (90, 20)]]
+    deltas = [line.update(boxes(c), [1, 2, 3, 4][: len(c)], [0, 1, 0, 1][: len(c)]) for c in frames]
+    assert [d["counted"] for d in deltas] == [[], [(1, 0, "IN"), (2, 1, "OUT"), (4, 1, "OUT")], []]  # 4 near the line
+    assert (line.in_counts, line.out_counts, dict(line.class_counts)) == (1, 2, {0: [1, 0], 1: [0, 2]})
+
+    square = [(0, 0), (100, 0), (100, 100), (0, 100)]
+    assert CountingEngine(square).inside(np.array([[50.0, 50], [150, 50], [-1, 50]])).tolist() == [True, False, False]
+    polygon = CountingEngine(square)
+    deltas = [polygon.update(boxes(c), [1, 2], [0, 0]) for c in [[(150, 50), (150, 150)], [(60, 50), (150, 140)]]]
+    assert deltas[1]["counted"] == [(1, 0, "IN")] and polygon.counted == {1}
+
+
+def test_track_history():
+    """Test the ring buffer, growth, eviction and last/velocity reads of the shared track history."""
+    from ultralytics.solutions.track_history import TrackHistory
+
+    history = TrackHistory(capacity=3, max_age=2, rows=1)
+    for f in range(4):  # 4 positions of track 1 wrap the ring, track 2 only joins on the last frame
+        assert history.update([1, 2][: 1 + f // 3], [[f, 2 * f], [100, 100]][: 1 + f // 3], timestamp=f / 2) == []
+    assert len(history) == 2 and len(history.lengths) == 2  # grown to 2 rows
+    assert history[1].tolist() == [[1, 2], [2, 4], [3, 6]] and history[3].shape == (0, 2)
+    ids, points, times = history.last(2, [2, 1, 3])
+    assert ids.tolist() == [2, 1, 3] and np.isnan(points[0, 0]).all() and np.isnan(points[2]).all()
+    assert points[1].tolist() == [[2, 4], [3, 6]] and times[1].tolist() == [1.0, 1.5]
+    ids, v = history.velocity(2)
+    assert ids.tolist() == [1, 2] and v[0].tolist() == [2, 4] and np.isnan(v[1]).all()  # per second, half-second frames
+    assert history.update([2], [[100, 100]]) == [] and history.update([2], [[100, 100]]) == []
+    assert history.update([2], [[100, 100]]) == [1] and 1 not in history  # unseen for 3 > max_age frames
+    history.update([5], [[0, 0]])
+    assert history.rows[5] == 0 and history[5].tolist() == [[0, 0]]  # row of the evicted track reused and reset
+
+
+def test_counting_refound_track():
+    """Test that a track re-found by the tracker after its longest gap keeps its counted ID."""
+    from ultralytics.solutions.object_counter import CountingEngine
+    from ultralytics.solutions.track_history import tracker_max_age
+    from ultralytics.trackers import BYTETracker
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml("bytetrack.yaml")))
+    assert tracker_max_age("bytetrack.yaml", 15) == BYTETracker(cfg, frame_rate=15).max_time_lost + 1
+
+    counter = CountingEngine([(0, 50), (100, 50)])
+    crossing = [np.array([[15.0, 15, 25, 25]]), np.array([[25.0, 55, 35, 65]])]  # moving down and towards the centre
+    for boxes in crossing:
+        counter.update(boxes, [1], [0])
+    for _ in range(tracker_max_age()):  # lost for as long as the default tracker can still re-find it
+        counter.update(np.zeros((0, 4)), [], [])
+    for boxes in crossing:
+        counter.update(boxes, [1], [0])
+    assert counter.counted == {1} and (counter.in_counts, counter.out_counts) == (1, 0)
+
+
+def test_speed_estimator():
+    """Test that speeds are measured once from source time when tracks reach the speed line."""
+    from ultralytics.solutions import SpeedEstimator
+
+    speed = SpeedEstimator({0: "car"}, reg_pts=[(0, 100), (200, 100)], fps=10, speed_window=2, meter_per_pixel=0.5)
+    ids = [1, 2, 3]
+    for f in range(4):  # tracks 1 and 2 move down 10 px per frame, track 3 stays far from the line
+        speed.update_track_history(ids, [[50, 70 + 10 * f], [300, 70 + 10 * f], [50, 0]], timestamp=f / 10)
+        speeds = speed.calculate_speeds(ids)
+    assert np.allclose(speeds[0], 10 * 10 * 0.5 * 3.6) and np.isnan(speeds[1:]).all()  # 2 is right of the line end
+    assert speed.dist_data == {1: speeds[0]}
+    speed.update_track_history([1], [[50, 120]], timestamp=0.5)  # 2.5x faster after the measurement
+    assert speed.calculate_speeds([1])[0] == speeds[0]
+
+    homography = np.diag([0.1, 0.1, 1.0])  # 10 px per metre
+    speed = SpeedEstimator({0: "car"}, reg_pts=[(0, 100), (200, 100)], homography=homography)
+    speed.update_track_history([1], [[50, 80]], timestamp=0.0)
+    speed.update_track_history([1], [[50, 95]], timestamp=0.5)
+    assert np.allclose(speed.calculate_speeds([1]), 1.5 / 0.5 * 3.6)
+
+
+def test_analytics_threaded():
+    """Test that threaded Analytics never blocks on a slow writer, skips the oldest charts and renders the last."""
+    import threading
+
+    from ultralytics.solutions import Analytics
+
+    class Writer:
+        """Video writer blocking until released."""
+
+        def __init__(self):
+            """Initialize the written frames and the release event."""
+            self.frames, self.release = [], threading.Event()
+
+        def write(self, im):
+            """Wait for the release and store the frame."""
+            self.release.wait(timeout=10)
+            self.frames.append(im)
+
+    writer = Writer()
+    analytics = Analytics("line", writer, im0_shape=(320, 240), threaded=True, max_points=16)
+    for f in range(20):  # returns although the first chart is stuck in the writer
+        analytics.update_line(f, f % 5)
+    assert not writer.frames and len(analytics.jobs) <= 8
+    writer.release.set()
+    analytics.close()
+    assert not analytics.thread.is_alive() and 8 <= len(writer.frames) <= 9  # at most one chart plus the 8 latest
+    assert writer.frames[-1].shape == (240, 320, 3)
+    x = [*range(0, 8, 2), *range(8, 20)]  # oldest half decimated when 16 points were reached
+    assert analytics.x_data[: analytics.n].tolist() == x and analytics.line.get_xdata().tolist() == x
+
+
+def test_analytics_close():
+    """Test that Analytics renders skipped and queued charts on close, on context exit and at interpreter exit."""
+    import subprocess
+    import sys
+
+    from ultralytics.solutions import Analytics
+
+    class Writer(list):
+        """Video writer storing the written frames."""
+
+        write = list.append
+
+    for threaded in False, True:
+        writer = Writer()
+        with Analytics("line", writer, im0_shape=(320, 240), render_interval=3, threaded=threaded) as analytics:
+            for f in range(10):
+                analytics.update_line(f, f)
+        assert len(writer) == 4 and analytics.line.get_xdata()[-1] == 9  # frames 2, 5, 8 and the skipped last one
+        assert not threaded or not analytics.thread.is_alive()
+
+    # An unclosed threaded instance still writes its queued charts at exit. Exit handlers run last in, first out, so
+    # the blocked writer is released before Analytics.close() runs
+    code = """
+import atexit, sys, threading
+from ultralytics.solutions import Analytics
+class Writer:
+    release = threading.Event()
+    def write(self, im):
+        self.release.wait(timeout=10)
+        print("frame", flush=True)
+analytics = Analytics("line", Writer(), im0_shape=(320, 240), threaded=True)
+atexit.register(Writer.release.set)
+for f in range(5):
+    analytics.update_line(f, f)
+"""
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT.parent)
+    assert out.stdout.split().count("frame") == 5, out.stderr
+
+
+def test_distance_proximity():
+    """Test that dense and KD-tree pairwise distances agree and proximity events fire once per close pair."""
+    from ultralytics.engine.results import Results
+    from ultralytics.solutions import DistanceCalculation
+
+    calculator = DistanceCalculation({0: "person"}, pixels_per_meter=10, proximity_thresh=5)
+    centroids = np.random.default_rng(0).uniform(0, 400, (100, 2))
+    d = np.linalg.norm(centroids[:, None] - centroids[None], axis=-1) / 10
+    expected = {(i, j): d[i, j] for i, j in zip(*np.triu_indices(100, k=1)) if d[i, j] <= 5}
+    for kdtree_min in (1000, 0):  # dense matrix and KD-tree
+        pairs, distances = calculator.pairwise_distances(centroids, kdtree_min=kdtree_min)
+        assert dict(zip(map(tuple, pairs.tolist()), distances.tolist())) == pytest.approx(expected)
+
+    im = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    def frame(x3):
+        """Tracks 1 and 2 30 px apart, track 3 at x=x3."""
+        boxes = [[0, 0, 20, 20, 2, 0.9, 0], [30, 0, 50, 20, 1, 0.9, 0], [x3, 0, x3 + 20, 20, 3, 0.9, 0]]
+        calculator.start_process(im.copy(), [Results(im, "", {0: "person"}, boxes=torch.tensor(boxes))])
+        return calculator.proximity_events
+
+    assert frame(200) == [(1, 2, 3.0)]
+    assert frame(80) == [(1, 3, 5.0)] and set(calculator.close_pairs) == {(1, 2), (1, 3)}  # pair (1, 2) stays close
+    assert frame(200) == [] and set(calculator.close_pairs) == {(1, 2)}
+    assert frame(70) == [(1, 3, 4.0)]
+
+
+def test_queue_engine():
+    """Test that the queue engine tracks queue membership, dwell times and waits of leaving and evicted tracks."""
+    from ultralytics.solutions.queue_management import QueueEngine
+    from ultralytics.solutions.track_history import TrackHistory
+
+    queues = [[(0, 0), (100, 0), (100, 100), (0, 100)], [(200, 0), (300, 0), (300, 100), (200, 100)]]
+    engine = QueueEngine(queues, history=TrackHistory(max_age=2))
+    out = engine.update([1, 2, 3], [[50, 50], [250, 50], [500, 500]], timestamp=0.0)
+    assert out["counts"].tolist() == [1, 1] and out["regions"].tolist() == [0, 1, -1]
+    out = engine.update([1, 2], [[250, 50], [260, 50]], timestamp=2.0)  # track 1 changes queue
+    assert out["counts"].tolist() == [0, 2] and out["dwell"].tolist() == [0, 2]
+    for t in (5.0, 6.0, 7.0):  # track 1 leaves its queue, track 2 is lost and evicted on the third frame
+        engine.update([1], [[500, 500]], timestamp=t)
+    assert [list(w) for w in engine.waits] == [[2], [3, 2]]  # track 2 waited until it was last seen
+    stats = engine.stats(q=(50,))
+    assert [(s["count"], s["served"], s["wait_mean"], s["wait_p50"]) for s in stats] == [(0, 1, 2, 2), (0, 2, 2.5, 2.5)]
+    assert engine.inside(np.array([[50.0, 50], [150, 50]])).tolist() == [[True, False], [False, False]]
+
+
+def test_predict_roi():
+    """Test region of interest inference runs on tiled crops around the polygons and returns full-frame Results."""
+    from ultralytics.engine.predictor import BasePredictor
+
+    roi = [[[50, 400], [300, 400], [300, 700], [50, 700]], [[310, 420], [400, 420], [400, 600]]]
+    polygons = BasePredictor.load_roi(roi)
+    windows = ops.roi_windows(polygons, (1080, 810), 320)
+    assert all(
+        0 <= x1 < x2 <= 810 and 0 <= y1 < y2 <= 1080 and max(x2 - x1, y2 - y1) <= 320 for x1, y1, x2, y2 in windows
+    )
+    for x, y in np.concatenate(polygons):  # every polygon point is covered
+        assert any(x1 <= x <= x2 and y1 <= y <= y2 for x1, y1, x2, y2 in windows)
+    model = YOLO(MODEL)
+    results = model(SOURCE, imgsz=320, roi=roi)
+    assert results[0].orig_shape == (1080, 810) and len(model.predictor.crops) == len(windows)
+
+
+def test_predict_tile():
+    """Test sliced inference batches overlapping tiles with the full image and fuses boxes cut by tile seams."""
+    windows = ops.tile_windows((0, 0, 810, 1080), 320, overlap=0.2)
+    assert len(windows) == 3 * 4 and all(x2 - x1 == 320 and y2 - y1 == 320 for x1, y1, x2, y2 in windows)
+    boxes = torch.tensor([[100.0, 10, 250, 60, 0.9, 2], [180, 12, 300, 58, 0.8, 2], [400, 10, 450, 60, 0.7, 2]])
+    fused = ops.fuse_boxes(boxes, torch.tensor([True, True, False]))
+    assert fused[:, :4].tolist() == [[100, 10, 300, 60], [400, 10, 450, 60]]
+    model = YOLO(MODEL)
+    results = model(SOURCE, imgsz=64, tile=320)
+    assert results[0].orig_shape == (1080, 810) and len(model.predictor.crops) == len(windows) + 1
+
+
+def test_predict_motion_gate():
+    """Test that 'motion_thresh' skips inference on unchanged frames and forces a refresh every 'motion_refresh'."""
+    model = YOLO(MODEL)
+    bus, zidane = cv2.imread(str(SOURCE)), cv2.imread(str(ASSETS / "zidane.jpg"))
+    results = [model(im, imgsz=32, motion_thresh=0.01, motion_refresh=3)[0] for im in [bus] * 6 + [zidane]]
+    assert model.predictor.motion_stats == {"frames": 7, "skipped": 4}  # frames 2-4 and 6 are skipped
+    assert all(torch.equal(r.boxes.data, results[0].boxes.data) for r in results[:6])
+    assert results[-1].orig_img is zidane and results[-1].speed["inference"] > 0
+    assert all(len(model.track(bus, imgsz=32, persist=True, motion_thresh=0.01)) for _ in range(3))
+
+    # Keyframes of two streams inferred in separate micro-batches are reused together only if their inputs stack
+    predictor, r = model.predictor, results[0]
+    predictor.args.motion_refresh, predictor._motion_skips = 100, 0
+    for k, shape in enumerate([(3, 32, 32), (3, 32, 24)]):
+        predictor.batch, predictor.batch_indices = ([f"{k}"], [bus], [""]), [k]
+        predictor.motion_gate([bus])
+        predictor.results = [r]
+        predictor._motion_keyframe(torch.zeros(1, *shape))
+    predictor.batch, predictor.batch_indices = (["0", "1"], [bus, bus], ["", ""]), [0, 1]
+    assert predictor.motion_gate([bus, bus]) is None  # different input shapes, infer again
+    predictor.results = [r, r]
+    predictor._motion_keyframe(torch.zeros(2, 3, 32, 32))
+    assert len(predictor.motion_gate([bus, bus])) == 2 and predictor._motion_im.shape == (2, 3, 32, 32)
+
+
+def test_track_motion_gate():
+    """Test that tracks age with the Kalman prediction, not the replayed detections, on motion-gated frames."""
+    from types import SimpleNamespace
+
+    from ultralytics.engine.results import Results
+    from ultralytics.trackers import track
+
+    def state(tracker):
+        """Frame ID, tracklet length and state of the only track of the last stream."""
+        if hasattr(tracker, "tracks"):  # SoATracker
+            t = tracker.tracks
+            return tracker.frame_ids[-1], t.tracklet_len[t.n - 1], t.state[t.n - 1]
+        x = tracker.tracked_stracks[0]
+        return tracker.frame_id, x.tracklet_len, x.state
+
+    im = np.zeros((240, 320, 3), dtype=np.uint8)
+    skip = [False] * 3 + [True] * 3 + [False]  # frames 3-5 replay the results of frame 2
+    for cfg, mode, bs in (
+        ("bytetrack.yaml", "image", 1),
+        ("botsort.yaml", "image", 1),
+        ("bytetrack_soa.yaml", "stream", 2),
+    ):
+        predictor = SimpleNamespace(args=SimpleNamespace(tracker=cfg, task="detect"), save_dir=TMP)
+        predictor.dataset = SimpleNamespace(mode=mode, bs=bs)
+        track.on_predict_start(predictor)
+        ids, x1, states = [], [], []
+        for f, skipped in enumerate(skip):
+            if not skipped:  # an object moving right by 5 pixels per frame, keyframe results are pre-tracking
+                box = torch.tensor([[100.0 + 5 * f, 100, 150 + 5 * f, 200, 0.9, 0]])
+                keyframe = [Results(im, path=f"{k}.jpg", names={0: "a"}, boxes=box) for k in range(bs)]
+            predictor.batch, predictor.motion_skipped = ([f"{k}.jpg" for k in range(bs)], [im] * bs, [""] * bs), skipped
+            predictor.results = [copy(r) for r in keyframe]
+            track.on_predict_postprocess_end(predictor)
+            assert all(r.boxes.is_track for r in predictor.results), cfg
+            ids.append([r.boxes.id.tolist() for r in predictor.results])
+            x1.append(predictor.results[-1].boxes.xyxy[0, 0].item())
+            states.append(state(predictor.trackers[-1]))
+        assert all(x == ids[0] for x in ids), cfg  # the same tracks are kept
+        assert [f for f, _, _ in states] == list(range(1, len(skip) + 1)), cfg  # skipped frames count
+        assert [n for _, n, _ in states] == [0, 1, 2, 2, 2, 2, 3], cfg  # but are not matched
+        assert all(s == 1 for _, _, s in states), cfg  # TrackState.Tracked
+        assert all(a < b for a, b in zip(x1, x1[1:])), (cfg, x1)  # boxes move on with the Kalman velocity
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+@pytest.mark.parametrize(
+    "decoder",
+    ["opencv"]
+    + [
+        pytest.param(x, marks=pytest.mark.skipif(not importlib.util.find_spec("av"), reason="PyAV is not installed"))
+        for x in ("pyav", "keyframes")
+    ],
+)
+def test_video_decoders(decoder):
+    """Test video decode backends return the same strided frames and count grabbed and retrieved frames."""
+    from ultralytics.data.loaders import new_decoder
+
+    video = TMP / "decoders.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+    dataset = load_inference_source(str(video), vid_stride=3, decoder=decoder)  # MJPG: all keyframes
+    frames = [im.mean() for _, ims, _ in dataset for im in ims]
+    assert list(dataset.decode_stats.values())[0]["retrieved"] == 10
+    assert np.allclose(frames, [i * 8 for i in range(2, 30, 3)], atol=3), frames  # every third frame, lossy JPEG
+    if decoder == "pyav":  # intra-only MJPG packets are only decoded when retrieved
+        cap = new_decoder(str(video), decoder)
+        assert cap.intra_only and all(cap.grab() for _ in range(3)) and not hasattr(cap._frame, "to_ndarray")
+        assert abs(cap.retrieve()[1].mean() - frames[0]) < 1
+
+    import wave
+
+    (TMP / "broken.mp4").write_bytes(b"not a video")
+    with wave.open(str(TMP / "audio.mov"), "wb") as f:  # a container without a video stream
+        f.setnchannels(1), f.setsampwidth(2), f.setframerate(8000), f.writeframes(bytes(1600))
+    for file in "broken.mp4", "audio.mov":
+        with pytest.raises(FileNotFoundError):
+            load_inference_source(str(TMP / file), decoder=decoder)
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_stream_micro_batching():
+    """Test LoadStreams micro-batching returns ready frames tagged with their source stream indices."""
+    video = TMP / "micro_batch.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    streams = TMP / "micro_batch.streams"
+    streams.write_text(f"{video}\n{video}\n{video}\n")
+
+    dataset = load_inference_source(str(streams), batch=2, stream_wait=0.01)
+    paths, images, _ = next(iter(dataset))
+    assert 1 <= len(images) <= 2 and len(paths) == len(images) == len(dataset.indices)
+    assert all(p == dataset.sources[i] for p, i in zip(paths, dataset.indices))
+    dataset.close()
+
+
+def test_inference_server():
+    """Test InferenceServer serves frames through shared memory and reports queue and latency statistics."""
+    from ultralytics.engine.server import InferenceServer
+
+    im = cv2.imread(str(SOURCE))
+    with InferenceServer(MODEL, workers=1, max_shape=im.shape, imgsz=32) as server:
+        client = server.client()
+        rids = [client.submit(im) for _ in range(3)]
+        assert sorted(client.get(timeout=60)[0] for _ in rids) == rids
+        rid = client.submit(im)
+        results = client.predict(im, timeout=60)  # may receive the response of rid first
+        assert results[0].orig_img is im and client.get(timeout=60)[0] == rid and not client.pending
+        stats = server.stats()
+        assert stats["processed"] == 5 and stats["queue"] == 0 and stats["latency_mean"] > 0
+        client.close()
+    InferenceServer(MODEL).stop()  # never started
+
+
+def test_predict_shared_frames():
+    """Test prediction on frames published to a SharedFrameRing through a 'shm://' source."""
+    from ultralytics.data.loaders import SharedFrameRing
+
+    im = cv2.imread(str(SOURCE))
+    frames = [np.full_like(im, k) for k in range(12)]
+    ring = SharedFrameRing(shape=im.shape, slots=4, create=True)
+    for f in frames[:3]:
+        assert ring.write(f, timeout=1)
+    ring.close()
+    model = YOLO(MODEL)
+    results = model(f"shm://{ring.name}", imgsz=32)  # a list of Results outlives the ring window, frames are copied
+    for f in frames[3:7]:  # overwrites every slot
+        assert ring.write(f, timeout=1)
+    assert [r.orig_img[0, 0, 0] for r in results] == [0, 1, 2]
+    ring.release()
+
+    ring = SharedFrameRing(shape=im.shape, slots=12, create=True)
+    for f in frames:
+        assert ring.write(f, timeout=1)
+    ring.close()
+    for k, r in enumerate(model(f"shm://{ring.name}", imgsz=32, stream=True, pipeline=True)):
+        assert r.orig_img[0, 0, 0] == k
+    assert model.predictor.dataset.copy == [False]  # 12 slots hold all frames in flight, read without copies
+    ring.release()
+
+
+def test_shared_frames_consumer_exit():
+    """Test that a consumer process exiting leaves the producer's SharedFrameRing in place."""
+    import subprocess
+    import sys
+
+    from ultralytics.data.loaders import SharedFrameRing
+
+    ring = SharedFrameRing(shape=(8, 8, 3), slots=4, create=True)
+    assert ring.write(np.full((8, 8, 3), 1, dtype=np.uint8), timeout=1)
+    code = (
+        f"from ultralytics.data.loaders import SharedFrameRing; print(SharedFrameRing('{ring.name}').read()[0, 0, 0])"
+    )
+    consumer = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT.parent)
+    assert consumer.stdout.strip() == "1" and "leaked" not in consumer.stderr
+    assert ring.write(np.full((8, 8, 3), 2, dtype=np.uint8), timeout=1)  # the producer keeps writing
+    consumer = SharedFrameRing(ring.name)  # and new consumers can still attach
+    assert consumer.read(timeout=1)[0, 0, 0] == 1 and consumer.read(timeout=1)[0, 0, 0] == 2
+    consumer.release()
+    ring.release()
+
+
+def test_model_async():
+    """Test asyncio predict and track coroutines, concurrent requests and early exit from the async iterator."""
+    import asyncio
+
+    model = YOLO(MODEL)
+
+    async def run():
+        results = await asyncio.gather(*(model.apredict(SOURCE, imgsz=32) for _ in range(3)))
+        assert [len(r) for r in results] == [1, 1, 1]
+        async for _ in model.astream([SOURCE, SOURCE], imgsz=32):
+            break  # leaving early must release the predictor for the next request
+        assert len(await model.atrack(SOURCE, imgsz=32)) == 1
+        model.max_inflight = 2
+        results = await asyncio.gather(*(model.apredict(SOURCE, imgsz=32) for _ in range(3)), return_exceptions=True)
+        assert sum(isinstance(r, RuntimeError) for r in results) == 1  # the third request is rejected
+
+    asyncio.run(run())
+    assert not any(isinstance(v, asyncio.Lock) for v in vars(model).values())  # model stays copyable
+
+
+def test_model_async_cancel():
+    """Test that a request cancelled mid-stream finishes its batch before the next request changes the predictor."""
+    import asyncio
+    import time
+
+    model = YOLO(MODEL)
+    events = []
+
+    def start(predictor):
+        """Record the batch and slow it down, so the request is cancelled while a batch runs."""
+        events.append(("start", predictor.args.imgsz))
+        time.sleep(0.2)
+
+    model.add_callback("on_predict_batch_start", start)
+    model.add_callback("on_predict_batch_end", lambda p: events.append(("end", p.args.imgsz)))
+
+    async def run():
+        async def consume():
+            async for _ in model.astream(ASSETS, imgsz=64):  # one batch per image
+                pass
+
+        task = asyncio.create_task(consume())
+        while len(events) < 3:  # the second batch is running
+            await asyncio.sleep(0.01)
+        task.cancel()
+        results = await model.apredict(SOURCE, imgsz=32)
+        assert task.cancelled() and len(results) == 1 and model.predictor.args.imgsz == 32
+
+    asyncio.run(run())
+    assert [e for e, _ in events] == ["start", "end"] * (len(events) // 2)  # batches never overlap
+    assert [s for _, s in events[0::2]] == [s for _, s in events[1::2]]  # nor see the args of the next request
+
+
 def test_val():
     """Test the validation mode of the YOLO model."""
     YOLO(MODEL).val(data="coco8.yaml", imgsz=32, save_hybrid=True)
@@ -95,7 +95,7 @@ CLI_HELP_MSG = f"""
     """
 
 # Define keys for arg type checks
-CFG_FLOAT_KEYS = {"warmup_epochs", "box", "cls", "dfl", "degrees", "shear", "time", "workspace"}
+CFG_FLOAT_KEYS = {"warmup_epochs", "box", "cls", "dfl", "degrees", "shear", "time", "workspace", "stream_wait"}
 CFG_FRACTION_KEYS = {
     "dropout",
     "iou",
@@ -121,6 +121,8 @@ CFG_FRACTION_KEYS = {
     "conf",
     "iou",
     "fraction",
+    "motion_thresh",
+    "tile_overlap",
 }  # fraction floats 0.0 - 1.0
 CFG_INT_KEYS = {
     "epochs",
@@ -135,6 +137,8 @@ CFG_INT_KEYS = {
     "line_width",
     "nbs",
     "save_period",
+    "motion_refresh",
+    "tile",
 }
 CFG_BOOL_KEYS = {
     "save",
@@ -162,6 +166,8 @@ CFG_BOOL_KEYS = {
     "augment",
     "agnostic_nms",
     "retina_masks",
+    "pipeline",
+    "fused_preprocess",
     "show_boxes",
     "keras",
     "optimize",
@@ -15,6 +15,7 @@ from ultralytics.data.loaders import (
     LoadImagesAndVideos,
     LoadPilAndNumpy,
     LoadScreenshots,
+    LoadSharedFrames,
     LoadStreams,
     LoadTensor,
     SourceTypes,
@@ -151,7 +152,7 @@ def check_source(source):
     if isinstance(source, (str, int, Path)):  # int for local usb camera
         source = str(source)
         is_file = Path(source).suffix[1:] in (IMG_FORMATS | VID_FORMATS)
-        is_url = source.lower().startswith(("https://", "http://", "rtsp://", "rtmp://", "tcp://"))
+        is_url = source.lower().startswith(("https://", "http://", "rtsp://", "rtmp://", "tcp://", "shm://"))
         webcam = source.isnumeric() or source.endswith(".streams") or (is_url and not is_file)
         screenshot = source.lower() == "screen"
         if is_url and is_file:
@@ -171,7 +172,9 @@ def check_source(source):
     return source, webcam, screenshot, from_img, in_memory, tensor
 
 
-def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
+def load_inference_source(
+    source=None, batch=1, vid_stride=1, buffer=False, stream_wait=None, decoder="opencv", keep=None
+):
     """
     Loads an inference source for object detection and applies necessary transformations.
 
@@ -180,6 +183,11 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
         batch (int, optional): Batch size for dataloaders. Default is 1.
         vid_stride (int, optional): The frame interval for video sources. Default is 1.
         buffer (bool, optional): Determined whether stream frames will be buffered. Default is False.
+        stream_wait (float, optional): Micro-batch streams, returning the frames that are ready after waiting at most
+            this many seconds instead of blocking on every stream. Default is None.
+        decoder (str, optional): Video decode backend, 'opencv', 'pyav' or 'keyframes'. Default is 'opencv'.
+        keep (int, optional): Frames of each 'shm://' ring used downstream at the same time, which are read without
+            copying. Default is None, copying every frame.
 
     Returns:
         dataset (Dataset): A dataset object for the specified input source.
@@ -192,14 +200,18 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
         dataset = LoadTensor(source)
     elif in_memory:
         dataset = source
+    elif stream and source.startswith("shm://"):
+        dataset = LoadSharedFrames(source, keep=keep)
     elif stream:
-        dataset = LoadStreams(source, vid_stride=vid_stride, buffer=buffer)
+        dataset = LoadStreams(
+            source, vid_stride=vid_stride, buffer=buffer, max_wait=stream_wait, batch=batch, decoder=decoder
+        )
     elif screenshot:
         dataset = LoadScreenshots(source)
     elif from_img:
         dataset = LoadPilAndNumpy(source)
     else:
-        dataset = LoadImagesAndVideos(source, batch=batch, vid_stride=vid_stride)
+        dataset = LoadImagesAndVideos(source, batch=batch, vid_stride=vid_stride, decoder=decoder)
 
     # Attach source types to the dataset
     setattr(dataset, "source_type", source_type)
@@ -3,8 +3,11 @@
 import glob
 import math
 import os
+import sys
 import time
 from dataclasses import dataclass
+from functools import partial
+from multiprocessing import resource_tracker, shared_memory
 from pathlib import Path
 from threading import Thread
 from urllib.parse import urlparse
@@ -30,6 +33,190 @@ class SourceTypes:
     tensor: bool = False
 
 
+class VideoDecoder:
+    """
+    Base class of the video decode backends used by the video and stream loaders.
+
+    Backends expose the subset of the cv2.VideoCapture interface the loaders use, so skipped frames are only grabbed
+    and just the frames that are used are converted to BGR arrays by `retrieve()`.
+
+    Attributes:
+        source (str | int): Video file, stream URL or webcam index.
+        stats (dict): Decode counters, 'grabbed' and 'retrieved' frames and 'time' spent decoding in seconds.
+
+    Methods:
+        grab: Decode the next frame without converting it.
+        retrieve: Convert the last grabbed frame to a BGR image.
+        read: Grab and retrieve the next frame.
+    """
+
+    def __init__(self, source):
+        """Open the video source and initialize the decode counters."""
+        self.source = source
+        self.stats = {"grabbed": 0, "retrieved": 0, "time": 0.0}
+        self.open(source)
+
+    def grab(self):
+        """Decode the next frame without converting it, returning True on success."""
+        t = time.perf_counter()
+        success = self._grab()
+        self.stats["grabbed"] += success
+        self.stats["time"] += time.perf_counter() - t
+        return success
+
+    def retrieve(self):
+        """Return the success flag and BGR image of the last grabbed frame."""
+        t = time.perf_counter()
+        success, im = self._retrieve()
+        self.stats["retrieved"] += success
+        self.stats["time"] += time.perf_counter() - t
+        return success, im
+
+    def read(self):
+        """Grab and retrieve the next frame."""
+        return self.retrieve() if self.grab() else (False, None)
+
+
+class OpenCVDecoder(VideoDecoder):
+    """Video decode backend using cv2.VideoCapture, supporting files, streams and webcams."""
+
+    def open(self, source):
+        """Open or re-open the video source."""
+        self.cap = cv2.VideoCapture(source)
+
+    def isOpened(self):
+        """Return True if the source is open."""
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        """Return a cv2.CAP_PROP_* property of the source."""
+        return self.cap.get(prop)
+
+    def _grab(self):
+        """Decode the next frame."""
+        return self.cap.grab()
+
+    def _retrieve(self):
+        """Convert the last grabbed frame."""
+        return self.cap.retrieve()
+
+    def release(self):
+        """Close the source."""
+        self.cap.release()
+
+
+class PyAVDecoder(VideoDecoder):
+    """
+    Video decode backend using PyAV (FFmpeg) with frame-threaded decoding.
+
+    With `keyframes=True` the codec skips all non-keyframes, which decodes only one frame per group of pictures and is
+    the fastest way to sample long recordings. The frame count is then unknown and reported as 0.
+
+    Frames skipped by `vid_stride` are only demuxed, not decoded, for intra-only codecs such as MJPEG or ProRes where
+    every frame is coded on its own. Inter-coded video (H.264, HEVC, ...) still decodes every frame, as the next frames
+    are predicted from it, and skips only the BGR conversion; use `keyframes=True` to sample these cheaply.
+    """
+
+    def __init__(self, source, keyframes=False):
+        """Open the video source, optionally decoding keyframes only."""
+        check_requirements("av")
+        self.keyframes = keyframes
+        super().__init__(source)
+
+    def open(self, source):
+        """Open or re-open the video source."""
+        import av  # scope for faster 'import ultralytics'
+
+        if getattr(self, "_frames", None) is not None:
+            self.release()
+        self._frames = self._frame = self.stream = None
+        self.intra_only = False
+        try:
+            self.container = av.open(str(source))
+        except av.error.FFmpegError:
+            return  # isOpened() is False
+        if not self.container.streams.video:
+            self.container.close()
+            return  # no video stream, i.e. an audio file
+        self.stream = self.container.streams.video[0]
+        self.intra_only = getattr(self.stream.codec_context.codec, "intra_only", False) and not self.keyframes
+        if self.intra_only:  # decode grabbed packets on retrieve only, slice threading returns every frame at once
+            self.stream.thread_type = "SLICE"
+            self._frames = (p for p in self.container.demux(self.stream) if p.size)  # drop the final flush packet
+            return
+        self.stream.thread_type = "AUTO"  # frame and slice threading
+        if self.keyframes:
+            self.stream.codec_context.skip_frame = "NONKEY"
+        self._frames = self.container.decode(self.stream)
+
+    def isOpened(self):
+        """Return True if the source is open."""
+        return self._frames is not None
+
+    def get(self, prop):
+        """Return the frame size, frame rate or frame count for the matching cv2.CAP_PROP_* property, 0 if not open."""
+        if self.stream is None:
+            return 0
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.stream.codec_context.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.stream.codec_context.height
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.stream.average_rate or 0)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return 0 if self.keyframes else self.stream.frames
+        return 0
+
+    def _grab(self):
+        """Decode the next frame, or only demux its packet for intra-only codecs."""
+        if self._frames is None:
+            return False
+        try:
+            self._frame = next(self._frames, None)
+        except Exception:  # corrupt data or lost stream, FFmpegError and OSError
+            self._frame = None
+        return self._frame is not None
+
+    def _retrieve(self):
+        """Convert the last grabbed frame, decoding its packet first for intra-only codecs."""
+        frame = self._frame
+        if frame is not None and self.intra_only:
+            try:
+                frame = next(iter(self.stream.codec_context.decode(frame)), None)
+            except Exception:  # corrupt packet
+                frame = None
+        return (True, frame.to_ndarray(format="bgr24")) if frame is not None else (False, None)
+
+    def release(self):
+        """Close the source."""
+        if self._frames is not None:
+            self.container.close()
+            self._frames = None
+
+
+DECODERS = {
+    "opencv": OpenCVDecoder,
+    "pyav": PyAVDecoder,
+    "keyframes": partial(PyAVDecoder, keyframes=True),
+}  # video decode backends by name
+
+
+def new_decoder(source, decoder="opencv"):
+    """
+    Open a video source with the named decode backend.
+
+    Args:
+        source (str | int): Video file, stream URL or webcam index, webcams always use OpenCV.
+        decoder (str): Backend name, 'opencv', 'pyav' or 'keyframes'.
+
+    Returns:
+        (VideoDecoder): Opened decoder.
+    """
+    if decoder not in DECODERS:
+        raise ValueError(f"Invalid decoder '{decoder}', valid decoders are {tuple(DECODERS)}.")
+    return DECODERS[decoder if isinstance(source, str) else "opencv"](source)
+
+
 class LoadStreams:
     """
     Stream Loader for various types of video streams, Supports RTSP, RTMP, HTTP, and TCP streams.
@@ -38,6 +225,9 @@ class LoadStreams:
         sources (str): The source input paths or URLs for the video streams.
         vid_stride (int): Video frame-rate stride, defaults to 1.
         buffer (bool): Whether to buffer input streams, defaults to False.
+        max_wait (float | None): Micro-batching deadline in seconds, None waits for a frame from every stream.
+        max_batch (int): Maximum number of frames returned per micro-batch.
+        indices (list): Source stream index of each frame in the last returned batch.
         running (bool): Flag to indicate if the streaming thread is running.
         mode (str): Set to 'stream' indicating real-time capture.
         imgs (list): List of image frames for each stream.
@@ -45,7 +235,8 @@ class LoadStreams:
         frames (list): List of total frames for each stream.
         threads (list): List of threads for each stream.
         shape (list): List of shapes for each stream.
-        caps (list): List of cv2.VideoCapture objects for each stream.
+        caps (list): List of VideoDecoder objects for each stream.
+        decode_stats (list): Decode counters of each stream, see `VideoDecoder.stats`.
         bs (int): Batch size for processing.
 
     Methods:
@@ -59,13 +250,16 @@ class LoadStreams:
     Example:
          ```bash
          yolo predict source='rtsp://example.com/media.mp4'
+         yolo predict source='cameras.streams' stream_wait=0.05 batch=16  # micro-batch ready frames across streams
+         yolo predict source='cameras.streams' decoder=pyav  # threaded PyAV decoding
          ```
     """
 
-    def __init__(self, sources="file.streams", vid_stride=1, buffer=False):
+    def __init__(self, sources="file.streams", vid_stride=1, buffer=False, max_wait=None, batch=1, decoder="opencv"):
         """Initialize instance variables and check for consistent input stream shapes."""
         torch.backends.cudnn.benchmark = True  # faster for fixed-size inference
         self.buffer = buffer  # buffer input streams
+        self.max_wait = max_wait  # micro-batching deadline, None to wait for all streams
         self.running = True  # running flag for Thread
         self.mode = "stream"
         self.vid_stride = vid_stride  # video frame-rate stride
@@ -73,6 +267,9 @@ class LoadStreams:
         sources = Path(sources).read_text().rsplit() if os.path.isfile(sources) else [sources]
         n = len(sources)
         self.bs = n
+        self.max_batch = min(batch, n) if batch > 1 else n  # micro-batch size cap
+        self.indices = list(range(n))
+        self._next = 0  # first stream to poll in the next micro-batch, rotated for fairness
         self.fps = [0] * n  # frames per second
         self.frames = [0] * n
         self.threads = [None] * n
@@ -92,7 +289,7 @@ class LoadStreams:
                     "'source=0' webcam not supported in Colab and Kaggle notebooks. "
                     "Try running 'source=0' in a local environment."
                 )
-            self.caps[i] = cv2.VideoCapture(s)  # store video capture object
+            self.caps[i] = new_decoder(s, decoder)  # store video decoder object
             if not self.caps[i].isOpened():
                 raise ConnectionError(f"{st}Failed to open {s}")
             w = int(self.caps[i].get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -122,6 +319,8 @@ class LoadStreams:
                 cap.grab()  # .read() = .grab() followed by .retrieve()
                 if n % self.vid_stride == 0:
                     success, im = cap.retrieve()
+                    if not success and isinstance(stream, str) and os.path.isfile(stream):
+                        break  # end of a local video file with unknown frame count
                     if not success:
                         im = np.zeros(self.shape[i], dtype=np.uint8)
                         LOGGER.warning("WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.")
@@ -139,7 +338,7 @@ class LoadStreams:
         for thread in self.threads:
             if thread.is_alive():
                 thread.join(timeout=5)  # Add timeout
-        for cap in self.caps:  # Iterate through the stored VideoCapture objects
+        for cap in self.caps:  # Iterate through the stored video decoder objects
             try:
                 cap.release()  # release video capture
             except Exception as e:
@@ -154,6 +353,8 @@ class LoadStreams:
     def __next__(self):
         """Returns source paths, transformed and original images for processing."""
         self.count += 1
+        if self.max_wait is not None:
+            return self._next_micro_batch()
 
         images = []
         for i, x in enumerate(self.imgs):
@@ -178,10 +379,41 @@ class LoadStreams:
 
         return self.sources, images, [""] * self.bs
 
+    def _next_micro_batch(self):
+        """Returns frames from the streams that are ready, waiting at most `max_wait` seconds for the others."""
+        n = len(self.imgs)
+        order = [(self._next + j) % n for j in range(n)]  # round-robin so capped batches do not starve streams
+        deadline = time.time() + self.max_wait
+        while True:
+            ready = [i for i in order if self.imgs[i]]
+            if len(ready) >= self.max_batch or (ready and time.time() >= deadline):
+                break
+            if not ready and (not any(t.is_alive() for t in self.threads) or cv2.waitKey(1) == ord("q")):  # q to quit
+                self.close()
+                raise StopIteration
+            time.sleep(0.001 if time.time() < deadline else 1 / max(self.fps))
+
+        self._next = (ready[: self.max_batch][-1] + 1) % n
+        self.indices = sorted(ready[: self.max_batch])
+        images = []
+        for i in self.indices:
+            x = self.imgs[i]
+            if self.buffer:
+                images.append(x.pop(0))
+            else:
+                images.append(x.pop(-1))
+                x.clear()
+        return [self.sources[i] for i in self.indices], images, [""] * len(images)
+
     def __len__(self):
         """Return the length of the sources object."""
         return self.bs  # 1E12 frames = 32 streams at 30 FPS for 30 years
 
+    @property
+    def decode_stats(self):
+        """Return the decode counters of each stream."""
+        return [cap.stats for cap in self.caps]
+
 
 class LoadScreenshots:
     """
@@ -262,16 +494,18 @@ class LoadImagesAndVideos:
         mode (str): Current mode, 'image' or 'video'.
         vid_stride (int): Stride for video frame-rate, defaults to 1.
         bs (int): Batch size, set to 1 for this class.
-        cap (cv2.VideoCapture): Video capture object for OpenCV.
+        cap (VideoDecoder): Video decoder of the current video.
+        decoder (str): Video decode backend, 'opencv', 'pyav' or 'keyframes'.
+        decode_stats (dict): Decode counters of each opened video by path, see `VideoDecoder.stats`.
         frame (int): Frame counter for video.
         frames (int): Total number of frames in the video.
         count (int): Counter for iteration, initialized at 0 during `__iter__()`.
 
     Methods:
-        _new_video(path): Create a new cv2.VideoCapture object for a given video path.
+        _new_video(path): Create a new video decoder for a given video path.
     """
 
-    def __init__(self, path, batch=1, vid_stride=1):
+    def __init__(self, path, batch=1, vid_stride=1, decoder="opencv"):
         """Initialize the Dataloader and raise FileNotFoundError if file not found."""
         parent = None
         if isinstance(path, str) and Path(path).suffix == ".txt":  # *.txt file with img/vid/dir on each line
@@ -308,6 +542,8 @@ class LoadImagesAndVideos:
         self.mode = "image"
         self.vid_stride = vid_stride  # video frame-rate stride
         self.bs = batch
+        self.decoder = decoder
+        self.decode_stats = {}
         if any(videos):
             self._new_video(videos[0])  # new video
         else:
@@ -375,10 +611,11 @@ class LoadImagesAndVideos:
     def _new_video(self, path):
         """Creates a new video capture object for the given path."""
         self.frame = 0
-        self.cap = cv2.VideoCapture(path)
-        self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
+        self.cap = new_decoder(path, self.decoder)
+        self.decode_stats[path] = self.cap.stats
         if not self.cap.isOpened():
             raise FileNotFoundError(f"Failed to open video {path}")
+        self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
         self.frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) / self.vid_stride)
 
     def __len__(self):
@@ -505,6 +742,245 @@ class LoadTensor:
         return self.bs
 
 
+class _SharedBuffer:
+    """Expose a SharedMemory block to numpy so that every array view holds a reference to the block."""
+
+    def __init__(self, shm):
+        """Wrap `shm`, which is closed by its finalizer once no numpy view references this object."""
+        self.shm = shm
+        address = np.ndarray(shm.size, dtype=np.uint8, buffer=shm.buf).ctypes.data
+        self.__array_interface__ = {"shape": (shm.size,), "typestr": "|u1", "data": (address, False), "version": 3}
+
+
+class SharedFrameRing:
+    """
+    Single-producer, single-consumer ring buffer of video frames in shared memory.
+
+    A capture process writes decoded frames into preallocated slots and a consumer process reads them back as numpy
+    views of the same memory, so frames cross the process boundary without pickling or copying. A small int64 header in
+    the same block holds the frame shape and the write/release counters, so consumers only need the ring name.
+
+    The consumer keeps the `keep` most recently read frames valid, so they can move through downstream stages such as
+    pipelined prediction without copies. Older slots are given back to the producer, which overwrites them: views of
+    those frames stay mapped but silently show newer frames, so consumers holding frames longer must read with
+    `copy=True`, which also gives the slot back at once.
+
+    Attributes:
+        name (str): Shared-memory block name used by consumers to attach.
+        shape (tuple): (h, w, c) uint8 frame shape of every slot.
+        slots (int): Number of frame slots in the ring.
+        keep (int): Number of recently read frames the consumer keeps valid, `slots // 2` unless set by the consumer.
+        frames (np.ndarray): (slots, h, w, c) view of all frame slots.
+
+    Methods:
+        reserve: Return a writable view of the next free slot for the producer.
+        commit: Publish the reserved slot to the consumer.
+        write: Copy a frame into the ring and publish it.
+        read: Return a view of the next published frame.
+        close: Mark the end of the stream.
+        release: Detach from the shared memory, unlinking it if this process created it.
+
+    Example:
+        ```python
+        ring = SharedFrameRing("cam0", shape=(1080, 1920, 3), create=True)  # capture process
+        success, _ = cap.read(ring.reserve())  # decode straight into shared memory
+        ring.commit()
+
+        results = model.predict("shm://cam0", stream=True)  # inference process
+        ```
+    """
+
+    HEADER = 8  # int64 fields: write count, release count, closed flag, h, w, c, slots, reserved
+
+    def __init__(self, name=None, shape=(1080, 1920, 3), slots=8, create=False):
+        """
+        Create a new ring or attach to an existing one.
+
+        Args:
+            name (str, optional): Shared-memory name, autogenerated when creating without a name.
+            shape (tuple): (h, w, c) frame shape, only used when creating.
+            slots (int): Number of frame slots, only used when creating.
+            create (bool): Create the ring (producer side) instead of attaching to it.
+        """
+        self.created = create
+        if create:
+            size = 8 * self.HEADER + slots * int(np.prod(shape))
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        elif sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:  # stop the resource tracker of this consumer from unlinking the producer's ring when it exits
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        self.name = shm.name
+        self._unlink = shm.unlink
+        buf = np.asarray(_SharedBuffer(shm))  # views keep the mapping alive, i.e. Results.orig_img after release()
+        self.header = buf[: 8 * self.HEADER].view(np.int64)
+        if create:
+            self.header[:] = (0, 0, 0, *shape, slots, 0)
+        self.shape = tuple(int(x) for x in self.header[3:6])
+        self.slots = int(self.header[6])
+        self.keep = self.slots // 2
+        self.frames = buf[8 * self.HEADER : 8 * self.HEADER + self.slots * int(np.prod(self.shape))]
+        self.frames = self.frames.reshape(self.slots, *self.shape)
+        self.read_count = 0  # consumer-side number of frames read
+
+    def reserve(self, timeout=None):
+        """
+        Return a writable view of the next slot, waiting while the ring is full.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free slot, None waits forever.
+
+        Returns:
+            (np.ndarray | None): Slot view to fill before calling `commit()`, or None if the wait timed out.
+        """
+        t = time.time()
+        while self.header[0] - self.header[1] >= self.slots:  # all slots unread or kept by the consumer
+            if timeout is not None and time.time() - t > timeout:
+                return None
+            time.sleep(0.001)
+        return self.frames[self.header[0] % self.slots]
+
+    def commit(self):
+        """Publish the slot returned by the last `reserve()` call."""
+        self.header[0] += 1
+
+    def write(self, frame, timeout=None):
+        """
+        Copy a frame into the ring and publish it.
+
+        Args:
+            frame (np.ndarray): uint8 image of the ring shape.
+            timeout (float, optional): Seconds to wait for a free slot, None waits forever.
+
+        Returns:
+            (bool): False if the frame was dropped because the ring stayed full for `timeout` seconds.
+        """
+        slot = self.reserve(timeout)
+        if slot is None:
+            return False
+        slot[:] = frame
+        self.commit()
+        return True
+
+    def read(self, timeout=None, copy=False):
+        """
+        Return a zero-copy view of the next frame, releasing slots beyond the `keep` most recent frames.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a frame, None waits forever.
+            copy (bool): Return a private copy of the frame and release its slot at once.
+
+        Returns:
+            (np.ndarray | None): Frame view or copy, or None if the stream is closed or the wait timed out.
+        """
+        t = time.time()
+        while self.read_count >= self.header[0]:
+            if self.header[2] or (timeout is not None and time.time() - t > timeout):
+                return None
+            time.sleep(0.001)
+        frame = self.frames[self.read_count % self.slots]
+        if copy:
+            frame = frame.copy()
+        self.read_count += 1
+        self.header[1] = max(self.read_count - (0 if copy else self.keep), self.header[1])
+        return frame
+
+    def close(self):
+        """Mark the end of the stream, consumers stop after reading the remaining frames."""
+        self.header[2] = 1
+
+    def release(self):
+        """
+        Detach from the shared memory, unlinking it if this process created the ring.
+
+        The mapping itself is closed once the last frame view, i.e. a `Results.orig_img`, is garbage collected, but
+        views of released slots may show newer frames.
+        """
+        self.header = self.frames = None
+        if self.created:
+            self._unlink()
+
+
+class LoadSharedFrames:
+    """
+    Load frames published by capture processes into SharedFrameRing buffers, without copying where possible.
+
+    Frames are returned as views of the shared memory while at most `keep` of them per ring are used downstream, i.e.
+    by pipelined prediction and by the caller of a streaming predict. Otherwise, such as for a predict returning a list
+    of all Results, frames are copied, as the producer would overwrite the views.
+
+    Attributes:
+        sources (list): Ring names, one per source.
+        rings (list): Attached SharedFrameRing consumers.
+        copy (list): Whether frames of each ring are copied because it has too few slots to keep them valid.
+        mode (str): Set to 'stream' indicating real-time capture.
+        bs (int): Batch size, one frame per ring.
+        fps (list): Nominal FPS for each source, used when saving videos.
+        indices (list): Source index of each frame in the last returned batch.
+
+    Methods:
+        __iter__: Returns an iterator object for the class.
+        __next__: Returns ring names, frame views and empty strings, one frame from every ring.
+        close: Detach from all rings.
+
+    Example:
+        ```bash
+        yolo predict source='shm://cam0,cam1'
+        ```
+    """
+
+    def __init__(self, sources="shm://cam0", keep=None):
+        """
+        Attach to the comma-separated rings of a 'shm://' source.
+
+        Args:
+            sources (str): 'shm://' followed by comma-separated ring names.
+            keep (int, optional): Frames per ring used downstream at the same time, None copies every frame.
+        """
+        self.sources = sources[len("shm://") :].split(",")
+        self.rings = [SharedFrameRing(name) for name in self.sources]
+        self.copy = [keep is None or keep >= ring.slots for ring in self.rings]
+        for ring, copy in zip(self.rings, self.copy):
+            if keep is not None and copy:
+                LOGGER.warning(
+                    f"WARNING ⚠️ SharedFrameRing '{ring.name}' has {ring.slots} slots but {keep} frames are used at "
+                    f"once, copying frames. Create it with more than {keep} slots for zero-copy reads."
+                )
+            ring.keep = ring.keep if copy else keep
+        self.mode = "stream"
+        self.bs = len(self.rings)
+        self.fps = [30] * self.bs
+        self.indices = list(range(self.bs))
+
+    def __iter__(self):
+        """Returns an iterator object."""
+        self.count = -1
+        return self
+
+    def __next__(self):
+        """Returns source names, zero-copy frame views and empty strings, stopping once any ring is closed."""
+        self.count += 1
+        images = []
+        for ring, copy in zip(self.rings, self.copy):
+            im = ring.read(copy=copy)
+            if im is None:
+                self.close()
+                raise StopIteration
+            images.append(im)
+        return self.sources, images, [""] * self.bs
+
+    def close(self):
+        """Detach from all rings."""
+        for ring in self.rings:
+            ring.release()
+        self.rings = []
+
+    def __len__(self):
+        """Return the number of sources."""
+        return self.bs
+
+
 def autocast_list(source):
     """Merges a list of source of different types into a list of numpy arrays or PIL images."""
     files = []
@@ -555,4 +1031,4 @@ def get_best_youtube_url(url, use_pafy=True):
 
 
 # Define constants
-LOADERS = (LoadStreams, LoadPilAndNumpy, LoadImagesAndVideos, LoadScreenshots)
+LOADERS = (LoadStreams, LoadPilAndNumpy, LoadImagesAndVideos, LoadScreenshots, LoadSharedFrames)
@@ -1,6 +1,10 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
+import asyncio
 import inspect
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import List, Union
 
@@ -24,6 +28,9 @@ from ultralytics.utils import (
     yaml_load,
 )
 
+# Async API state of each Model, [event loop, predictor lock, admitted requests], kept off the model so it can be copied
+_ASYNC_STATE = weakref.WeakKeyDictionary()
+
 
 class Model(nn.Module):
     """
@@ -54,6 +61,7 @@ class Model(nn.Module):
         session (HUBTrainingSession): The Ultralytics HUB session, if applicable.
         task (str): The type of task the model is intended for.
         model_name (str): The name of the model.
+        max_inflight (int): The maximum number of async requests admitted at once, one running and the rest waiting.
 
     Methods:
         __call__: Alias for the predict method, enabling the model instance to be callable.
@@ -67,6 +75,9 @@ class Model(nn.Module):
         fuse: Fuses Conv2d and BatchNorm2d layers for optimized inference.
         predict: Performs object detection predictions.
         track: Performs object tracking.
+        apredict: Performs object detection predictions without blocking the asyncio event loop.
+        atrack: Performs object tracking without blocking the asyncio event loop.
+        astream: Asynchronously iterates over prediction or tracking results.
         val: Validates the model on a dataset.
         benchmark: Benchmarks the model on various export formats.
         export: Exports the model to different formats.
@@ -130,6 +141,7 @@ class Model(nn.Module):
         self.metrics = None  # validation/training metrics
         self.session = None  # HUB session
         self.task = task  # task type
+        self.max_inflight = 16  # max requests admitted by the async API, further requests raise RuntimeError
         model = str(model).strip()
 
         # Check if Ultralytics HUB model from https://hub.ultralytics.com
@@ -492,6 +504,105 @@ class Model(nn.Module):
         kwargs["mode"] = "track"
         return self.predict(source=source, stream=stream, **kwargs)
 
+    async def apredict(
+        self,
+        source: Union[str, Path, int, list, tuple, np.ndarray, torch.Tensor] = None,
+        **kwargs,
+    ) -> List[Results]:
+        """
+        Asynchronously performs predictions on the given source without blocking the event loop.
+
+        Inference runs in a worker thread and requests on one model run one at a time, see `astream()` for concurrency
+        and cancellation behavior.
+
+        Args:
+            source (str | int | PIL.Image | np.ndarray, optional): The source of the image for making predictions.
+            **kwargs (any): Additional keyword arguments for configuring the prediction process, as for `predict()`.
+
+        Returns:
+            (List[ultralytics.engine.results.Results]): A list of prediction results.
+        """
+        return [r async for r in self.astream(source, **kwargs)]
+
+    async def atrack(
+        self,
+        source: Union[str, Path, int, list, tuple, np.ndarray, torch.Tensor] = None,
+        persist: bool = False,
+        **kwargs,
+    ) -> List[Results]:
+        """
+        Asynchronously conducts object tracking on the given source without blocking the event loop.
+
+        Args:
+            source (str, optional): The input source for object tracking.
+            persist (bool, optional): Persists the trackers between different calls to this method. Defaults to False.
+            **kwargs (any): Additional keyword arguments for configuring the tracking process, as for `track()`.
+
+        Returns:
+            (List[ultralytics.engine.results.Results]): A list of tracking results.
+        """
+        return [r async for r in self.astream(source, track=True, persist=persist, **kwargs)]
+
+    async def astream(
+        self,
+        source: Union[str, Path, int, list, tuple, np.ndarray, torch.Tensor] = None,
+        track: bool = False,
+        persist: bool = False,
+        **kwargs,
+    ):
+        """
+        Asynchronously iterates over prediction or tracking results, one Results object at a time.
+
+        Each batch is computed by `predict(stream=True)` or `track(stream=True)` in a dedicated worker thread, so the
+        event loop stays free for other tasks. Requests on the same model share one predictor and tracker state, so they
+        never overlap: one request runs at a time and the others wait in arrival order. At most `max_inflight` requests
+        are admitted at once, the running one included, and further requests are rejected so that overload shows up at
+        once instead of as growing latency. Use one model per concurrent request to run requests in parallel.
+        Cancelling the consuming task or leaving the loop early stops the request after the batch in progress, which
+        finishes before the next request starts.
+
+        Args:
+            source (str | int | PIL.Image | np.ndarray, optional): The source of the image for making predictions.
+            track (bool, optional): Run object tracking instead of prediction. Defaults to False.
+            persist (bool, optional): Persists the trackers between calls when tracking. Defaults to False.
+            **kwargs (any): Additional keyword arguments for configuring the prediction or tracking process.
+
+        Yields:
+            (ultralytics.engine.results.Results): Results in source order.
+
+        Raises:
+            RuntimeError: If `max_inflight` requests are already admitted.
+        """
+        loop = asyncio.get_running_loop()
+        state = _ASYNC_STATE.get(self)
+        if state is None or state[0] is not loop:
+            state = _ASYNC_STATE[self] = [loop, asyncio.Lock(), 0]
+        if state[2] >= self.max_inflight:
+            raise RuntimeError(f"{self.max_inflight} async requests are already in flight, see 'Model.max_inflight'.")
+        state[2] += 1
+        end = object()  # end-of-stream marker
+
+        try:
+            async with state[1]:
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ultralytics-async")
+                gen = None
+                try:
+                    run = self.track if track else self.predict
+                    gen = await loop.run_in_executor(
+                        executor, partial(run, source, stream=True, **({"persist": persist} if track else {}), **kwargs)
+                    )
+                    while True:
+                        result = await loop.run_in_executor(executor, next, gen, end)
+                        if result is end:
+                            break
+                        yield result
+                finally:
+                    if gen is not None:  # wait for the batch in progress, so the next request gets an idle predictor
+                        await loop.run_in_executor(executor, gen.close)
+                    executor.shutdown(wait=False)
+        finally:
+            state[2] -= 1
+
     def val(
         self,
         validator=None,
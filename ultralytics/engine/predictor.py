@@ -29,7 +29,9 @@ Usage - formats:
                               yolov8n_ncnn_model         # NCNN
 """
 
+import json
 import platform
+import queue
 import re
 import threading
 from pathlib import Path
@@ -41,6 +43,7 @@ import torch
 from ultralytics.cfg import get_cfg, get_save_dir
 from ultralytics.data import load_inference_source
 from ultralytics.data.augment import LetterBox, classify_transforms
+from ultralytics.engine.results import Results
 from ultralytics.nn.autobackend import AutoBackend
 from ultralytics.utils import DEFAULT_CFG, LOGGER, MACOS, WINDOWS, callbacks, colorstr, ops
 from ultralytics.utils.checks import check_imgsz, check_imshow
@@ -75,8 +78,13 @@ class BasePredictor:
         device (torch.device): Device used for prediction.
         dataset (Dataset): Dataset used for prediction.
         vid_writer (dict): Dictionary of {save_path: video_writer, ...} writer for saving video output.
+        motion_stats (dict): Number of 'frames' checked and 'skipped' by the motion gate over the predictor lifetime.
+        motion_skipped (bool): Whether the motion gate skipped the current batch, its Results are then the keyframe's.
+        roi (List[np.ndarray]): Region of interest polygons, inference runs only on crops covering them.
     """
 
+    PIPELINE_QUEUE = 2  # batches buffered between pipeline stages with `pipeline=True`
+
     def __init__(self, cfg=DEFAULT_CFG, overrides=None, _callbacks=None):
         """
         Initializes the BasePredictor class.
@@ -109,6 +117,18 @@ class BasePredictor:
         self.transforms = None
         self.callbacks = _callbacks or callbacks.get_default_callbacks()
         self.txt_path = None
+        self.batch_count = None  # dataset frame counter captured when the current batch was read
+        self.batch_indices = None  # source stream index of each image in the current batch
+        self.motion_stats = {"frames": 0, "skipped": 0}  # frames checked and skipped by the motion gate
+        self.motion_skipped = False  # current batch skipped by the motion gate, trackers only predict its tracks
+        self._motion = {}  # source index -> (gray thumbnail, Results, preprocessed image) of its last inferred frame
+        self._motion_im = None  # preprocessed images of the current skipped batch, gathered from the keyframes
+        self._motion_skips = 0  # consecutive skipped batches
+        self._motion_thumbs = None  # thumbnails of the current batch
+        self.roi = None  # region of interest polygons, inference runs on crops covering them
+        self.crops = None  # (image index, x1, y1, x2, y2) of each crop in the current batch when inferring on crops
+        self._crop_windows = {}  # image shape -> crop windows
+        self._full_batch = None  # current batch while it is replaced by its crops
         self._lock = threading.Lock()  # for automatic thread-safe inference
         callbacks.add_integration_callbacks(self)
 
@@ -120,6 +140,16 @@ class BasePredictor:
             im (torch.Tensor | List(np.ndarray)): BCHW for tensor, [(HWC) x B] for list.
         """
         not_tensor = not isinstance(im, torch.Tensor)
+        if not_tensor and self.args.fused_preprocess:
+            same_shapes = len({x.shape for x in im}) == 1
+            return ops.letterbox_batch(
+                im,
+                self.imgsz,
+                auto=same_shapes and self.model.pt,
+                stride=self.model.stride,
+                device=self.device,
+                half=self.model.fp16,
+            )
         if not_tensor:
             im = np.stack(self.pre_transform(im))
             im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW, (n, 3, h, w)
@@ -194,6 +224,9 @@ class BasePredictor:
             batch=self.args.batch,
             vid_stride=self.args.vid_stride,
             buffer=self.args.stream_buffer,
+            stream_wait=self.args.stream_wait,
+            decoder=self.args.decoder,
+            keep=self.frames_in_flight() if getattr(self, "stream", True) else None,  # lists of Results need copies
         )
         self.source_type = self.dataset.source_type
         if not getattr(self, "stream", True) and (
@@ -205,6 +238,15 @@ class BasePredictor:
             LOGGER.warning(STREAM_WARNING)
         self.vid_writer = {}
 
+    def frames_in_flight(self):
+        """
+        Return how many batches read from the dataset may be in use at once, bounding how long frames must stay valid.
+
+        These are the batch being processed and the one still held by the caller of a streaming predict, plus with
+        `pipeline` the batches in the two bounded pipeline queues and in the preprocessing and inference stages.
+        """
+        return 4 + 2 * self.PIPELINE_QUEUE if self.args.pipeline else 2
+
     @smart_inference_mode()
     def stream_inference(self, source=None, model=None, *args, **kwargs):
         """Streams real-time inference on camera feed and saves results to file."""
@@ -235,44 +277,54 @@ class BasePredictor:
                 ops.Profile(device=self.device),
             )
             self.run_callbacks("on_predict_start")
-            for self.batch in self.dataset:
-                self.run_callbacks("on_predict_batch_start")
-                paths, im0s, s = self.batch
-
-                # Preprocess
-                with profilers[0]:
-                    im = self.preprocess(im0s)
-
-                # Inference
-                with profilers[1]:
-                    preds = self.inference(im, *args, **kwargs)
-                    if self.args.embed:
-                        yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
-                        continue
-
-                # Postprocess
-                with profilers[2]:
-                    self.results = self.postprocess(preds, im, im0s)
-                self.run_callbacks("on_predict_postprocess_end")
-
-                # Visualize, save, write results
-                n = len(im0s)
-                for i in range(n):
-                    self.seen += 1
-                    self.results[i].speed = {
-                        "preprocess": profilers[0].dt * 1e3 / n,
-                        "inference": profilers[1].dt * 1e3 / n,
-                        "postprocess": profilers[2].dt * 1e3 / n,
-                    }
-                    if self.args.verbose or self.args.save or self.args.save_txt or self.args.show:
-                        s[i] += self.write_results(i, Path(paths[i]), im, s)
-
-                # Print batch results
-                if self.args.verbose:
-                    LOGGER.info("\n".join(s))
-
-                self.run_callbacks("on_predict_batch_end")
-                yield from self.results
+            if self.args.pipeline and (self.args.visualize or self.args.embed):
+                LOGGER.warning("WARNING ⚠️ 'pipeline=True' is not supported with 'visualize' or 'embed', disabling.")
+                self.args.pipeline = False
+            if self.args.fused_preprocess and type(self).pre_transform is not BasePredictor.pre_transform:
+                LOGGER.warning(
+                    f"WARNING ⚠️ 'fused_preprocess=True' is not supported by {type(self).__name__}, disabling."
+                )
+                self.args.fused_preprocess = False
+            if self.args.motion_thresh is not None and (self.args.pipeline or self.args.embed):
+                LOGGER.warning("WARNING ⚠️ 'motion_thresh' is not supported with 'pipeline' or 'embed', disabling.")
+                self.args.motion_thresh = None
+            if (self.args.roi or self.args.tile) and (self.args.pipeline or self.args.task != "detect"):
+                LOGGER.warning("WARNING ⚠️ 'roi' and 'tile' are only supported for detection without 'pipeline'.")
+                self.args.roi = self.args.tile = None
+            self.roi, self._crop_windows = self.load_roi(self.args.roi), {}
+            self.motion_skipped = False
+            if self.args.pipeline:
+                im = yield from self._pipelined_inference(profilers, *args, **kwargs)
+            else:
+                for self.batch in self.dataset:
+                    self.batch_count, self.batch_indices = self._batch_state()
+                    self.run_callbacks("on_predict_batch_start")
+                    im0s = self.batch[1]
+                    results = self.motion_gate(im0s)
+                    self.motion_skipped = results is not None
+                    if self.motion_skipped:  # static scene, reuse the last results without inference
+                        im, self.results = self._motion_im, results
+                        for p in profilers:
+                            p.dt = 0.0
+                    else:
+                        # Preprocess
+                        with profilers[0]:
+                            im = self.preprocess(self.crop_batch(im0s))
+
+                        # Inference
+                        with profilers[1]:
+                            preds = self.inference(im, *args, **kwargs)
+                            if self.args.embed:
+                                yield from [preds] if isinstance(preds, torch.Tensor) else preds  # embedding tensors
+                                continue
+
+                        # Postprocess
+                        with profilers[2]:
+                            self.results = self.merge_crops(self.postprocess(preds, im, self.batch[1]))
+                        self._motion_keyframe(im)
+                    self.run_callbacks("on_predict_postprocess_end")
+
+                    yield from self._finalize_batch(im, tuple(x.dt for x in profilers))
 
         # Release assets
         for v in self.vid_writer.values():
@@ -280,6 +332,8 @@ class BasePredictor:
                 v.release()
 
         # Print final results
+        if self.args.verbose and self.args.motion_thresh is not None:
+            LOGGER.info(f"Motion gate skipped {self.motion_stats['skipped']}/{self.motion_stats['frames']} frames")
         if self.args.verbose and self.seen:
             t = tuple(x.t / self.seen * 1e3 for x in profilers)  # speeds per image
             LOGGER.info(
@@ -292,6 +346,285 @@ class BasePredictor:
             LOGGER.info(f"Results saved to {colorstr('bold', self.save_dir)}{s}")
         self.run_callbacks("on_predict_end")
 
+    def motion_gate(self, im0s):
+        """
+        Check whether every image of the batch is unchanged since the last inference on its source.
+
+        Images are compared on 160 pixel wide grayscale thumbnails, counting the fraction of pixels whose level changed
+        by more than 25. A batch is skipped when this fraction is at most `motion_thresh` for all of its images, unless
+        `motion_refresh` batches in a row were already skipped.
+
+        Args:
+            im0s (List[np.ndarray]): Original BGR images of the current batch.
+
+        Returns:
+            (List[Results] | None): Copies of the last Results for the current images if the batch can be skipped,
+                otherwise None and the images become the new keyframes once inference has run.
+        """
+        if self.args.motion_thresh is None:
+            return None
+        keys = self.batch_indices or range(len(im0s))
+        thumbs = []
+        for x in im0s:
+            h, w = x.shape[:2]
+            x = cv2.resize(x, (160, max(round(160 * h / w), 1)), interpolation=cv2.INTER_AREA)
+            thumbs.append(cv2.cvtColor(x, cv2.COLOR_BGR2GRAY) if x.ndim == 3 else x)
+        self._motion_thumbs = thumbs
+        self.motion_stats["frames"] += len(im0s)
+
+        static = self._motion_skips < self.args.motion_refresh and all(
+            k in self._motion
+            and self._motion[k][0].shape == t.shape
+            and (cv2.absdiff(self._motion[k][0], t) > 25).mean() <= self.args.motion_thresh
+            for k, t in zip(keys, thumbs)
+        )
+        # Keyframes may come from different batches, i.e. with 'stream_wait', and only stack if their inputs match
+        static = static and len({self._motion[k][2].shape for k in keys}) == 1
+        if not static:
+            self._motion_skips = 0
+            return None
+        self._motion_skips += 1
+        self.motion_stats["skipped"] += len(im0s)
+        results = []
+        for k, path, x in zip(keys, self.batch[0], im0s):
+            r = self._motion[k][1][:]  # shallow copy sharing the detections
+            r.orig_img, r.path = x, path
+            results.append(r)
+        self._motion_im = torch.stack([self._motion[k][2] for k in keys])
+        return results
+
+    def _motion_keyframe(self, im):
+        """Store the images, Results and preprocessed images of an inferred batch as the motion gate's new keyframes."""
+        if self.args.motion_thresh is not None:
+            keys = self.batch_indices or range(len(self.results))
+            ims = im if self.crops is None else [im[0]] * len(self.results)  # crops only give the input shape
+            self._motion.update(zip(keys, zip(self._motion_thumbs, self.results, ims)))
+
+    @staticmethod
+    def load_roi(roi):
+        """
+        Load region of interest polygons.
+
+        Args:
+            roi (str | list | None): JSON file or list of regions, each a list of [x, y] points or a dict with 'points'
+                as saved by `ParkingPtsSelection`.
+
+        Returns:
+            (List[np.ndarray] | None): Polygons of shape (n, 2), or None if no regions are given.
+        """
+        if not roi:
+            return None
+        if isinstance(roi, (str, Path)):
+            with open(roi) as f:
+                roi = json.load(f)
+        return [np.asarray(r["points"] if isinstance(r, dict) else r, dtype=np.float32).reshape(-1, 2) for r in roi]
+
+    def crop_windows(self, shape):
+        """
+        Return the windows inference runs on for images of the given shape.
+
+        With `roi` these are crops around the regions, tiled to at most `tile` or `imgsz` pixels. With `tile` alone
+        they are overlapping tiles of the whole image plus the full image itself, so large objects are not split.
+
+        Args:
+            shape (tuple): Image shape (h, w) or (h, w, c).
+
+        Returns:
+            (List[tuple]): Windows (x1, y1, x2, y2) in pixels.
+        """
+        shape = shape[:2]
+        if shape not in self._crop_windows:
+            h, w = shape
+            size = self.args.tile or max(self.imgsz)
+            if self.roi:
+                windows = ops.roi_windows(self.roi, shape, size, self.args.tile_overlap)
+            else:
+                windows = ops.tile_windows((0, 0, w, h), size, self.args.tile_overlap)
+                windows += [(0, 0, w, h)] if len(windows) > 1 else []  # full image pass for large objects
+            self._crop_windows[shape] = windows or [(0, 0, w, h)]
+        return self._crop_windows[shape]
+
+    def crop_batch(self, im0s):
+        """
+        Replace the current batch by crops of its images when inferring on regions of interest or tiles.
+
+        Args:
+            im0s (List[np.ndarray]): Original images of the current batch.
+
+        Returns:
+            (List[np.ndarray]): Images to preprocess, the crops or `im0s` itself if neither `roi` nor `tile` is set.
+        """
+        if not self.roi and not self.args.tile:
+            self.crops = None
+            return im0s
+        crops, self.crops = [], []
+        for i, x in enumerate(im0s):
+            for x1, y1, x2, y2 in self.crop_windows(x.shape):
+                crops.append(x[y1:y2, x1:x2])
+                self.crops.append((i, x1, y1, x2, y2))
+        self._full_batch = self.batch
+        self.batch = ([self.batch[0][c[0]] for c in self.crops], crops, self.batch[2])
+        return crops
+
+    def merge_crops(self, results):
+        """
+        Map crop detections back to full-image coordinates and merge them per image.
+
+        Duplicates from overlapping crops are removed with NMS, then boxes cut by a crop edge inside the image are fused
+        with the overlapping boxes of the neighbouring crops by `ops.fuse_boxes()`.
+
+        Args:
+            results (List[Results]): Results of the crops, or of the images if no crops were made.
+
+        Returns:
+            (List[Results]): One Results per original image of the current batch.
+        """
+        if self.crops is None:
+            return results
+        import torchvision  # scope for faster 'import ultralytics'
+
+        self.batch = self._full_batch
+        merged = [([], []) for _ in self.batch[1]]
+        for (i, x1, y1, x2, y2), r in zip(self.crops, results):
+            h, w = self.batch[1][i].shape[:2]
+            boxes = r.boxes.data.clone()
+            boxes[:, :4] += boxes.new_tensor([x1, y1, x1, y1])  # crop to image coordinates
+            inside = torch.tensor([x1 > 0, y1 > 0, x2 < w, y2 < h], device=boxes.device)  # crop edges inside image
+            cut = ((boxes[:, :4] - boxes.new_tensor([x1, y1, x2, y2])).abs() < 2) & inside
+            merged[i][0].append(boxes)
+            merged[i][1].append(cut.any(1))
+        results = []
+        for path, im0, (boxes, cut) in zip(self.batch[0], self.batch[1], merged):
+            boxes, cut = torch.cat(boxes), torch.cat(cut)
+            cls = torch.zeros_like(boxes[:, 5]) if self.args.agnostic_nms else boxes[:, 5]
+            i = torchvision.ops.batched_nms(boxes[:, :4], boxes[:, 4], cls, self.args.iou)
+            boxes = ops.fuse_boxes(boxes[i], cut[i], agnostic=self.args.agnostic_nms)[: self.args.max_det]
+            results.append(Results(im0, path=path, names=self.model.names, boxes=boxes))
+        return results
+
+    def _finalize_batch(self, im, dt):
+        """
+        Attach per-image speeds to the current batch results, write them out and run the batch-end callbacks.
+
+        Args:
+            im (torch.Tensor): Preprocessed batch the results were computed from.
+            dt (tuple): Preprocess, inference and postprocess times in seconds for this batch.
+
+        Returns:
+            (list): Results for the current batch.
+        """
+        paths, im0s, s = self.batch
+        n = len(im0s)
+        for i in range(n):
+            self.seen += 1
+            self.results[i].speed = {
+                "preprocess": dt[0] * 1e3 / n,
+                "inference": dt[1] * 1e3 / n,
+                "postprocess": dt[2] * 1e3 / n,
+            }
+            if self.args.verbose or self.args.save or self.args.save_txt or self.args.show:
+                s[i] += self.write_results(i, Path(paths[i]), im, s)
+
+        # Print batch results
+        if self.args.verbose:
+            LOGGER.info("\n".join(s))
+
+        self.run_callbacks("on_predict_batch_end")
+        return self.results
+
+    def _pipelined_inference(self, profilers, *args, **kwargs):
+        """
+        Run prediction as three concurrent stages connected by bounded queues.
+
+        Dataset reading and preprocessing run in one thread and inference in a second, while postprocessing, callbacks
+        and result writing stay on the calling thread so that results are yielded in source order and callbacks see a
+        consistent predictor state. 'on_predict_batch_start' therefore runs when a batch reaches postprocessing.
+
+        Args:
+            profilers (tuple): Preprocess, inference and postprocess ops.Profile instances.
+
+        Returns:
+            (torch.Tensor | None): The last preprocessed batch, used for the final speed summary.
+        """
+        im = None
+        stop = threading.Event()
+        q_pre, q_inf = queue.Queue(maxsize=self.PIPELINE_QUEUE), queue.Queue(maxsize=self.PIPELINE_QUEUE)
+
+        def preprocess(batch):
+            state = self._batch_state()
+            with profilers[0]:
+                im = self.preprocess(batch[1])
+            return batch, state, im, (profilers[0].dt,)
+
+        def inference(item):
+            batch, state, im, dt = item
+            with profilers[1]:
+                preds = self.inference(im, *args, **kwargs)
+            return batch, state, im, preds, (*dt, profilers[1].dt)
+
+        threads = (
+            threading.Thread(target=self._pipeline_stage, args=(self.dataset, preprocess, q_pre, stop), daemon=True),
+            threading.Thread(
+                target=self._pipeline_stage, args=(self._pipeline_get(q_pre, stop), inference, q_inf, stop), daemon=True
+            ),
+        )
+        for t in threads:
+            t.start()
+        try:
+            for self.batch, state, im, preds, dt in self._pipeline_get(q_inf, stop):
+                self.batch_count, self.batch_indices = state
+                self.run_callbacks("on_predict_batch_start")
+                with profilers[2]:
+                    self.results = self.postprocess(preds, im, self.batch[1])
+                self.run_callbacks("on_predict_postprocess_end")
+                yield from self._finalize_batch(im, (*dt, profilers[2].dt))
+        finally:
+            stop.set()  # unblock and stop upstream stages, i.e. when the consumer breaks out early
+            for t in threads:
+                t.join(timeout=5)
+        return im
+
+    def _batch_state(self):
+        """Return the dataset frame counter and source stream indices of the batch that was just read."""
+        return getattr(self.dataset, "count", None), getattr(self.dataset, "indices", None)
+
+    @smart_inference_mode()
+    def _pipeline_stage(self, source, fn, q_out, stop):
+        """Pipeline worker applying `fn` to every item of `source` and forwarding results and errors downstream."""
+        try:
+            for item in source:
+                if stop.is_set():
+                    break
+                self._pipeline_put(q_out, fn(item), stop)
+        except Exception as e:
+            self._pipeline_put(q_out, e, stop)  # re-raised by the consuming stage
+        finally:
+            self._pipeline_put(q_out, None, stop)  # end-of-stream sentinel
+
+    @staticmethod
+    def _pipeline_put(q, item, stop):
+        """Put an item on a bounded pipeline queue, giving up once the pipeline is stopped."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    @staticmethod
+    def _pipeline_get(q, stop):
+        """Yield items from a pipeline queue until the end-of-stream sentinel, re-raising upstream errors."""
+        while not stop.is_set():
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
     def setup_model(self, model, verbose=True):
         """Initialize YOLO model with given parameters and set it to evaluation mode."""
         self.model = AutoBackend(
@@ -315,8 +648,8 @@ class BasePredictor:
         if len(im.shape) == 3:
             im = im[None]  # expand for batch dim
         if self.source_type.stream or self.source_type.from_img or self.source_type.tensor:  # batch_size >= 1
-            string += f"{i}: "
-            frame = self.dataset.count
+            string += f"{i if self.batch_indices is None else self.batch_indices[i]}: "
+            frame = self.batch_count
         else:
             match = re.search(r"frame (\d+)/", s[i])
             frame = int(match.group(1)) if match else None  # 0 if frame undetermined
@@ -356,7 +689,7 @@ class BasePredictor:
         # Save videos and streams
         if self.dataset.mode in {"stream", "video"}:
             fps = self.dataset.fps if self.dataset.mode == "video" else 30
-            frames_path = f'{save_path.split(".", 1)[0]}_frames/'
+            frames_path = f"{save_path.split('.', 1)[0]}_frames/"
             if save_path not in self.vid_writer:  # new video
                 if self.args.save_frames:
                     Path(frames_path).mkdir(parents=True, exist_ok=True)
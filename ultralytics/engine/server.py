@@ -0,0 +1,339 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""
+Local multi-process inference server keeping a fixed pool of warm YOLO model workers.
+
+Producers in any number of processes submit frames through preallocated shared-memory slots and receive `Results`
+asynchronously, so memory and startup cost scale with the number of workers rather than the number of cameras.
+
+Usage:
+    ```python
+    import multiprocessing as mp
+
+    from ultralytics.engine.server import InferenceServer
+
+
+    def camera(client, source):
+        cap = cv2.VideoCapture(source)
+        while cap.isOpened():
+            success, frame = cap.read()
+            if not success:
+                break
+            results = client.predict(frame, classes=[0])  # or client.submit(frame) + client.get() for async use
+
+
+    if __name__ == "__main__":
+        with InferenceServer("yolov8n.pt", workers=2, max_shape=(1080, 1920, 3)) as server:
+            procs = [mp.Process(target=camera, args=(server.client(), s)) for s in ("a.mp4", "b.mp4")]
+            [p.start() for p in procs]
+            [p.join() for p in procs]
+            print(server.stats())
+    ```
+"""
+
+import itertools
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ultralytics.utils import LOGGER
+
+
+def _worker(wid, model, predict_args, max_shape, shm_name, requests, free, responses, stats, ready):
+    """Model worker process: load the model once, then serve requests from shared-memory slots until stopped."""
+    from ultralytics import YOLO
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slot_size = int(np.prod(max_shape))
+    model = YOLO(model)
+    model.predict(np.zeros(max_shape, dtype=np.uint8), verbose=False, **predict_args)  # warmup
+    ready.set()
+
+    channels = {}  # response queue cache, client id -> queue proxy
+    n, total, worst = 0, 0.0, 0.0
+    while True:
+        request = requests.get()
+        if request is None:  # stop sentinel
+            break
+        rid, cid, slot, shape, kwargs, t0 = request
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_size)  # zero-copy view
+        try:
+            results = [r.cpu() for r in model.predict(frame, verbose=False, **{**predict_args, **kwargs})]
+            for r in results:
+                r.orig_img = None  # the producer still holds the frame, do not send it back
+            response = (rid, results)
+        except Exception as e:
+            response = (rid, e)
+        finally:
+            del frame
+            free.put(slot)  # slot can be reused as soon as inference is done
+        dt = time.time() - t0
+        n, total, worst = n + 1, total + dt, max(worst, dt)
+        stats[wid] = (n, total, worst)
+
+        if cid not in channels:
+            channels[cid] = responses[cid]
+        channels[cid].put(response)
+
+
+class InferenceClient:
+    """
+    Producer-side handle of an InferenceServer that can be passed to other processes.
+
+    Attributes:
+        cid (int): Unique client ID used to route responses.
+        pending (dict): Frames of submitted requests by request ID, reattached to their returned Results.
+        done (dict): Responses received by `predict()` for other requests, returned first by `get()`.
+
+    Methods:
+        submit: Copy a frame into a free shared-memory slot and queue it for inference.
+        get: Return the next completed (request ID, Results) pair for this client.
+        predict: Submit a frame and wait for its Results.
+        stats: Return server queue-depth and latency statistics.
+    """
+
+    def __init__(self, cid, shm_name, slots, max_shape, requests, free, responses, stats):
+        """Initialize the client with the server's shared-memory block name and IPC queue proxies."""
+        self.cid = cid
+        self.shm_name = shm_name
+        self.slots = slots
+        self.max_shape = max_shape
+        self.requests = requests
+        self.free = free
+        self.response = responses[cid]
+        self._stats = stats
+        self._shm = None
+        self._ids = itertools.count()
+        self.pending = {}
+        self.done = {}
+
+    def __getstate__(self):
+        """Drop process-local state when the client is sent to another process."""
+        state = self.__dict__.copy()
+        state.update(_shm=None, _ids=None, pending={}, done={})
+        return state
+
+    def __setstate__(self, state):
+        """Restore the client in a new process."""
+        self.__dict__.update(state)
+        self._ids = itertools.count()
+
+    def submit(self, frame, timeout=None, **kwargs):
+        """
+        Copy a frame into a free shared-memory slot and queue it for inference.
+
+        Blocks while all slots are in use, which applies backpressure to producers faster than the workers.
+
+        Args:
+            frame (np.ndarray): BGR uint8 image no larger than the server's `max_shape`.
+            timeout (float, optional): Seconds to wait for a free slot, None waits forever.
+            **kwargs (Any): Predict arguments for this request, i.e. `classes=[0]`, `conf=0.4`.
+
+        Returns:
+            (int): Request ID, returned again with the Results by `get()`.
+        """
+        if frame.dtype != np.uint8 or frame.size > int(np.prod(self.max_shape)):
+            raise ValueError(f"frame must be uint8 and at most {self.max_shape}, but got {frame.dtype} {frame.shape}")
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(name=self.shm_name)
+        slot = self.free.get(timeout=timeout)
+        offset = slot * int(np.prod(self.max_shape))
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf, offset=offset)[:] = frame
+        rid = next(self._ids)
+        self.pending[rid] = frame
+        self.requests.put((rid, self.cid, slot, frame.shape, kwargs, time.time()))
+        return rid
+
+    def get(self, timeout=None):
+        """
+        Return the next completed request of this client, in completion order.
+
+        Responses that `predict()` received while waiting for its own request are returned first.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a response, None waits forever.
+
+        Returns:
+            (tuple): Request ID and its list of Results, with `orig_img` set to the submitted frame.
+
+        Raises:
+            queue.Empty: If no response arrives within `timeout`.
+            Exception: Any error raised by the worker while processing the request.
+        """
+        if self.done:
+            rid = next(iter(self.done))
+            return self._finish(rid, self.done.pop(rid))
+        return self._finish(*self.response.get(timeout=timeout))
+
+    def _finish(self, rid, results):
+        """Reattach the submitted frame to the Results of a response, raising the worker's error if it failed."""
+        frame = self.pending.pop(rid, None)
+        if isinstance(results, Exception):
+            raise results
+        for r in results:
+            r.orig_img = frame
+        return rid, results
+
+    def predict(self, frame, timeout=None, **kwargs):
+        """Submit a frame and block until its Results are returned, keeping other responses for `get()`."""
+        rid = self.submit(frame, timeout=timeout, **kwargs)
+        while rid not in self.done:
+            i, results = self.response.get(timeout=timeout)
+            self.done[i] = results
+        return self._finish(rid, self.done.pop(rid))[1]
+
+    def stats(self):
+        """Return server queue-depth and latency statistics, see `InferenceServer.stats()`."""
+        return InferenceServer.summarize(self.requests, self.free, self._stats, self.slots)
+
+    def close(self):
+        """Detach from the server's shared memory."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+
+class InferenceServer:
+    """
+    Pool of warm YOLO model worker processes fed through shared-memory frame slots.
+
+    Attributes:
+        model (str): Model weights loaded once by every worker.
+        workers (int): Number of model worker processes.
+        slots (int): Number of preallocated shared-memory frame slots, bounding frames in flight.
+        max_shape (tuple): Largest (h, w, c) frame shape accepted.
+        predict_args (dict): Default predict arguments for all requests.
+        running (bool): Whether the workers are started.
+
+    Methods:
+        start: Allocate shared memory and start the worker processes.
+        client: Create a producer handle that can be sent to other processes.
+        stats: Return queue depth, slot usage and per-worker latency statistics.
+        stop: Stop the workers and release shared memory.
+    """
+
+    def __init__(self, model="yolov8n.pt", workers=2, slots=None, max_shape=(1080, 1920, 3), **predict_args):
+        """
+        Initialize the server configuration, workers are started by `start()` or on entering a `with` block.
+
+        Args:
+            model (str): Path to the model weights.
+            workers (int): Number of model worker processes.
+            slots (int, optional): Number of shared-memory frame slots, defaults to 4 per worker.
+            max_shape (tuple): Largest (h, w, c) uint8 frame shape that will be submitted.
+            **predict_args (Any): Default predict arguments, i.e. `imgsz=640`, `device="cpu"`.
+        """
+        self.model = str(model)
+        self.workers = workers
+        self.slots = slots or 4 * workers
+        self.max_shape = tuple(max_shape)
+        self.predict_args = predict_args
+        self.running = False
+        self._cids = itertools.count()
+        self._procs = []
+        self._manager = self._shm = None
+
+    def __enter__(self):
+        """Start the server on entering a `with` block."""
+        return self.start()
+
+    def __exit__(self, *args):
+        """Stop the server on leaving a `with` block."""
+        self.stop()
+
+    def start(self, timeout=300):
+        """
+        Allocate shared memory and start the worker processes, returning once every worker is warm.
+
+        Args:
+            timeout (float): Seconds to wait for each worker to load and warm up its model.
+
+        Returns:
+            (InferenceServer): The started server.
+        """
+        ctx = mp.get_context("spawn")  # safe with CUDA and threads in the parent process
+        self._manager = ctx.Manager()
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * int(np.prod(self.max_shape)))
+        self._requests = self._manager.Queue()
+        self._free = self._manager.Queue()
+        for i in range(self.slots):
+            self._free.put(i)
+        self._responses = self._manager.dict()
+        self._stats = self._manager.dict()
+
+        events = []
+        for wid in range(self.workers):
+            ready = ctx.Event()
+            args = (wid, self.model, self.predict_args, self.max_shape, self._shm.name)
+            args += (self._requests, self._free, self._responses, self._stats, ready)
+            p = ctx.Process(target=_worker, args=args, daemon=True)
+            p.start()
+            self._procs.append(p)
+            events.append(ready)
+        deadline = time.time() + timeout
+        for p, ready in zip(self._procs, events):
+            while not ready.wait(0.1) and p.is_alive() and time.time() < deadline:
+                pass
+            if not ready.is_set():
+                self.stop()
+                raise RuntimeError(f"InferenceServer worker failed to start with model '{self.model}'")
+        self.running = True
+        LOGGER.info(f"InferenceServer started {self.workers} workers with {self.slots} slots of {self.max_shape}")
+        return self
+
+    def client(self):
+        """
+        Create a producer handle, which may be passed to other processes as an argument.
+
+        Returns:
+            (InferenceClient): Client with its own response queue.
+        """
+        assert self.running, "InferenceServer is not running, call start() first."
+        cid = next(self._cids)
+        self._responses[cid] = self._manager.Queue()
+        return InferenceClient(
+            cid, self._shm.name, self.slots, self.max_shape, self._requests, self._free, self._responses, self._stats
+        )
+
+    def stats(self):
+        """
+        Return queue depth, slot usage and per-worker latency statistics.
+
+        Returns:
+            (dict): Keys 'queue' (requests waiting), 'slots_in_use', 'processed', 'latency_mean' and 'latency_max' in
+                seconds from submission to completion, and 'workers' with (processed, mean, max) per worker.
+        """
+        return self.summarize(self._requests, self._free, self._stats, self.slots)
+
+    @staticmethod
+    def summarize(requests, free, stats, slots):
+        """Build the statistics dictionary from the server queues and worker counters."""
+        workers = {wid: (n, total / max(n, 1), worst) for wid, (n, total, worst) in stats.items()}
+        n = sum(v[0] for v in stats.values())
+        return {
+            "queue": requests.qsize(),
+            "slots_in_use": slots - free.qsize(),
+            "processed": n,
+            "latency_mean": sum(v[1] for v in stats.values()) / max(n, 1),
+            "latency_max": max((v[2] for v in stats.values()), default=0.0),
+            "workers": workers,
+        }
+
+    def stop(self, timeout=10):
+        """Stop the workers after the queued requests are served and release shared memory, safe if not started."""
+        for _ in self._procs:
+            self._requests.put(None)
+        for p in self._procs:
+            p.join(timeout=timeout)
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+        self.running = False
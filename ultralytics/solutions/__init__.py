@@ -8,6 +8,7 @@ from .object_counter import ObjectCounter
 from .parking_management import ParkingManagement
 from .queue_management import QueueManager
 from .speed_estimation import SpeedEstimator
+from .track_history import TrackHistory
 
 __all__ = (
     "AIGym",
@@ -17,5 +18,6 @@ __all__ = (
     "ParkingManagement",
     "QueueManager",
     "SpeedEstimator",
+    "TrackHistory",
     "Analytics",
 )
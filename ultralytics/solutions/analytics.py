@@ -1,3 +1,6 @@
+import atexit
+import threading
+from collections import deque
 from itertools import cycle
 
 import cv2
@@ -8,7 +11,21 @@ from matplotlib.figure import Figure
 
 
 class Analytics:
-    """A class to create and update various types of charts (line, bar, pie) for visual analytics."""
+    """
+    A class to create and update various types of charts (line, bar, pie) for visual analytics.
+
+    Line data is kept in preallocated growable buffers, optionally decimating the oldest points, and line charts are
+    blitted over a cached background that is only redrawn when the axis limits grow. Charts can be rendered every
+    `render_interval` updates and on a background thread, so the detection loop never waits on matplotlib.
+
+    Call `close()`, or use the instance as a context manager, to render the charts still pending when done. Threaded
+    instances are also closed at interpreter exit, as their daemon thread would otherwise drop the queued charts.
+
+    Examples:
+        >>> with Analytics("line", writer, im0_shape=(640, 480), threaded=True) as analytics:
+        ...     for frame_number, counts in enumerate(counts_per_frame):
+        ...         analytics.update_line(frame_number, counts)
+    """
 
     def __init__(
         self,
@@ -25,6 +42,9 @@ class Analytics:
         fontsize=13,
         view_img=False,
         save_img=True,
+        render_interval=1,
+        max_points=None,
+        threaded=False,
     ):
         """
         Initialize the Analytics class with various chart types.
@@ -43,6 +63,11 @@ class Analytics:
             fontsize (int): Font size for chart text.
             view_img (bool): Whether to display the image.
             save_img (bool): Whether to save the image.
+            render_interval (int): Render the chart every n updates, data is still recorded on every update and
+                `close()` renders the last update if it was skipped.
+            max_points (int, optional): Maximum points of a line chart, the oldest half is decimated by 2 when reached.
+            threaded (bool): Whether to render and write charts on a background thread. If rendering falls more than
+                8 charts behind the updates, the oldest pending charts are skipped.
         """
 
         self.bg_color = bg_color
@@ -51,6 +76,27 @@ class Analytics:
         self.save_img = save_img
         self.title = title
         self.writer = writer
+        self.render_interval = max(int(render_interval), 1)
+        self.max_points = max_points
+        self.updates = 0  # number of update calls
+        self.skipped = None  # render job of the last update if it was skipped by render_interval
+        self.im0 = None  # last rendered chart
+
+        # Line data buffers, grown by doubling
+        self.x_data = np.zeros(1024, dtype=np.float64)
+        self.y_data = np.zeros(1024, dtype=np.float64)
+        self.n = 0
+        self.background = None  # cached line chart without the line, for blitting
+
+        # Background rendering thread and its bounded queue of pending render jobs
+        self.threaded = threaded
+        self.jobs = deque(maxlen=8)
+        self.job_ready = threading.Condition()
+        self.running = threaded
+        if threaded:
+            self.thread = threading.Thread(target=self._render_loop, daemon=True)
+            self.thread.start()
+            atexit.register(self.close)  # the thread holds a reference, so __del__ would never run
 
         # Set figure size based on image shape
         figsize = (im0_shape[0] / 100, im0_shape[1] / 100)
@@ -60,7 +106,7 @@ class Analytics:
             fig = Figure(facecolor=self.bg_color, figsize=figsize)
             self.canvas = FigureCanvas(fig)
             self.ax = fig.add_subplot(111, facecolor=self.bg_color)
-            (self.line,) = self.ax.plot([], [], color=line_color, linewidth=line_width)
+            (self.line,) = self.ax.plot([], [], color=line_color, linewidth=line_width, animated=True)
 
         elif type == "bar" or type == "pie":
             # Initialize bar or pie plot
@@ -91,6 +137,64 @@ class Analytics:
         self.ax.set_ylabel(y_label, color=self.fg_color, fontsize=fontsize - 3)
         self.ax.tick_params(axis="both", colors=self.fg_color)
 
+    def _render_loop(self):
+        """Background thread rendering the latest submitted job until `close()` is called."""
+        while True:
+            with self.job_ready:
+                while not self.jobs and self.running:
+                    self.job_ready.wait()
+                if not self.jobs:  # closed and nothing pending
+                    return
+                fn, *args = self.jobs.popleft()
+            fn(*args)
+
+    def _submit(self, fn, *args):
+        """Render with fn(*args) every `render_interval` updates, on the background thread if threaded."""
+        self.updates += 1
+        if self.updates % self.render_interval:
+            self.skipped = (fn, *args)
+            return
+        self.skipped = None
+        self._render(fn, *args)
+
+    def _render(self, fn, *args):
+        """Render with fn(*args) now, or queue it for the background thread while it runs."""
+        if not self.running:  # not threaded or already closed
+            fn(*args)
+            return
+        with self.job_ready:
+            self.jobs.append((fn, *args))  # drops the oldest pending job when full
+            self.job_ready.notify()
+        if self.view_img and self.im0 is not None:
+            cv2.imshow(self.title, self.im0)  # GUI calls stay on the calling thread
+
+    def _output(self, im0):
+        """Store, display and save a rendered chart."""
+        self.im0 = im0
+        if self.view_img and not self.running:  # on the calling thread
+            cv2.imshow(self.title, im0)
+        self.writer.write(im0) if self.save_img else None
+
+    def close(self):
+        """Render the pending charts and the last update skipped by `render_interval`, then stop the thread."""
+        if self.skipped is not None:
+            job, self.skipped = self.skipped, None
+            self._render(*job)
+        if self.threaded and self.running:
+            with self.job_ready:
+                self.running = False
+                self.job_ready.notify()
+            self.thread.join()
+            atexit.unregister(self.close)
+
+    def __enter__(self):
+        """Return the instance for use as a context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Render the pending charts and stop the background thread."""
+        self.close()
+
     def update_line(self, frame_number, total_counts):
         """
         Update the line graph with new data.
@@ -100,26 +204,61 @@ class Analytics:
             total_counts (int): The total counts to plot.
         """
 
-        # Update line graph data
-        x_data = self.line.get_xdata()
-        y_data = self.line.get_ydata()
-        x_data = np.append(x_data, float(frame_number))
-        y_data = np.append(y_data, float(total_counts))
-        self.line.set_data(x_data, y_data)
-        self.ax.relim()
-        self.ax.autoscale_view()
-        self.canvas.draw()
-        im0 = np.array(self.canvas.renderer.buffer_rgba())
-        im0 = cv2.cvtColor(im0[:, :, :3], cv2.COLOR_RGBA2BGR)
+        # Append to the line buffers, growing or decimating them with new arrays so pending renders keep their views
+        if self.max_points and self.n >= self.max_points:
+            keep = np.r_[np.arange(0, self.n // 2, 2), np.arange(self.n // 2, self.n)]  # decimate the oldest half
+        elif self.n == len(self.x_data):
+            keep = np.arange(self.n)
+        else:
+            keep = None
+        if keep is not None:
+            size = max(len(self.x_data), 2 * len(keep))
+            for name in ("x_data", "y_data"):
+                data = np.zeros(size, dtype=np.float64)
+                data[: len(keep)] = getattr(self, name)[keep]
+                setattr(self, name, data)
+            self.n = len(keep)
+        self.x_data[self.n], self.y_data[self.n] = float(frame_number), float(total_counts)
+        self.n += 1
+        self._submit(self._render_line, self.x_data[: self.n], self.y_data[: self.n])
+
+    def _render_line(self, x_data, y_data):
+        """
+        Render the line graph, redrawing the axes only when the data outgrows the current limits.
 
-        # Display and save the updated graph
-        cv2.imshow(self.title, im0) if self.view_img else None
-        self.writer.write(im0) if self.save_img else None
+        Args:
+            x_data (np.ndarray): X values.
+            y_data (np.ndarray): Y values.
+        """
+        self.line.set_data(x_data, y_data)
+        (_, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        xmin, xmax, ymin, ymax = x_data[0], x_data[-1], y_data.min(), y_data.max()
+        if self.background is None or xmax > x1 or ymax > y1 or ymin < y0:
+            # Grow the limits with headroom, so full redraws happen only O(log n) times
+            pad = max(ymax - ymin, 1) * 0.5
+            self.ax.set_xlim(xmin, xmin + max(2 * (xmax - xmin), 1))
+            self.ax.set_ylim(ymin - pad if ymin < 0 else max(ymin - pad, 0), ymax + pad)
+            self.canvas.draw()  # the animated line is excluded from the full draw
+            self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        else:
+            self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.line)
+        im0 = np.asarray(self.canvas.buffer_rgba())
+        self._output(cv2.cvtColor(im0, cv2.COLOR_RGBA2BGR))
 
     def update_bar(self, count_dict):
         """
         Update the bar graph with new data.
 
+        Args:
+            count_dict (dict): Dictionary containing the count data to plot.
+        """
+        self._submit(self._render_bar, dict(count_dict))
+
+    def _render_bar(self, count_dict):
+        """
+        Render the bar graph.
+
         Args:
             count_dict (dict): Dictionary containing the count data to plot.
         """
@@ -153,15 +292,21 @@ class Analytics:
         canvas.draw()
         buf = canvas.buffer_rgba()
         im0 = np.asarray(buf)
-        im0 = cv2.cvtColor(im0, cv2.COLOR_RGBA2BGR)
-
-        self.writer.write(im0) if self.save_img else None
-        cv2.imshow(self.title, im0) if self.view_img else None
+        self._output(cv2.cvtColor(im0, cv2.COLOR_RGBA2BGR))
 
     def update_pie(self, classes_dict):
         """
         Update the pie chart with new data.
 
+        Args:
+            classes_dict (dict): Dictionary containing the class data to plot.
+        """
+        self._submit(self._render_pie, dict(classes_dict))
+
+    def _render_pie(self, classes_dict):
+        """
+        Render the pie chart.
+
         Args:
             classes_dict (dict): Dictionary containing the class data to plot.
         """
@@ -188,9 +333,7 @@ class Analytics:
         # Display and save the updated chart
         im0 = self.fig.canvas.draw()
         im0 = np.array(self.fig.canvas.renderer.buffer_rgba())
-        im0 = cv2.cvtColor(im0[:, :, :3], cv2.COLOR_RGBA2BGR)
-        self.writer.write(im0) if self.save_img else None
-        cv2.imshow(self.title, im0) if self.view_img else None
+        self._output(cv2.cvtColor(im0[:, :, :3], cv2.COLOR_RGBA2BGR))
 
 
 if __name__ == "__main__":
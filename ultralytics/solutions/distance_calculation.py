@@ -3,13 +3,20 @@
 import math
 
 import cv2
+import numpy as np
 
 from ultralytics.utils.checks import check_imshow
 from ultralytics.utils.plotting import Annotator, colors
 
 
 class DistanceCalculation:
-    """A class to calculate distance between two objects in a real-time video stream based on their tracks."""
+    """
+    A class to calculate distance between two objects in a real-time video stream based on their tracks.
+
+    With a `proximity_thresh`, the distances between all tracked objects are computed every frame, from a dense
+    distance matrix for few objects or a KD-tree radius query for many, and pairs closer than the threshold are
+    reported as proximity events.
+    """
 
     def __init__(
         self,
@@ -19,6 +26,8 @@ class DistanceCalculation:
         line_thickness=2,
         line_color=(255, 255, 0),
         centroid_color=(255, 0, 255),
+        proximity_thresh=None,
+        proximity_color=(0, 0, 255),
     ):
         """
         Initializes the DistanceCalculation class with the given parameters.
@@ -30,6 +39,10 @@ class DistanceCalculation:
             line_thickness (int, optional): Thickness of the lines drawn on the image. Defaults to 2.
             line_color (tuple, optional): Color of the lines drawn on the image (BGR format). Defaults to (255, 255, 0).
             centroid_color (tuple, optional): Color of the centroids drawn (BGR format). Defaults to (255, 0, 255).
+            proximity_thresh (float, optional): Distance in meters under which all pairs of tracked objects are
+                reported as close. Defaults to None, measuring only the two mouse-selected objects.
+            proximity_color (tuple, optional): Color of the lines between close objects (BGR format).
+                Defaults to (0, 0, 255).
         """
         # Visual & image information
         self.im0 = None
@@ -49,6 +62,12 @@ class DistanceCalculation:
         self.centroids = []
         self.pixel_per_meter = pixels_per_meter
 
+        # Proximity information
+        self.proximity_thresh = proximity_thresh
+        self.proximity_color = proximity_color
+        self.close_pairs = {}  # (track_id, track_id) -> distance in meters of the pairs closer than the threshold
+        self.proximity_events = []  # (track_id, track_id, distance) of the pairs that became close this frame
+
         # Mouse event information
         self.left_mouse_count = 0
         self.selected_boxes = {}
@@ -118,6 +137,64 @@ class DistanceCalculation:
         distance_mm = distance_m * 1000
         return distance_m, distance_mm
 
+    def pairwise_distances(self, centroids, kdtree_min=64):
+        """
+        Finds all pairs of centroids closer than `proximity_thresh`.
+
+        Args:
+            centroids (np.ndarray): Centroids of shape (n, 2) in pixels.
+            kdtree_min (int): Number of objects from which a KD-tree radius query replaces the dense distance matrix.
+
+        Returns:
+            pairs (np.ndarray): Index pairs (i, j) with i < j of shape (m, 2).
+            distances (np.ndarray): Distances of the pairs in meters of shape (m, ).
+        """
+        radius = self.proximity_thresh * self.pixel_per_meter
+        if len(centroids) >= kdtree_min:
+            from scipy.spatial import cKDTree
+
+            pairs = cKDTree(centroids).query_pairs(radius, output_type="ndarray")
+        else:
+            d = np.linalg.norm(centroids[:, None] - centroids[None], axis=-1)
+            i, j = np.triu_indices(len(centroids), k=1)
+            pairs = np.stack((i, j), 1)[d[i, j] <= radius]
+        pairs = pairs.reshape(-1, 2)
+        distances = np.linalg.norm(centroids[pairs[:, 0]] - centroids[pairs[:, 1]], axis=-1) / self.pixel_per_meter
+        return pairs, distances
+
+    def update_proximity(self):
+        """
+        Updates the close pairs of the tracked objects and the proximity events of this frame.
+
+        Returns:
+            (list): Proximity events (track_id, track_id, distance) of the pairs that became close this frame.
+        """
+        centroids = ((self.boxes[:, :2] + self.boxes[:, 2:]) / 2).numpy().astype(np.float64)
+        pairs, distances = self.pairwise_distances(centroids)
+        ids = np.asarray(self.trk_ids)
+        ids = np.sort(ids[pairs], axis=1)  # order each pair by track id
+        close_pairs = dict(zip(map(tuple, ids.tolist()), distances.tolist()))
+        self.proximity_events = [(*k, d) for k, d in close_pairs.items() if k not in self.close_pairs]
+        self.close_pairs = close_pairs
+        return self.proximity_events
+
+    def plot_proximity(self):
+        """Draws a line and the distance between every pair of close objects."""
+        centroids = {t: self.calculate_centroid(box) for t, box in zip(self.trk_ids, self.boxes)}
+        for (a, b), distance in self.close_pairs.items():
+            p1, p2 = centroids[a], centroids[b]
+            cv2.line(self.im0, p1, p2, self.proximity_color, self.line_thickness)
+            cv2.putText(
+                self.im0,
+                f"{distance:.2f}m",
+                ((p1[0] + p2[0]) // 2, (p1[1] + p2[1]) // 2),
+                0,
+                self.line_thickness / 3,
+                self.proximity_color,
+                max(self.line_thickness - 1, 1),
+                cv2.LINE_AA,
+            )
+
     def start_process(self, im0, tracks):
         """
         Processes the video frame and calculates the distance between two bounding boxes.
@@ -131,6 +208,7 @@ class DistanceCalculation:
         """
         self.im0 = im0
         if tracks[0].boxes.id is None:
+            self.close_pairs, self.proximity_events = {}, []
             if self.view_img:
                 self.display_frames()
             return im0
@@ -156,6 +234,10 @@ class DistanceCalculation:
 
         self.centroids = []
 
+        if self.proximity_thresh is not None:
+            self.update_proximity()
+            self.plot_proximity()
+
         if self.view_img and self.env_check:
             self.display_frames()
 
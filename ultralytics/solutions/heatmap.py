@@ -1,10 +1,9 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-from collections import defaultdict
-
 import cv2
 import numpy as np
 
+from ultralytics.solutions.track_history import TrackHistory
 from ultralytics.utils.checks import check_imshow, check_requirements
 from ultralytics.utils.plotting import Annotator
 
@@ -35,6 +34,8 @@ class Heatmap:
         line_thickness=2,
         decay_factor=0.99,
         shape="circle",
+        heatmap_scale=1.0,
+        render_interval=1,
     ):
         """Initializes the heatmap class with default values for Visual, Image, track, count and heatmap parameters."""
 
@@ -58,12 +59,17 @@ class Heatmap:
         self.colormap = colormap
         self.heatmap = None
         self.heatmap_alpha = heatmap_alpha
+        self.heatmap_scale = heatmap_scale  # accumulation resolution relative to the frame
+        self.render_interval = max(int(render_interval), 1)  # colorize the heatmap every n frames
+        self.heatmap_colored = None  # last colorized heatmap at frame resolution
+        self.frames = 0
+        self.stamps = {}  # cached circular stamp kernels by radius
 
         # Predict/track information
         self.boxes = None
         self.track_ids = None
         self.clss = None
-        self.track_history = defaultdict(list)
+        self.track_history = TrackHistory()
 
         # Region & Line Information
         self.counting_region = None
@@ -80,8 +86,9 @@ class Heatmap:
         self.count_bg_color = count_bg_color
         self.cls_txtdisplay_gap = 50
 
-        # Decay factor
+        # Decay factor, applied lazily as a global scale of the stored heatmap
         self.decay_factor = decay_factor
+        self.decay = 1.0
 
         # Check if environment supports imshow
         self.env_check = check_imshow(warn=True)
@@ -118,22 +125,64 @@ class Heatmap:
         self.clss = tracks[0].boxes.cls.cpu().tolist()
         self.track_ids = tracks[0].boxes.id.int().cpu().tolist()
 
-    def generate_heatmap(self, im0, tracks):
+    def stamp(self, box):
+        """
+        Add the heat of one box to the heatmap, touching only the box window.
+
+        Args:
+            box (torch.Tensor): Box (x1, y1, x2, y2) in frame pixels.
+        """
+        box = [v * self.heatmap_scale for v in box.tolist()]
+        x1, y1, x2, y2 = (int(v) for v in box)
+        h, w = self.heatmap.shape
+        value = 2 / self.decay  # stored values are divided by the pending decay
+        if self.shape == "circle":
+            cx, cy = int((box[0] + box[2]) // 2), int((box[1] + box[3]) // 2)
+            r = min(x2 - x1, y2 - y1) // 2
+            if r not in self.stamps:
+                y, x = np.ogrid[-r : r + 1, -r : r + 1]
+                self.stamps[r] = (x**2 + y**2 <= r**2).astype(np.float32)
+            # Clip the stamp centred at (cx, cy) to both the box window and the heatmap
+            xa, xb = max(cx - r, x1, 0), min(cx + r + 1, x2, w)
+            ya, yb = max(cy - r, y1, 0), min(cy + r + 1, y2, h)
+            if xa < xb and ya < yb:
+                kernel = self.stamps[r][ya - cy + r : yb - cy + r, xa - cx + r : xb - cx + r]
+                self.heatmap[ya:yb, xa:xb] += value * kernel
+        else:
+            self.heatmap[max(y1, 0) : y2, max(x1, 0) : x2] += value
+
+    def render(self):
+        """Colorize the heatmap at frame resolution, min-max normalization makes the pending decay irrelevant here."""
+        heatmap_normalized = cv2.normalize(self.heatmap, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+        heatmap_colored = cv2.applyColorMap(heatmap_normalized, self.colormap)
+        if heatmap_colored.shape[:2] != self.im0.shape[:2]:
+            heatmap_colored = cv2.resize(heatmap_colored, (self.im0.shape[1], self.im0.shape[0]))
+        self.heatmap_colored = heatmap_colored
+
+    def generate_heatmap(self, im0, tracks, render=True):
         """
         Generate heatmap based on tracking data.
 
         Args:
             im0 (nd array): Image
             tracks (list): List of tracks obtained from the object tracking process.
+            render (bool): Whether to blend the heatmap into the returned image, skip it for frames that are neither
+                displayed nor written to accumulate only.
         """
         self.im0 = im0
 
         # Initialize heatmap only once
         if not self.initialized:
-            self.heatmap = np.zeros((int(self.im0.shape[0]), int(self.im0.shape[1])), dtype=np.float32)
+            h, w = self.im0.shape[:2]
+            shape = (max(round(h * self.heatmap_scale), 1), max(round(w * self.heatmap_scale), 1))
+            self.heatmap = np.zeros(shape, dtype=np.float32)
             self.initialized = True
 
-        self.heatmap *= self.decay_factor  # decay factor
+        # Lazy decay, renormalise the stored heatmap only once the pending scale gets small
+        self.decay *= self.decay_factor
+        if self.decay < 1e-4:
+            self.heatmap *= self.decay
+            self.decay = 1.0
 
         self.extract_results(tracks)
         self.annotator = Annotator(self.im0, self.tf, None)
@@ -145,32 +194,18 @@ class Heatmap:
                     reg_pts=self.count_reg_pts, color=self.region_color, thickness=self.region_thickness
                 )
 
+            # Store tracking hist
+            self.track_history.update(self.track_ids, ((self.boxes[:, :2] + self.boxes[:, 2:]) / 2).numpy())
+
             for box, cls, track_id in zip(self.boxes, self.clss, self.track_ids):
                 # Store class info
                 if self.names[cls] not in self.class_wise_count:
                     self.class_wise_count[self.names[cls]] = {"IN": 0, "OUT": 0}
 
-                if self.shape == "circle":
-                    center = (int((box[0] + box[2]) // 2), int((box[1] + box[3]) // 2))
-                    radius = min(int(box[2]) - int(box[0]), int(box[3]) - int(box[1])) // 2
+                self.stamp(box)
 
-                    y, x = np.ogrid[0 : self.heatmap.shape[0], 0 : self.heatmap.shape[1]]
-                    mask = (x - center[0]) ** 2 + (y - center[1]) ** 2 <= radius**2
-
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += (
-                        2 * mask[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])]
-                    )
-
-                else:
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += 2
-
-                # Store tracking hist
                 track_line = self.track_history[track_id]
-                track_line.append((float((box[0] + box[2]) / 2), float((box[1] + box[3]) / 2)))
-                if len(track_line) > 30:
-                    track_line.pop(0)
-
-                prev_position = self.track_history[track_id][-2] if len(self.track_history[track_id]) > 1 else None
+                prev_position = track_line[-2] if len(track_line) > 1 else None
 
                 if self.count_reg_pts is not None:
                     # Count objects in any polygon
@@ -204,20 +239,9 @@ class Heatmap:
                                     self.class_wise_count[self.names[cls]]["OUT"] += 1
 
         else:
+            self.track_history.update([], [])  # age the track history
             for box, cls in zip(self.boxes, self.clss):
-                if self.shape == "circle":
-                    center = (int((box[0] + box[2]) // 2), int((box[1] + box[3]) // 2))
-                    radius = min(int(box[2]) - int(box[0]), int(box[3]) - int(box[1])) // 2
-
-                    y, x = np.ogrid[0 : self.heatmap.shape[0], 0 : self.heatmap.shape[1]]
-                    mask = (x - center[0]) ** 2 + (y - center[1]) ** 2 <= radius**2
-
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += (
-                        2 * mask[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])]
-                    )
-
-                else:
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += 2
+                self.stamp(box)
 
         if self.count_reg_pts is not None:
             labels_dict = {}
@@ -236,10 +260,14 @@ class Heatmap:
             if labels_dict is not None:
                 self.annotator.display_analytics(self.im0, labels_dict, self.count_txt_color, self.count_bg_color, 10)
 
-        # Normalize, apply colormap to heatmap and combine with original image
-        heatmap_normalized = cv2.normalize(self.heatmap, None, 0, 255, cv2.NORM_MINMAX)
-        heatmap_colored = cv2.applyColorMap(heatmap_normalized.astype(np.uint8), self.colormap)
-        self.im0 = cv2.addWeighted(self.im0, 1 - self.heatmap_alpha, heatmap_colored, self.heatmap_alpha, 0)
+        self.frames += 1
+        if not render:
+            return self.im0
+
+        # Normalize, apply colormap to heatmap every render_interval frames and combine with original image
+        if self.heatmap_colored is None or self.frames % self.render_interval == 0:
+            self.render()
+        self.im0 = cv2.addWeighted(self.im0, 1 - self.heatmap_alpha, self.heatmap_colored, self.heatmap_alpha, 0)
 
         if self.env_check and self.view_img:
             self.display_frames()
@@ -3,13 +3,142 @@
 from collections import defaultdict
 
 import cv2
+import numpy as np
 
+from ultralytics.solutions.track_history import TrackHistory
 from ultralytics.utils.checks import check_imshow, check_requirements
+from ultralytics.utils.ops import inside_polygons
 from ultralytics.utils.plotting import Annotator, colors
 
 check_requirements("shapely>=2.0.0")
 
-from shapely.geometry import LineString, Point, Polygon
+from shapely.geometry import LineString, Polygon
+
+
+class CountingEngine:
+    """
+    Headless object counting core processing all tracks of a frame as arrays.
+
+    Every track moving from its previous to its current centre is counted once, when the movement segment crosses the
+    counting line or any polygon edge, when it ends inside the polygon, or when it ends within `line_dist_thresh` of
+    the line. The counts are returned as per-frame deltas, which `ObjectCounter` draws and headless callers can log.
+
+    Attributes:
+        reg_pts (np.ndarray): Points of the counting line (2) or polygon (>= 3), shape (n, 2).
+        is_polygon (bool): Whether the region is a polygon rather than a line.
+        centroid (np.ndarray): Region centroid, objects moving towards its x-coordinate are counted as IN.
+        line_dist_thresh (float): Distance to the line within which a track is counted.
+        in_counts (int): Total objects counted as IN.
+        out_counts (int): Total objects counted as OUT.
+        class_counts (dict): Class index -> [IN, OUT] counts.
+        counted (set): Counted IDs of the active tracks.
+        history (TrackHistory): Centre history of the tracks, counted IDs are dropped when their track is evicted.
+
+    Methods:
+        set_region: Set the counting line or polygon.
+        update: Count the tracks of one frame and return the count deltas.
+    """
+
+    def __init__(self, reg_pts, line_dist_thresh=15, history=None, max_age=None):
+        """
+        Initializes the counting engine.
+
+        Args:
+            reg_pts (list): Points of the counting line (2) or polygon (>= 3).
+            line_dist_thresh (float): Distance to the line within which a track is counted.
+            history (TrackHistory, optional): Track history to update and read previous centres from, i.e. one also
+                used for drawing track trails, defaults to a new history keeping two centres per track.
+            max_age (int, optional): Frames a new history keeps unseen tracks and their counted IDs, which must outlast
+                the lost-track buffer of the tracker, see `tracker_max_age()`.
+        """
+        self.line_dist_thresh = line_dist_thresh
+        self.in_counts = 0
+        self.out_counts = 0
+        self.class_counts = defaultdict(lambda: [0, 0])
+        self.counted = set()
+        self.history = TrackHistory(capacity=2, max_age=max_age) if history is None else history
+        self.set_region(reg_pts)
+
+    def set_region(self, reg_pts):
+        """
+        Set the counting line or polygon, precomputing its edges and centroid.
+
+        Args:
+            reg_pts (list): Points of the counting line (2) or polygon (>= 3).
+        """
+        self.reg_pts = np.asarray(reg_pts, dtype=np.float64).reshape(-1, 2)
+        self.is_polygon = len(self.reg_pts) >= 3
+        if self.is_polygon:
+            a, b = self.reg_pts, np.roll(self.reg_pts, -1, 0)
+            cross = a[:, 0] * b[:, 1] - b[:, 0] * a[:, 1]
+            area = cross.sum() / 2
+            self.centroid = ((a + b) * cross[:, None]).sum(0) / (6 * area) if area else self.reg_pts.mean(0)
+        else:
+            a, b = self.reg_pts[:-1], self.reg_pts[1:]
+            self.centroid = self.reg_pts.mean(0)
+        self.edges = a, b
+
+    @staticmethod
+    def cross(o, a, b):
+        """Z-component of the cross product (a - o) x (b - o), broadcast over leading dimensions."""
+        return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (a[..., 1] - o[..., 1]) * (b[..., 0] - o[..., 0])
+
+    def crosses(self, p, q):
+        """Return whether each segment p -> q, shape (n, 2), intersects any region edge."""
+        p, q = p[:, None], q[:, None]
+        a, b = self.edges[0][None], self.edges[1][None]
+        d1, d2 = self.cross(a, b, p), self.cross(a, b, q)
+        d3, d4 = self.cross(p, q, a), self.cross(p, q, b)
+        return ((d1 * d2 <= 0) & (d3 * d4 <= 0) & ((d1 != 0) | (d2 != 0))).any(1)
+
+    def inside(self, p):
+        """Return whether each point, shape (n, 2), lies inside the region polygon (even-odd rule)."""
+        return inside_polygons(p, *self.edges)[0]
+
+    def distance(self, p):
+        """Return the distance of each point, shape (n, 2), to the region line."""
+        a, b = self.edges[0][:, None], self.edges[1][:, None]
+        ab, ap = b - a, p[None] - a
+        t = ((ap * ab).sum(-1) / np.maximum((ab * ab).sum(-1), 1e-12)).clip(0, 1)
+        return np.linalg.norm(ap - t[..., None] * ab, axis=-1).min(0)
+
+    def update(self, boxes, track_ids, clss):
+        """
+        Count the tracks of one frame.
+
+        Args:
+            boxes (np.ndarray): Track boxes (x1, y1, x2, y2) of shape (n, 4).
+            track_ids (list | np.ndarray): Track IDs of shape (n, ).
+            clss (list | np.ndarray): Class indices of shape (n, ).
+
+        Returns:
+            (dict): Count deltas of this frame with keys 'in' and 'out' (int) and 'counted', a list of
+                (track_id, cls, 'IN' | 'OUT') tuples of the newly counted tracks.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        track_ids = [int(i) for i in track_ids]
+        centres = (boxes[:, :2] + boxes[:, 2:]) / 2
+        delta = {"in": 0, "out": 0, "counted": []}
+
+        # Tracks with a previous position that have not been counted yet
+        _, last, _ = self.history.last(1, track_ids)
+        prev = last[:, 0]
+        idx = [i for i, t in enumerate(track_ids) if t not in self.counted and not np.isnan(prev[i, 0])]
+        if idx:
+            prev, curr = prev[idx], centres[idx]
+            hit = self.crosses(prev, curr)
+            hit |= self.inside(curr) if self.is_polygon else self.distance(curr) < self.line_dist_thresh
+            inward = (boxes[idx, 0] - prev[:, 0]) * (self.centroid[0] - prev[:, 0]) > 0
+            for i, is_in in zip(np.array(idx)[hit], inward[hit]):
+                t, c = track_ids[i], int(clss[i])
+                self.counted.add(t)
+                self.class_counts[c][0 if is_in else 1] += 1
+                delta["in" if is_in else "out"] += 1
+                delta["counted"].append((t, c, "IN" if is_in else "OUT"))
+        self.in_counts += delta["in"]
+        self.out_counts += delta["out"]
+        self.counted.difference_update(self.history.update(track_ids, centres))
+        return delta
 
 
 class ObjectCounter:
@@ -32,6 +161,7 @@ class ObjectCounter:
         region_thickness=5,
         line_dist_thresh=15,
         cls_txtdisplay_gap=50,
+        max_age=None,
     ):
         """
         Initializes the ObjectCounter with various tracking and counting parameters.
@@ -52,6 +182,8 @@ class ObjectCounter:
             region_thickness (int): Thickness of the object counting region.
             line_dist_thresh (int): Euclidean distance threshold for line counter.
             cls_txtdisplay_gap (int): Display gap between each class count.
+            max_age (int, optional): Frames an unseen track keeps its trail and counted ID, defaults to the lost-track
+                buffer of the default tracker, pass `tracker_max_age(tracker, frame_rate)` for another tracker.
         """
 
         # Mouse events
@@ -77,9 +209,11 @@ class ObjectCounter:
         self.window_name = "Ultralytics YOLOv8 Object Counter"
 
         # Object counting Information
+        self.track_history = TrackHistory(max_age=max_age)
+        self.counter = CountingEngine(self.reg_pts, line_dist_thresh, self.track_history)  # headless counting core
         self.in_counts = 0
         self.out_counts = 0
-        self.count_ids = []
+        self.count_ids = self.counter.counted
         self.class_wise_count = {}
         self.count_txt_thickness = 0
         self.count_txt_color = count_txt_color
@@ -88,7 +222,6 @@ class ObjectCounter:
         self.fontsize = 0.6
 
         # Tracks info
-        self.track_history = defaultdict(list)
         self.track_thickness = track_thickness
         self.draw_tracks = draw_tracks
         self.track_color = track_color
@@ -134,14 +267,46 @@ class ObjectCounter:
             if self.is_drawing and self.selected_point is not None:
                 self.reg_pts[self.selected_point] = (x, y)
                 self.counting_region = Polygon(self.reg_pts)
+                self.counter.set_region(self.reg_pts)
 
         elif event == cv2.EVENT_LBUTTONUP:
             self.is_drawing = False
             self.selected_point = None
 
-    def extract_and_process_tracks(self, tracks):
-        """Extracts and processes tracks for object counting in a video stream."""
+    def count_tracks(self, tracks):
+        """
+        Counts the tracks of one frame without drawing anything.
+
+        Args:
+            tracks (list): List of tracks obtained from the object tracking process.
 
+        Returns:
+            (dict): Count deltas of this frame, see `CountingEngine.update()`.
+        """
+        if tracks[0].boxes.id is None:
+            return self.counter.update([], [], [])  # ages the track history
+        boxes = tracks[0].boxes.xyxy.cpu().numpy()
+        clss = tracks[0].boxes.cls.cpu().tolist()
+        track_ids = tracks[0].boxes.id.int().cpu().tolist()
+
+        # Store class info
+        for cls in clss:
+            if self.names[cls] not in self.class_wise_count:
+                self.class_wise_count[self.names[cls]] = {"IN": 0, "OUT": 0}
+
+        delta = self.counter.update(boxes, track_ids, clss)
+        for _, cls, direction in delta["counted"]:
+            self.class_wise_count[self.names[cls]][direction] += 1
+        self.in_counts, self.out_counts = self.counter.in_counts, self.counter.out_counts
+        return delta
+
+    def draw_annotations(self, tracks):
+        """
+        Draws the counting region, boxes, tracks and counts of one frame on `self.im0`.
+
+        Args:
+            tracks (list): List of tracks obtained from the object tracking process.
+        """
         # Annotator Init and region drawing
         self.annotator = Annotator(self.im0, self.tf, self.names)
 
@@ -153,59 +318,18 @@ class ObjectCounter:
             clss = tracks[0].boxes.cls.cpu().tolist()
             track_ids = tracks[0].boxes.id.int().cpu().tolist()
 
-            # Extract tracks
             for box, track_id, cls in zip(boxes, track_ids, clss):
                 # Draw bounding box
                 self.annotator.box_label(box, label=f"{self.names[cls]}#{track_id}", color=colors(int(track_id), True))
 
-                # Store class info
-                if self.names[cls] not in self.class_wise_count:
-                    self.class_wise_count[self.names[cls]] = {"IN": 0, "OUT": 0}
-
-                # Draw Tracks
-                track_line = self.track_history[track_id]
-                track_line.append((float((box[0] + box[2]) / 2), float((box[1] + box[3]) / 2)))
-                if len(track_line) > 30:
-                    track_line.pop(0)
-
                 # Draw track trails
                 if self.draw_tracks:
                     self.annotator.draw_centroid_and_tracks(
-                        track_line,
+                        self.track_history[track_id],
                         color=self.track_color if self.track_color else colors(int(track_id), True),
                         track_thickness=self.track_thickness,
                     )
 
-                prev_position = self.track_history[track_id][-2] if len(self.track_history[track_id]) > 1 else None
-
-                # Count objects in any polygon
-                if len(self.reg_pts) >= 3:
-                    is_inside = self.counting_region.contains(Point(track_line[-1]))
-
-                    if prev_position is not None and is_inside and track_id not in self.count_ids:
-                        self.count_ids.append(track_id)
-
-                        if (box[0] - prev_position[0]) * (self.counting_region.centroid.x - prev_position[0]) > 0:
-                            self.in_counts += 1
-                            self.class_wise_count[self.names[cls]]["IN"] += 1
-                        else:
-                            self.out_counts += 1
-                            self.class_wise_count[self.names[cls]]["OUT"] += 1
-
-                # Count objects using line
-                elif len(self.reg_pts) == 2:
-                    if prev_position is not None and track_id not in self.count_ids:
-                        distance = Point(track_line[-1]).distance(self.counting_region)
-                        if distance < self.line_dist_thresh and track_id not in self.count_ids:
-                            self.count_ids.append(track_id)
-
-                            if (box[0] - prev_position[0]) * (self.counting_region.centroid.x - prev_position[0]) > 0:
-                                self.in_counts += 1
-                                self.class_wise_count[self.names[cls]]["IN"] += 1
-                            else:
-                                self.out_counts += 1
-                                self.class_wise_count[self.names[cls]]["OUT"] += 1
-
         labels_dict = {}
 
         for key, value in self.class_wise_count.items():
@@ -222,6 +346,11 @@ class ObjectCounter:
         if labels_dict:
             self.annotator.display_analytics(self.im0, labels_dict, self.count_txt_color, self.count_bg_color, 10)
 
+    def extract_and_process_tracks(self, tracks):
+        """Extracts and processes tracks for object counting in a video stream."""
+        self.count_tracks(tracks)
+        self.draw_annotations(tracks)  # draw region even if no objects
+
     def display_frames(self):
         """Displays the current frame with annotations and regions in a window."""
         if self.env_check:
@@ -233,16 +362,19 @@ class ObjectCounter:
             if cv2.waitKey(1) & 0xFF == ord("q"):
                 return
 
-    def start_counting(self, im0, tracks):
+    def start_counting(self, im0, tracks, render=True):
         """
         Main function to start the object counting process.
 
         Args:
             im0 (ndarray): Current frame from the video stream.
             tracks (list): List of tracks obtained from the object tracking process.
+            render (bool): Whether to draw annotations on the frame, skip it to count headless.
         """
         self.im0 = im0  # store image
-        self.extract_and_process_tracks(tracks)  # draw region even if no objects
+        self.count_tracks(tracks)
+        if render:
+            self.draw_annotations(tracks)  # draw region even if no objects
 
         if self.view_img:
             self.display_frames()
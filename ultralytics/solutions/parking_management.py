@@ -1,4 +1,5 @@
 import json
+import time
 from tkinter import filedialog, messagebox
 
 import cv2
@@ -144,6 +145,198 @@ class ParkingPtsSelection:
         messagebox.showinfo("Success", "Bounding boxes saved to bounding_boxes.json")
 
 
+class ParkingOccupancy:
+    """
+    Vectorized parking slot occupancy engine.
+
+    Slot polygons are rasterised once per frame shape into a slot-ID mask, after which the slots containing the centres
+    of all detections are resolved with a single NumPy lookup instead of one point-in-polygon test per slot and box.
+    With a coverage threshold, every slot is instead rasterised once at reduced resolution into its own summed-area
+    table, so the fraction of each slot covered by each box is read for all pairs with a single NumPy gather.
+
+    Attributes:
+        regions (list): Parking regions, dicts with 'points' and an optional 'id'.
+        ids (np.ndarray): ID of each slot, the region 'id' or its index.
+        polygons (List[np.ndarray]): Slot polygons as int32 arrays of shape (n, 1, 2).
+        coverage_thresh (float): Minimum fraction of a slot covered by one box to occupy it, 0 uses the centre test.
+        stride (int): Downsampling factor of the coverage rasterisation.
+        mask (np.ndarray): Slot index + 1 of every pixel, 0 outside the slots, for the last frame shape.
+        tables (np.ndarray): Summed-area table of every slot over its reduced bounding box, shape (slots, h + 1, w + 1).
+        origins (np.ndarray): Reduced top-left corner (x, y) and size (w, h) of every slot table, shape (slots, 4).
+        areas (np.ndarray): Reduced area of every slot.
+
+    Methods:
+        rasterize: Build the slot-ID mask for a frame shape.
+        build_tables: Build the per-slot summed-area tables used for coverage.
+        coverage: Return the fraction of every slot covered by every box.
+        __call__: Return the occupied flag of every slot for a set of boxes.
+    """
+
+    def __init__(self, regions, coverage_thresh=0.0, stride=2):
+        """
+        Initializes the occupancy engine with the parking regions.
+
+        Args:
+            regions (list): Parking regions as loaded from the JSON file, dicts with 'points' and an optional 'id'.
+            coverage_thresh (float): Minimum fraction of a slot area covered by a single box for the slot to be
+                occupied, 0 marks slots containing a box centre as occupied instead.
+            stride (int): Downsampling factor of the coverage rasterisation, trading accuracy for speed and memory.
+        """
+        self.regions = regions
+        self.ids = np.array([region.get("id", i) for i, region in enumerate(regions)], dtype=object)
+        self.polygons = [np.array(region["points"], dtype=np.int32).reshape((-1, 1, 2)) for region in regions]
+        self.coverage_thresh = coverage_thresh
+        self.stride = max(int(stride), 1)
+        self.mask = None
+        self.tables = None
+
+    def rasterize(self, shape):
+        """
+        Build the slot-ID mask, later slots take precedence where polygons overlap.
+
+        Args:
+            shape (tuple): Frame shape (h, w) or (h, w, c).
+        """
+        self.mask = np.zeros(shape[:2], dtype=np.uint16 if len(self.polygons) < 65535 else np.int32)
+        for i, polygon in enumerate(self.polygons):
+            cv2.fillPoly(self.mask, [polygon], i + 1)
+
+    def build_tables(self):
+        """Rasterise every slot at 1/stride resolution over its own bounding box and build its summed-area table."""
+        shift = 4  # fractional bits of the sub-pixel polygon coordinates passed to cv2.fillPoly
+        polygons = [p.reshape(-1, 2) / self.stride - 0.5 for p in self.polygons]  # reduced grid, cell centres at ints
+        x0y0 = np.array([np.floor(p.min(0)) for p in polygons], dtype=np.int64).reshape(-1, 2)
+        wh = np.array([np.ceil(p.max(0)) for p in polygons], dtype=np.int64).reshape(-1, 2) - x0y0 + 1
+        w, h = wh.max(0) if len(wh) else (0, 0)
+        masks = np.zeros((len(polygons), h, w), dtype=np.uint8)
+        for mask, p, o in zip(masks, polygons, x0y0):
+            cv2.fillPoly(mask, [np.round((p - o) * (1 << shift)).astype(np.int32)], 1, shift=shift)
+        self.tables = np.zeros((len(polygons), h + 1, w + 1), dtype=np.int32)
+        self.tables[:, 1:, 1:] = masks.cumsum(1, dtype=np.int32).cumsum(2)
+        self.origins = np.concatenate((x0y0, wh), 1)
+        self.areas = np.maximum(self.tables[:, -1, -1], 1)
+
+    def coverage(self, boxes):
+        """
+        Return the fraction of every slot area covered by every box.
+
+        Args:
+            boxes (list | np.ndarray): Boxes (x1, y1, x2, y2) of shape (n, 4).
+
+        Returns:
+            (np.ndarray): Coverage fractions of shape (slots, n).
+        """
+        if self.tables is None:
+            self.build_tables()
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        # Reduced cells whose centres lie inside each box, as half-open index ranges local to every slot table
+        cells = np.ceil(boxes / self.stride - 0.5).astype(np.int64)
+        x1, y1, x2, y2 = (cells[None, :, i] - self.origins[:, i % 2, None] for i in range(4))
+        w, h = self.origins[:, 2, None], self.origins[:, 3, None]
+        x1, x2, y1, y2 = x1.clip(0, w), x2.clip(0, w), y1.clip(0, h), y2.clip(0, h)
+        s = np.arange(len(self.tables))[:, None]
+        t = self.tables
+        covered = t[s, y2, x2] - t[s, y1, x2] - t[s, y2, x1] + t[s, y1, x1]
+        return covered / self.areas[:, None]
+
+    def __call__(self, boxes, shape):
+        """
+        Return the occupied flag of every slot, a slot is occupied if it contains the centre of a box or, with a
+        coverage threshold, if a single box covers at least that fraction of its area.
+
+        Args:
+            boxes (list | np.ndarray): Boxes (x1, y1, x2, y2) of shape (n, 4).
+            shape (tuple): Frame shape (h, w) or (h, w, c).
+
+        Returns:
+            (np.ndarray): Boolean array of shape (slots, ), True for occupied slots.
+        """
+        if self.coverage_thresh > 0:
+            return (self.coverage(boxes) >= self.coverage_thresh).any(1)
+        if self.mask is None or self.mask.shape != tuple(shape[:2]):
+            self.rasterize(shape)
+        occupied = np.zeros(len(self.polygons) + 1, dtype=bool)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        h, w = self.mask.shape
+        x = ((boxes[:, 0] + boxes[:, 2]) / 2).astype(int).clip(0, w - 1)
+        y = ((boxes[:, 1] + boxes[:, 3]) / 2).astype(int).clip(0, h - 1)
+        occupied[self.mask[y, x]] = True
+        return occupied[1:]
+
+
+class SlotStateMachine:
+    """
+    Per-slot hysteresis state machine debouncing raw parking occupancy.
+
+    A slot only changes state once the opposite observation has persisted for `enter`/`exit` consecutive frames and for
+    at least `enter_time`/`exit_time` seconds, so single missed or spurious detections do not flip it. State is kept in
+    NumPy arrays and only the changes are reported.
+
+    Attributes:
+        ids (np.ndarray): ID of each slot, reported in the change events.
+        enter (int): Consecutive occupied observations needed to mark a free slot occupied.
+        exit (int): Consecutive free observations needed to mark an occupied slot free.
+        enter_time (float): Seconds an occupied observation must persist to mark a free slot occupied.
+        exit_time (float): Seconds a free observation must persist to mark an occupied slot free.
+        state (np.ndarray): Debounced occupied flag of every slot, None before the first update.
+        streak (np.ndarray): Number of consecutive observations disagreeing with the state of every slot.
+        since (np.ndarray): Timestamp of the first observation of the current disagreeing streak of every slot.
+
+    Methods:
+        update: Feed the raw occupancy of a frame and return the resulting change events.
+    """
+
+    def __init__(self, ids, enter=1, exit=1, enter_time=0.0, exit_time=0.0):
+        """
+        Initializes the state machine, the defaults follow the raw occupancy without smoothing.
+
+        Args:
+            ids (list | np.ndarray): ID of each slot.
+            enter (int): Consecutive occupied frames needed to mark a free slot occupied.
+            exit (int): Consecutive free frames needed to mark an occupied slot free.
+            enter_time (float): Seconds an occupied observation must persist to mark a free slot occupied.
+            exit_time (float): Seconds a free observation must persist to mark an occupied slot free.
+        """
+        self.ids = np.asarray(ids, dtype=object)
+        self.enter, self.exit = max(int(enter), 1), max(int(exit), 1)
+        self.enter_time, self.exit_time = enter_time, exit_time
+        self.state = None
+        self.streak = np.zeros(len(self.ids), dtype=np.int32)
+        self.since = np.zeros(len(self.ids), dtype=np.float64)
+
+    def update(self, observed, timestamp=None):
+        """
+        Feed the raw occupancy of one frame and return the resulting state changes.
+
+        The first update initializes every slot and reports it with an old state of None, so event-driven consumers
+        can build their snapshot from the events alone.
+
+        Args:
+            observed (np.ndarray): Raw occupied flag of every slot for this frame.
+            timestamp (float, optional): Frame time in seconds, defaults to the current time.
+
+        Returns:
+            (List[tuple]): Change events (slot_id, old, new, timestamp), with `old` and `new` as bools.
+        """
+        t = time.time() if timestamp is None else float(timestamp)
+        observed = np.asarray(observed, dtype=bool)
+        if self.state is None:
+            self.state = observed.copy()
+            return [(i, None, bool(new), t) for i, new in zip(self.ids.tolist(), observed)]
+
+        pending = observed != self.state
+        self.streak = np.where(pending, self.streak + 1, 0)
+        self.since = np.where(pending & (self.streak == 1), t, self.since)
+        frames = np.where(self.state, self.exit, self.enter)
+        seconds = np.where(self.state, self.exit_time, self.enter_time)
+        (changed,) = np.nonzero(pending & (self.streak >= frames) & (t - self.since >= seconds))
+        if not len(changed):
+            return []
+        self.state[changed] = observed[changed]
+        self.streak[changed] = 0
+        return [(self.ids[i], not new, bool(new), t) for i, new in zip(changed, observed[changed])]
+
+
 class ParkingManagement:
     def __init__(
         self,
@@ -153,6 +346,11 @@ class ParkingManagement:
         occupied_region_color=(0, 255, 0),
         available_region_color=(0, 0, 255),
         margin=10,
+        enter_frames=1,
+        exit_frames=1,
+        enter_time=0.0,
+        exit_time=0.0,
+        coverage_thresh=0.0,
     ):
         print("Initializing ParkingManagement")
         """
@@ -165,6 +363,12 @@ class ParkingManagement:
             occupied_region_color (tuple): RGB color tuple for occupied regions.
             available_region_color (tuple): RGB color tuple for available regions.
             margin (int): Margin for text display.
+            enter_frames (int): Consecutive occupied frames needed before a free slot is reported occupied.
+            exit_frames (int): Consecutive free frames needed before an occupied slot is reported free.
+            enter_time (float): Seconds a slot must be seen occupied before it is reported occupied.
+            exit_time (float): Seconds a slot must be seen free before it is reported free.
+            coverage_thresh (float): Fraction of a slot area a single box must cover to occupy it, 0 uses the box
+                centre point test.
         """
         # Model path and initialization
         self.model_path = model_path
@@ -186,6 +390,11 @@ class ParkingManagement:
 
         self.empty_space_ids = []
         print(f"Initialized empty_space_ids: {self.empty_space_ids}")
+        self.occupancy = None  # ParkingOccupancy engine of the current parking regions
+        self.coverage_thresh = coverage_thresh
+        self.smoothing = {"enter": enter_frames, "exit": exit_frames, "enter_time": enter_time, "exit_time": exit_time}
+        self.slot_states = None  # SlotStateMachine debouncing the occupancy of the current parking regions
+        self.events = []  # slot state change events (slot_id, old, new, timestamp) of the last processed frame
 
     def load_model(self):
         """Load the Ultralytics YOLOv8 model for inference and analytics."""
@@ -205,7 +414,7 @@ class ParkingManagement:
         with open(json_file, "r") as json_file:
             return json.load(json_file)
 
-    def process_data(self, json_data, im0, boxes, clss):
+    def process_data(self, json_data, im0, boxes, clss, timestamp=None):
         """
         Process the model data for parking lot management.
 
@@ -214,48 +423,37 @@ class ParkingManagement:
             im0 (ndarray): inference image
             boxes (list): bounding boxes data
             clss (list): bounding boxes classes list
+            timestamp (float, optional): frame time in seconds for time-based smoothing, defaults to the current time
         Returns:
             filled_slots (int): total slots that are filled in parking lot
             empty_slots (int): total slots that are available in parking lot
         """
+        if self.occupancy is None or (self.occupancy.regions is not json_data and self.occupancy.regions != json_data):
+            # Rasterised once and reused while the regions are unchanged
+            self.occupancy = ParkingOccupancy(json_data, self.coverage_thresh)
+            self.slot_states = SlotStateMachine(self.occupancy.ids, **self.smoothing)
+        self.events = self.slot_states.update(self.occupancy(boxes, im0.shape), timestamp)
+        occupied = self.slot_states.state
+
         annotator = Annotator(im0)
-        total_slots, filled_slots = len(json_data), 0
-        empty_slots = total_slots
-
-        available_ids = []  # 儲存未佔用停車位的 ID
-
-        for region in json_data:
-            points = region["points"]
-            region_id = region["id"]  # 獲取停車位的 ID
-            points_array = np.array(points, dtype=np.int32).reshape((-1, 1, 2))
-            region_occupied = False
-
-            for box, cls in zip(boxes, clss):
-                x_center = int((box[0] + box[2]) / 2)
-                y_center = int((box[1] + box[3]) / 2)
-                text = f"{self.model.names[int(cls)]}"
-
-                annotator.display_objects_labels(
-                    im0, text, self.txt_color, self.bg_color, x_center, y_center, self.margin
-                )
-                dist = cv2.pointPolygonTest(points_array, (x_center, y_center), False)
-                if dist >= 0:
-                    region_occupied = True
-                    break
+        for box, cls in zip(boxes, clss):
+            x_center = int((box[0] + box[2]) / 2)
+            y_center = int((box[1] + box[3]) / 2)
+            text = f"{self.model.names[int(cls)]}"
+            annotator.display_objects_labels(im0, text, self.txt_color, self.bg_color, x_center, y_center, self.margin)
 
+        for points_array, region_occupied in zip(self.occupancy.polygons, occupied):
             color = self.occupied_region_color if region_occupied else self.available_region_color
             cv2.polylines(im0, [points_array], isClosed=True, color=color, thickness=2)
-            if region_occupied:
-                filled_slots += 1
-                empty_slots -= 1
-            else:
-                available_ids.append(region_id)  # 將未佔用的停車位 ID 加入列表
 
+        filled_slots = int(occupied.sum())
+        empty_slots = len(occupied) - filled_slots
         self.labels_dict["Occupancy"] = filled_slots
         self.labels_dict["Available"] = empty_slots
-        self.empty_space_ids = available_ids
+        self.empty_space_ids = self.occupancy.ids[~occupied].tolist()  # 未佔用停車位的 ID
 
         annotator.display_analytics(im0, self.labels_dict, self.txt_color, self.bg_color, self.margin)
+        return filled_slots, empty_slots
 
     def display_frames(self, im0):
         """
@@ -1,15 +1,159 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-from collections import defaultdict
+from collections import deque
+from time import time
 
 import cv2
+import numpy as np
 
-from ultralytics.utils.checks import check_imshow, check_requirements
+from ultralytics.solutions.track_history import TrackHistory
+from ultralytics.utils.checks import check_imshow
+from ultralytics.utils.ops import inside_polygons
 from ultralytics.utils.plotting import Annotator, colors
 
-check_requirements("shapely>=2.0.0")
 
-from shapely.geometry import Point, Polygon
+class QueueEngine:
+    """
+    Headless queue analytics core testing all tracks of a frame against one or more queue polygons at once.
+
+    A track belongs to the first polygon containing its box centre. Entry times of the tracks are kept in arrays
+    indexed by their track history row, so the dwell time of every track in its queue is known on each frame, and the
+    total wait of a track is recorded once it leaves its queue or is evicted from the history. Queue lengths and wait
+    percentiles come from `stats()`, which `QueueManager` renders and services can poll per camera.
+
+    Attributes:
+        regions (List[np.ndarray]): Queue polygons of shape (n, 2) each.
+        edges (tuple): Start and end points of the edges of all polygons, shape (e, 2) each.
+        offsets (np.ndarray): Index of the first edge of every polygon.
+        history (TrackHistory): Centre history of the tracks, also providing the row of every track.
+        region (np.ndarray): Queue index of every history row, -1 outside all queues.
+        entered (np.ndarray): Time every history row entered its current queue, NaN outside all queues.
+        counts (np.ndarray): Number of tracks in every queue on the last frame.
+        waits (List[deque]): Last `max_waits` completed wait times of every queue.
+
+    Methods:
+        set_regions: Set the queue polygons.
+        inside: Return which polygons contain each point.
+        update: Assign the tracks of one frame to queues and update their dwell times.
+        stats: Return queue lengths and wait-time statistics.
+
+    Examples:
+        >>> engine = QueueEngine([[(0, 0), (100, 0), (100, 100), (0, 100)]])
+        >>> engine.update([1, 2], [[50, 50], [150, 50]], timestamp=0.0)  # track 1 enters the queue
+        >>> engine.update([1, 2], [[150, 50], [150, 50]], timestamp=4.0)  # and leaves it after 4 seconds
+        >>> engine.stats()  # queue lengths and wait-time percentiles
+    """
+
+    def __init__(self, regions, history=None, max_waits=10000):
+        """
+        Initializes the queue engine.
+
+        Args:
+            regions (list): Queue polygons, each a list of at least 3 (x, y) points.
+            history (TrackHistory, optional): Track history to update, i.e. one also used for drawing track trails,
+                defaults to a new history.
+            max_waits (int): Completed wait times kept per queue for the statistics.
+        """
+        self.history = TrackHistory() if history is None else history
+        self.max_waits = max_waits
+        self.region = np.zeros(0, dtype=np.int64)
+        self.entered = np.zeros(0, dtype=np.float64)
+        self.set_regions(regions)
+
+    def set_regions(self, regions):
+        """
+        Set the queue polygons, precomputing their edges and resetting the queue state.
+
+        Args:
+            regions (list): Queue polygons, each a list of at least 3 (x, y) points.
+        """
+        self.regions = [np.asarray(r, dtype=np.float64).reshape(-1, 2) for r in regions]
+        empty = [np.zeros((0, 2))]
+        self.edges = (
+            np.concatenate(self.regions or empty),
+            np.concatenate([np.roll(r, -1, 0) for r in self.regions] or empty),
+        )
+        self.offsets = np.cumsum([0] + [len(r) for r in self.regions[:-1]])
+        self.region[:] = -1
+        self.entered[:] = np.nan
+        self.counts = np.zeros(len(self.regions), dtype=np.int64)
+        self.waits = [deque(maxlen=self.max_waits) for _ in self.regions]
+
+    def inside(self, p):
+        """Return whether each point, shape (n, 2), lies inside each polygon (even-odd rule), shape (regions, n)."""
+        if not self.regions:
+            return np.zeros((0, len(p)), dtype=bool)
+        return inside_polygons(p, *self.edges, self.offsets)
+
+    def _leave(self, rows, until):
+        """Record the waits of the given history rows ending at times `until` and clear their queue state."""
+        for r, wait in zip(self.region[rows], until - self.entered[rows]):
+            self.waits[r].append(float(wait))
+        self.region[rows] = -1
+        self.entered[rows] = np.nan
+
+    def update(self, track_ids, points, timestamp=None):
+        """
+        Assign the tracks of one frame to queues and update their dwell times.
+
+        Args:
+            track_ids (list | np.ndarray): Track IDs of shape (n, ).
+            points (list | np.ndarray): Box centres (x, y) of shape (n, 2).
+            timestamp (float, optional): Time of the frame, defaults to the history frame index.
+
+        Returns:
+            (dict): Keys 'counts', the number of tracks in every queue, 'regions', the queue index of every track or -1,
+                and 'dwell', the time every track has spent in its current queue or NaN.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        rows_before = dict(self.history.rows)
+        evicted = self.history.update(track_ids, points, timestamp)
+        t = self.history.frame if timestamp is None else timestamp
+
+        # Grow the per-row state along with the history
+        n = len(self.history.lengths) - len(self.region)
+        if n > 0:
+            self.region = np.concatenate((self.region, np.full(n, -1, dtype=np.int64)))
+            self.entered = np.concatenate((self.entered, np.full(n, np.nan)))
+
+        # Evicted tracks leave their queue when they were last seen
+        rows = np.array([rows_before[i] for i in evicted], dtype=np.int64)
+        rows = rows[self.region[rows] >= 0]
+        if len(rows):
+            self._leave(rows, self.history.times[rows, (self.history.heads[rows] - 1) % self.history.capacity])
+
+        rows = np.array([self.history.rows[int(i)] for i in track_ids], dtype=np.int64)
+        inside = self.inside(points)
+        region = np.where(inside.any(0), inside.argmax(0), -1) if len(inside) else np.full(len(rows), -1)
+        changed = region != self.region[rows]
+        left = rows[changed & (self.region[rows] >= 0)]
+        if len(left):
+            self._leave(left, t)
+        entered = changed & (region >= 0)
+        self.region[rows[entered]] = region[entered]
+        self.entered[rows[entered]] = t
+
+        self.counts = np.bincount(region[region >= 0], minlength=len(self.regions))
+        return {"counts": self.counts, "regions": region, "dwell": t - self.entered[rows]}
+
+    def stats(self, q=(50, 90, 95)):
+        """
+        Return queue lengths and wait-time statistics of every queue.
+
+        Args:
+            q (tuple): Percentiles of the completed wait times to report.
+
+        Returns:
+            (List[dict]): Per queue, 'count' (tracks in the queue on the last frame), 'served' (completed waits
+                recorded), 'wait_mean' and 'wait_p{q}' for every percentile, NaN before the first completed wait.
+        """
+        out = []
+        for count, waits in zip(self.counts, self.waits):
+            w = np.fromiter(waits, dtype=np.float64, count=len(waits))
+            stats = {"count": int(count), "served": len(w), "wait_mean": float(w.mean()) if len(w) else np.nan}
+            stats.update(zip((f"wait_p{x}" for x in q), np.percentile(w, q).tolist() if len(w) else [np.nan] * len(q)))
+            out.append(stats)
+        return out
 
 
 class QueueManager:
@@ -29,14 +173,15 @@ class QueueManager:
         track_color=None,
         region_thickness=5,
         fontsize=0.7,
+        fps=None,
     ):
         """
         Initializes the QueueManager with specified parameters for tracking and counting objects.
 
         Args:
             classes_names (dict): A dictionary mapping class IDs to class names.
-            reg_pts (list of tuples, optional): Points defining the counting region polygon. Defaults to a predefined
-                rectangle.
+            reg_pts (list, optional): Points defining the queue polygon, or a list of such point lists for several
+                queues. Defaults to a predefined rectangle.
             line_thickness (int, optional): Thickness of the annotation lines. Defaults to 2.
             track_thickness (int, optional): Thickness of the track lines. Defaults to 2.
             view_img (bool, optional): Whether to display the image frames. Defaults to False.
@@ -48,6 +193,8 @@ class QueueManager:
                 tracks. Defaults to None.
             region_thickness (int, optional): Thickness of the counting region lines. Defaults to 5.
             fontsize (float, optional): Font size for the text annotations. Defaults to 0.7.
+            fps (float, optional): Source frame rate, frame times are the frame index / fps if no timestamps are
+                passed to `process_queue`. Defaults to None, using the wall-clock time.
         """
 
         # Mouse events state
@@ -56,9 +203,8 @@ class QueueManager:
 
         # Region & Line Information
         self.reg_pts = reg_pts if reg_pts is not None else [(20, 60), (20, 680), (1120, 680), (1120, 60)]
-        self.counting_region = (
-            Polygon(self.reg_pts) if len(self.reg_pts) >= 3 else Polygon([(20, 60), (20, 680), (1120, 680), (1120, 60)])
-        )
+        regions = self.reg_pts if np.ndim(self.reg_pts[0]) == 2 else [self.reg_pts]  # one or several polygons
+        self.regions = [r for r in regions if len(r) >= 3]
         self.region_color = region_color
         self.region_thickness = region_thickness
 
@@ -76,9 +222,12 @@ class QueueManager:
         # Object counting Information
         self.counts = 0
         self.count_txt_color = count_txt_color
+        self.fps = fps
+        self.frame = 0
 
         # Tracks info
-        self.track_history = defaultdict(list)
+        self.track_history = TrackHistory()
+        self.queue_engine = QueueEngine(self.regions, history=self.track_history)
         self.track_thickness = track_thickness
         self.draw_tracks = draw_tracks
         self.track_color = track_color
@@ -86,77 +235,92 @@ class QueueManager:
         # Check if environment supports imshow
         self.env_check = check_imshow(warn=True)
 
-    def extract_and_process_tracks(self, tracks):
-        """Extracts and processes tracks for queue management in a video stream."""
+    def extract_and_process_tracks(self, tracks, timestamp=None):
+        """
+        Extracts and processes tracks for queue management in a video stream.
+
+        Args:
+            tracks (list): List of tracks obtained from the object tracking process.
+            timestamp (float, optional): Source time of the frame in seconds, see `process_queue`.
+        """
 
         # Initialize annotator and draw the queue region
         self.annotator = Annotator(self.im0, self.tf, self.names)
 
+        if timestamp is None:
+            timestamp = self.frame / self.fps if self.fps else time()
+        self.frame += 1
+
         if tracks[0].boxes.id is not None:
             boxes = tracks[0].boxes.xyxy.cpu()
             clss = tracks[0].boxes.cls.cpu().tolist()
             track_ids = tracks[0].boxes.id.int().cpu().tolist()
 
-            # Extract tracks
-            for box, track_id, cls in zip(boxes, track_ids, clss):
-                # Draw bounding box
-                self.annotator.box_label(box, label=f"{self.names[cls]}#{track_id}", color=colors(int(track_id), True))
+            # Update track history and queue membership of all tracks at once
+            queue = self.queue_engine.update(track_ids, ((boxes[:, :2] + boxes[:, 2:]) / 2).numpy(), timestamp)
 
-                # Update track history
-                track_line = self.track_history[track_id]
-                track_line.append((float((box[0] + box[2]) / 2), float((box[1] + box[3]) / 2)))
-                if len(track_line) > 30:
-                    track_line.pop(0)
+            # Extract tracks
+            for box, track_id, cls, dwell in zip(boxes, track_ids, clss, queue["dwell"]):
+                # Draw bounding box, with the time spent in the queue for queued objects
+                label = f"{self.names[cls]}#{track_id}" + ("" if np.isnan(dwell) else f" {dwell:.1f}s")
+                self.annotator.box_label(box, label=label, color=colors(int(track_id), True))
 
                 # Draw track trails if enabled
                 if self.draw_tracks:
                     self.annotator.draw_centroid_and_tracks(
-                        track_line,
+                        self.track_history[track_id],
                         color=self.track_color or colors(int(track_id), True),
                         track_thickness=self.track_thickness,
                     )
-
-                prev_position = self.track_history[track_id][-2] if len(self.track_history[track_id]) > 1 else None
-
-                # Check if the object is inside the counting region
-                if len(self.reg_pts) >= 3:
-                    is_inside = self.counting_region.contains(Point(track_line[-1]))
-                    if prev_position is not None and is_inside:
-                        self.counts += 1
+        else:
+            self.queue_engine.update([], [], timestamp)  # age the track history and close stale waits
 
         # Display queue counts
-        label = f"Queue Counts : {str(self.counts)}"
-        if label is not None:
+        self.counts = int(self.queue_engine.counts.sum())
+        for pts, n in zip(self.regions or [self.reg_pts], self.queue_engine.counts.tolist() or [0]):
             self.annotator.queue_counts_display(
-                label,
-                points=self.reg_pts,
+                f"Queue Counts : {n}",
+                points=pts,
                 region_color=self.region_color,
                 txt_color=self.count_txt_color,
             )
-
-        self.counts = 0  # Reset counts after displaying
         self.display_frames()
 
+    def stats(self, q=(50, 90, 95)):
+        """
+        Return queue lengths and wait-time statistics of every queue, see `QueueEngine.stats()`.
+
+        Args:
+            q (tuple): Percentiles of the completed wait times in seconds to report.
+
+        Returns:
+            (List[dict]): Per queue, 'count', 'served', 'wait_mean' and 'wait_p{q}' for every percentile.
+        """
+        return self.queue_engine.stats(q)
+
     def display_frames(self):
         """Displays the current frame with annotations."""
         if self.env_check:
-            self.annotator.draw_region(reg_pts=self.reg_pts, thickness=self.region_thickness, color=self.region_color)
+            for pts in self.regions or [self.reg_pts]:
+                self.annotator.draw_region(reg_pts=pts, thickness=self.region_thickness, color=self.region_color)
             cv2.namedWindow(self.window_name)
             cv2.imshow(self.window_name, self.im0)
             # Close window on 'q' key press
             if cv2.waitKey(1) & 0xFF == ord("q"):
                 return
 
-    def process_queue(self, im0, tracks):
+    def process_queue(self, im0, tracks, timestamp=None):
         """
         Main function to start the queue management process.
 
         Args:
             im0 (ndarray): Current frame from the video stream.
             tracks (list): List of tracks obtained from the object tracking process.
+            timestamp (float, optional): Source time of the frame in seconds, i.e. the video position. Defaults to
+                the frame index / fps, or the wall-clock time if `fps` is not set.
         """
         self.im0 = im0  # Store the current frame
-        self.extract_and_process_tracks(tracks)  # Extract and process tracks
+        self.extract_and_process_tracks(tracks, timestamp)  # Extract and process tracks
 
         if self.view_img:
             self.display_frames()  # Display the frame if enabled
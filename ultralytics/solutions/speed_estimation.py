@@ -1,19 +1,38 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-from collections import defaultdict
-from time import time
-
 import cv2
 import numpy as np
 
+from ultralytics.solutions.track_history import TrackHistory
+from ultralytics.utils import LOGGER
 from ultralytics.utils.checks import check_imshow
 from ultralytics.utils.plotting import Annotator, colors
 
 
 class SpeedEstimator:
-    """A class to estimate the speed of objects in a real-time video stream based on their tracks."""
-
-    def __init__(self, names, reg_pts=None, view_img=False, line_thickness=2, region_thickness=5, spdl_dist_thresh=10):
+    """
+    A class to estimate the speed of objects in a real-time video stream based on their tracks.
+
+    The speed of a track is measured once, when it first comes within `spdl_dist_thresh` of the speed line `reg_pts`,
+    from its displacement over the last `speed_window` positions divided by the elapsed source time. All tracks are
+    handled in one vectorized pass over the track history. Time comes from explicit frame timestamps, or from the
+    frame index and `fps`, so offline runs faster than real time still report correct speeds. Displacements are
+    converted to metres by an image-to-ground-plane homography, or by a fixed `meter_per_pixel` scale without one.
+    """
+
+    def __init__(
+        self,
+        names,
+        reg_pts=None,
+        view_img=False,
+        line_thickness=2,
+        region_thickness=5,
+        spdl_dist_thresh=10,
+        fps=None,
+        homography=None,
+        speed_window=5,
+        meter_per_pixel=0.05,
+    ):
         """
         Initializes the SpeedEstimator with the given parameters.
 
@@ -23,7 +42,13 @@ class SpeedEstimator:
             view_img (bool, optional): Whether to display the image with annotations. Defaults to False.
             line_thickness (int, optional): Thickness of the lines for drawing boxes and tracks. Defaults to 2.
             region_thickness (int, optional): Thickness of the region lines. Defaults to 5.
-            spdl_dist_thresh (int, optional): Distance threshold for speed calculation. Defaults to 10.
+            spdl_dist_thresh (int, optional): Vertical distance to the speed line within which a track's speed is
+                measured. Defaults to 10.
+            fps (float, optional): Source frame rate, frame times are the frame index / fps if no timestamps are
+                passed to `estimate_speed()`. Defaults to None, assuming the 30 FPS fallback of the video loaders.
+            homography (np.ndarray, optional): 3x3 matrix mapping image pixels to ground-plane metres. Defaults to None.
+            speed_window (int, optional): Number of track steps the speed is averaged over. Defaults to 5.
+            meter_per_pixel (float, optional): Metres per pixel used without a homography. Defaults to 0.05.
         """
         # Visual & image information
         self.im0 = None
@@ -41,15 +66,16 @@ class SpeedEstimator:
         self.trk_ids = None
         self.trk_pts = None
         self.line_thickness = line_thickness
-        self.trk_history = defaultdict(list)
+        self.trk_history = TrackHistory()
 
         # Speed estimation information
-        self.current_time = 0
-        self.dist_data = {}
-        self.trk_idslist = []
+        self.frame = 0
+        self.fps = fps
+        self.homography = None if homography is None else np.asarray(homography, dtype=np.float64).reshape(3, 3)
+        self.speed_window = max(int(speed_window), 1)
+        self.meter_per_pixel = meter_per_pixel
+        self.dist_data = {}  # measured speed of every track
         self.spdl_dist_thresh = spdl_dist_thresh
-        self.trk_previous_times = {}
-        self.trk_previous_points = {}
 
         # Check if the environment supports imshow
         self.env_check = check_imshow(warn=True)
@@ -65,6 +91,18 @@ class SpeedEstimator:
         self.clss = tracks[0].boxes.cls.cpu().tolist()
         self.trk_ids = tracks[0].boxes.id.int().cpu().tolist()
 
+    def update_track_history(self, trk_ids, points, timestamp):
+        """
+        Stores the box centres of all tracks of a frame and drops the state of evicted tracks.
+
+        Args:
+            trk_ids (list): Object track ids.
+            points (np.ndarray): Box centres of shape (n, 2).
+            timestamp (float): Frame time in seconds.
+        """
+        for trk_id in self.trk_history.update(trk_ids, points, timestamp):
+            self.dist_data.pop(trk_id, None)
+
     def store_track_info(self, track_id, box):
         """
         Stores track data.
@@ -74,16 +112,10 @@ class SpeedEstimator:
             box (list): Object bounding box data.
 
         Returns:
-            (list): Updated tracking history for the given track_id.
+            (np.ndarray): Tracking history for the given track_id, oldest first.
         """
         track = self.trk_history[track_id]
-        bbox_center = (float((box[0] + box[2]) / 2), float((box[1] + box[3]) / 2))
-        track.append(bbox_center)
-
-        if len(track) > 30:
-            track.pop(0)
-
-        self.trk_pts = np.hstack(track).astype(np.int32).reshape((-1, 1, 2))
+        self.trk_pts = track.astype(np.int32).reshape((-1, 1, 2))
         return track
 
     def plot_box_and_track(self, track_id, box, cls, track):
@@ -103,36 +135,58 @@ class SpeedEstimator:
         cv2.polylines(self.im0, [self.trk_pts], isClosed=False, color=(0, 255, 0), thickness=1)
         cv2.circle(self.im0, (int(track[-1][0]), int(track[-1][1])), 5, bbox_color, -1)
 
-    def calculate_speed(self, trk_id, track):
+    def to_ground(self, points):
         """
-        Calculates the speed of an object.
+        Maps image points to the ground plane with the homography.
 
         Args:
-            trk_id (int): Object track id.
-            track (list): Tracking history for drawing tracks path.
+            points (np.ndarray): Image points of shape (n, 2).
+
+        Returns:
+            (np.ndarray): Ground-plane points of shape (n, 2).
         """
-        if not self.reg_pts[0][0] < track[-1][0] < self.reg_pts[1][0]:
-            return
-        if self.reg_pts[1][1] - self.spdl_dist_thresh < track[-1][1] < self.reg_pts[1][1] + self.spdl_dist_thresh:
-            direction = "known"
-        elif self.reg_pts[0][1] - self.spdl_dist_thresh < track[-1][1] < self.reg_pts[0][1] + self.spdl_dist_thresh:
-            direction = "known"
-        else:
-            direction = "unknown"
+        p = np.concatenate((points, np.ones((len(points), 1))), 1) @ self.homography.T
+        return p[:, :2] / p[:, 2:]
 
-        if self.trk_previous_times.get(trk_id) != 0 and direction != "unknown" and trk_id not in self.trk_idslist:
-            self.trk_idslist.append(trk_id)
+    def on_speed_line(self, points):
+        """
+        Checks which points lie within `spdl_dist_thresh` of the speed line, between the x-coordinates of its ends.
+
+        Args:
+            points (np.ndarray): Image points of shape (n, 2).
+
+        Returns:
+            (np.ndarray): Boolean array of shape (n, ).
+        """
+        (x1, y1), (x2, y2) = self.reg_pts[0], self.reg_pts[1]
+        x, y = points[:, 0], points[:, 1]
+        near = (np.abs(y - y1) < self.spdl_dist_thresh) | (np.abs(y - y2) < self.spdl_dist_thresh)
+        return (x1 < x) & (x < x2) & near
 
-            time_difference = time() - self.trk_previous_times[trk_id]
-            if time_difference > 0:
-                dist_difference = np.abs(track[-1][1] - self.trk_previous_points[trk_id][1])
-                speed = dist_difference / time_difference
-                self.dist_data[trk_id] = speed
+    def calculate_speeds(self, trk_ids):
+        """
+        Measures the speeds of tracks reaching the speed line from their stored history in one vectorized pass.
 
-        self.trk_previous_times[trk_id] = time()
-        self.trk_previous_points[trk_id] = track[-1]
+        Args:
+            trk_ids (list): Object track ids.
 
-    def estimate_speed(self, im0, tracks, region_color=(255, 0, 0)):
+        Returns:
+            (np.ndarray): Measured speeds in km/h, NaN for tracks that have not reached the speed line yet.
+        """
+        _, points, times = self.trk_history.last(self.speed_window + 1, trk_ids)
+        i = np.arange(len(points))
+        first = np.isnan(times).argmin(1)  # oldest stored position within the window
+        p0, p1, dt = points[i, first], points[:, -1], times[:, -1] - times[i, first]
+        new = self.on_speed_line(p1) & np.array([t not in self.dist_data for t in trk_ids], dtype=bool)
+        if self.homography is not None:
+            p0, p1 = self.to_ground(p0), self.to_ground(p1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speeds = np.where(dt > 0, np.linalg.norm(p1 - p0, axis=1) / dt, np.nan)  # pixels or metres per second
+        speeds *= 3.6 if self.homography is not None else 3.6 * self.meter_per_pixel  # to km/h
+        self.dist_data.update((t, v) for t, v, n in zip(trk_ids, speeds.tolist(), new) if n and not np.isnan(v))
+        return np.array([self.dist_data.get(t, np.nan) for t in trk_ids], dtype=np.float64)
+
+    def estimate_speed(self, im0, tracks, region_color=(255, 0, 0), timestamp=None):
         """
         Estimates the speed of objects based on tracking data.
 
@@ -140,28 +194,37 @@ class SpeedEstimator:
             im0 (ndarray): Image.
             tracks (list): List of tracks obtained from the object tracking process.
             region_color (tuple, optional): Color to use when drawing regions. Defaults to (255, 0, 0).
+            timestamp (float, optional): Source time of the frame in seconds, i.e. the video position. Defaults to
+                the frame index / fps.
 
         Returns:
             (ndarray): The image with annotated boxes and tracks.
         """
         self.im0 = im0
+        self.frame += 1
+        if timestamp is None:
+            if not self.fps:
+                LOGGER.warning(
+                    "WARNING ⚠️ SpeedEstimator 'fps' not set, assuming 30 FPS like the video loaders. Pass the source "
+                    "'fps' or per-frame timestamps for correct speeds."
+                )
+                self.fps = 30
+            timestamp = self.frame / self.fps
         if tracks[0].boxes.id is None:
+            self.update_track_history([], [], timestamp)  # age the track history
             if self.view_img and self.env_check:
                 self.display_frames()
             return im0
 
         self.extract_tracks(tracks)
+        self.update_track_history(self.trk_ids, ((self.boxes[:, :2] + self.boxes[:, 2:]) / 2).numpy(), timestamp)
+        self.calculate_speeds(self.trk_ids)
         self.annotator = Annotator(self.im0, line_width=self.line_thickness)
         self.annotator.draw_region(reg_pts=self.reg_pts, color=region_color, thickness=self.region_thickness)
 
         for box, trk_id, cls in zip(self.boxes, self.trk_ids, self.clss):
             track = self.store_track_info(trk_id, box)
-
-            if trk_id not in self.trk_previous_times:
-                self.trk_previous_times[trk_id] = 0
-
             self.plot_box_and_track(trk_id, box, cls, track)
-            self.calculate_speed(trk_id, track)
 
         if self.view_img and self.env_check:
             self.display_frames()
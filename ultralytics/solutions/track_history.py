@@ -0,0 +1,186 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import numpy as np
+
+from ultralytics.utils import yaml_load
+from ultralytics.utils.checks import check_yaml
+
+
+def tracker_max_age(tracker="botsort.yaml", frame_rate=30):
+    """
+    Return the frames a tracker may re-find a lost track after, the least `max_age` that keeps its ID in a history.
+
+    The trackers keep lost tracks for `frame_rate / 30 * track_buffer` frames and can still match them on the next one.
+
+    Args:
+        tracker (str): Tracker configuration file, as passed to `model.track()`.
+        frame_rate (int): Frame rate of the tracked video.
+
+    Returns:
+        (int): Frames a track may go unseen and come back with the same ID.
+    """
+    track_buffer = yaml_load(check_yaml(tracker))["track_buffer"]
+    return int(frame_rate / 30.0 * track_buffer) + 1
+
+
+DEFAULT_MAX_AGE = tracker_max_age()  # history length of unseen tracks, re-found by the default tracker until then
+
+
+class TrackHistory:
+    """
+    Bounded, array-backed history of track positions shared by the solutions.
+
+    Every track owns one row of a preallocated NumPy ring buffer holding its last `capacity` positions and their
+    timestamps. Tracks not seen for more than `max_age` frames are evicted and their rows reused, so memory stays
+    bounded on long-running streams, and the last positions or velocities of many tracks are read in one call. The
+    default `max_age` outlasts the lost-track buffer of the default tracker, so a re-found track keeps its history.
+
+    Attributes:
+        capacity (int): Positions kept per track.
+        max_age (int): Frames a track may go unseen before it is evicted.
+        points (np.ndarray): Ring buffer of positions, shape (rows, capacity, 2).
+        times (np.ndarray): Ring buffer of timestamps, shape (rows, capacity).
+        lengths (np.ndarray): Number of stored positions of every row.
+        heads (np.ndarray): Next write index of every row.
+        last_seen (np.ndarray): Frame index of the last update of every row.
+        rows (dict): Track ID -> row index of the active tracks.
+        frame (int): Number of processed frames.
+
+    Methods:
+        update: Append the positions of all tracks of one frame and evict stale tracks.
+        last: Return the last k positions of tracks, oldest first.
+        velocity: Return the velocity of tracks over their last k steps.
+
+    Examples:
+        >>> history = TrackHistory(capacity=30, max_age=30)
+        >>> history.update([1, 2], [[10, 10], [50, 50]])
+        >>> history.update([1, 2], [[12, 10], [50, 55]])
+        >>> history[1]  # positions of track 1, oldest first
+        >>> ids, v = history.velocity()  # per-frame velocity of all active tracks
+    """
+
+    def __init__(self, capacity=30, max_age=None, rows=64):
+        """
+        Initializes the track history.
+
+        Args:
+            capacity (int): Positions kept per track.
+            max_age (int, optional): Frames a track may go unseen before it is evicted, defaults to `DEFAULT_MAX_AGE`.
+            rows (int): Initially allocated tracks, the buffers double when more are active.
+        """
+        self.capacity = capacity
+        self.max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+        self.points = np.zeros((rows, capacity, 2), dtype=np.float32)
+        self.times = np.zeros((rows, capacity), dtype=np.float64)
+        self.lengths = np.zeros(rows, dtype=np.int64)
+        self.heads = np.zeros(rows, dtype=np.int64)
+        self.last_seen = np.zeros(rows, dtype=np.int64)
+        self.rows = {}
+        self.free = list(range(rows - 1, -1, -1))
+        self.frame = 0
+
+    def __len__(self):
+        """Return the number of active tracks."""
+        return len(self.rows)
+
+    def __contains__(self, track_id):
+        """Return whether a track is active."""
+        return track_id in self.rows
+
+    def __getitem__(self, track_id):
+        """Return the stored positions of a track, oldest first, or an empty (0, 2) array for unknown tracks."""
+        if track_id not in self.rows:
+            return np.zeros((0, 2), dtype=np.float32)
+        row = self.rows[track_id]
+        n = self.lengths[row]
+        return self.points[row, (self.heads[row] - n + np.arange(n)) % self.capacity]
+
+    def _grow(self):
+        """Double the number of rows of all buffers."""
+        n = len(self.lengths)
+        self.points = np.concatenate((self.points, np.zeros_like(self.points)))
+        self.times = np.concatenate((self.times, np.zeros_like(self.times)))
+        self.lengths, self.heads, self.last_seen = (
+            np.concatenate((x, np.zeros_like(x))) for x in (self.lengths, self.heads, self.last_seen)
+        )
+        self.free.extend(range(2 * n - 1, n - 1, -1))
+
+    def update(self, track_ids, points, timestamp=None):
+        """
+        Append the positions of all tracks of one frame and evict tracks unseen for more than `max_age` frames.
+
+        Args:
+            track_ids (list | np.ndarray): Track IDs of shape (n, ).
+            points (list | np.ndarray): Positions (x, y) of shape (n, 2), i.e. box centres.
+            timestamp (float, optional): Time of the frame, defaults to the frame index.
+
+        Returns:
+            (List[int]): IDs of the evicted tracks, so callers can drop their own per-track state.
+        """
+        self.frame += 1
+        track_ids = [int(i) for i in track_ids]
+        for t in track_ids:
+            if t not in self.rows:
+                if not self.free:
+                    self._grow()
+                row = self.free.pop()
+                self.lengths[row] = self.heads[row] = 0
+                self.rows[t] = row
+        if track_ids:
+            rows = np.array([self.rows[t] for t in track_ids])
+            self.points[rows, self.heads[rows]] = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+            self.times[rows, self.heads[rows]] = self.frame if timestamp is None else timestamp
+            self.heads[rows] = (self.heads[rows] + 1) % self.capacity
+            self.lengths[rows] = np.minimum(self.lengths[rows] + 1, self.capacity)
+            self.last_seen[rows] = self.frame
+
+        evicted = [t for t, row in self.rows.items() if self.frame - self.last_seen[row] > self.max_age]
+        for t in evicted:
+            self.free.append(self.rows.pop(t))
+        return evicted
+
+    def _select(self, track_ids):
+        """Return the requested or all active track IDs with their rows, -1 for unknown tracks."""
+        if track_ids is None:
+            track_ids = list(self.rows)
+        rows = np.array([self.rows.get(int(t), -1) for t in track_ids], dtype=np.int64)
+        return np.asarray(track_ids, dtype=np.int64), rows
+
+    def last(self, k=2, track_ids=None):
+        """
+        Return the last k positions of tracks, oldest first.
+
+        Args:
+            k (int): Number of positions, at most `capacity`.
+            track_ids (list, optional): Tracks to return in this order, defaults to all active tracks.
+
+        Returns:
+            ids (np.ndarray): Track IDs of shape (n, ).
+            points (np.ndarray): Positions of shape (n, k, 2), NaN where a track has fewer than k positions.
+            times (np.ndarray): Timestamps of shape (n, k), NaN where a track has fewer than k positions.
+        """
+        ids, rows = self._select(track_ids)
+        lengths = np.where(rows >= 0, self.lengths[rows], 0)
+        offset = np.arange(k) - k  # -k..-1 relative to the head
+        index = (self.heads[rows, None] + offset) % self.capacity
+        valid = offset >= -lengths[:, None]
+        points = np.where(valid[..., None], self.points[rows[:, None], index], np.nan)
+        times = np.where(valid, self.times[rows[:, None], index], np.nan)
+        return ids, points, times
+
+    def velocity(self, k=1, track_ids=None):
+        """
+        Return the velocity of tracks over their last k steps, in position units per timestamp unit.
+
+        Args:
+            k (int): Number of steps, at most `capacity - 1`.
+            track_ids (list, optional): Tracks to return in this order, defaults to all active tracks.
+
+        Returns:
+            ids (np.ndarray): Track IDs of shape (n, ).
+            velocity (np.ndarray): Velocities (vx, vy) of shape (n, 2), NaN for tracks with fewer than k + 1 positions.
+        """
+        ids, points, times = self.last(k + 1, track_ids)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            velocity = (points[:, -1] - points[:, 0]) / (times[:, -1] - times[:, 0])[:, None]
+        return ids, velocity
@@ -2,6 +2,7 @@
 
 from .bot_sort import BOTSORT
 from .byte_tracker import BYTETracker
+from .soa_tracker import SoATracker
 from .track import register_tracker
 
-__all__ = "register_tracker", "BOTSORT", "BYTETracker"  # allow simpler import
+__all__ = "register_tracker", "BOTSORT", "BYTETracker", "SoATracker"  # allow simpler import
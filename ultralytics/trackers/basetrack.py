@@ -44,6 +44,7 @@ class BaseTrack:
     Methods:
         end_frame: Returns the ID of the last frame where the object was tracked.
         next_id: Increments and returns the next global track ID.
+        next_ids: Increments the global track ID counter by n and returns the n new IDs.
         activate: Abstract method to activate the track.
         predict: Abstract method to predict the next state of the track.
         update: Abstract method to update the track with new data.
@@ -79,6 +80,12 @@ class BaseTrack:
         BaseTrack._count += 1
         return BaseTrack._count
 
+    @staticmethod
+    def next_ids(n):
+        """Increment the global track ID counter by n and return the n new IDs."""
+        BaseTrack._count += n
+        return np.arange(BaseTrack._count - n + 1, BaseTrack._count + 1)
+
     def activate(self, *args):
         """Abstract method to activate the track with provided arguments."""
         raise NotImplementedError
@@ -1,7 +1,5 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-from collections import deque
-
 import numpy as np
 
 from .basetrack import TrackState
@@ -9,6 +7,7 @@ from .byte_tracker import BYTETracker, STrack
 from .utils import matching
 from .utils.gmc import GMC
 from .utils.kalman_filter import KalmanFilterXYWH
+from .utils.reid import FeatureStore
 
 
 class BOTrack(STrack):
@@ -17,10 +16,10 @@ class BOTrack(STrack):
 
     Attributes:
         shared_kalman (KalmanFilterXYWH): A shared Kalman filter for all instances of BOTrack.
+        store (FeatureStore): Array-backed store of the smoothed and past feature vectors of tracks.
+        row (int): Row of the track in `store`, -1 until the track has features, its past features are `store[row]`.
         smooth_feat (np.ndarray): Smoothed feature vector.
         curr_feat (np.ndarray): Current feature vector.
-        features (deque): A deque to store feature vectors with a maximum length defined by `feat_history`.
-        alpha (float): Smoothing factor for the exponential moving average of features.
         mean (np.ndarray): The mean state of the Kalman filter.
         covariance (np.ndarray): The covariance matrix of the Kalman filter.
 
@@ -35,34 +34,39 @@ class BOTrack(STrack):
         tlwh_to_xywh(tlwh): Convert bounding box to xywh format `(center x, center y, width, height)`.
 
     Usage:
-        bo_track = BOTrack(tlwh, score, cls, feat)
+        bo_track = BOTrack(tlwh, score, cls, feat, store)
         bo_track.predict()
         bo_track.update(new_track, frame_id)
     """
 
     shared_kalman = KalmanFilterXYWH()
 
-    def __init__(self, tlwh, score, cls, feat=None, feat_history=50):
-        """Initialize YOLOv8 object with temporal parameters, such as feature history, alpha and current features."""
+    def __init__(self, tlwh, score, cls, feat=None, store=None):
+        """Initialize YOLOv8 object with current features and the store that keeps the features of tracks."""
         super().__init__(tlwh, score, cls)
 
-        self.smooth_feat = None
-        self.curr_feat = None
-        if feat is not None:
-            self.update_features(feat)
-        self.features = deque([], maxlen=feat_history)
-        self.alpha = 0.9
+        self.store = FeatureStore(history=50) if store is None else store
+        self.row = -1
+        self.curr_feat = None if feat is None else feat / np.linalg.norm(feat)
+
+    @property
+    def smooth_feat(self):
+        """Smoothed feature vector, the current one until the track has features."""
+        return self.curr_feat if self.row < 0 else self.store.smooth[self.row]
 
     def update_features(self, feat):
         """Update features vector and smooth it using exponential moving average."""
-        feat /= np.linalg.norm(feat)
-        self.curr_feat = feat
-        if self.smooth_feat is None:
-            self.smooth_feat = feat
+        self.curr_feat = feat / np.linalg.norm(feat)
+        if self.row < 0:
+            self.row = int(self.store.add(self.curr_feat[None])[0])
         else:
-            self.smooth_feat = self.alpha * self.smooth_feat + (1 - self.alpha) * feat
-        self.features.append(feat)
-        self.smooth_feat /= np.linalg.norm(self.smooth_feat)
+            self.store.update([self.row], self.curr_feat[None])
+
+    def activate(self, kalman_filter, frame_id):
+        """Start a new tracklet and store its features."""
+        super().activate(kalman_filter, frame_id)
+        if self.curr_feat is not None:
+            self.update_features(self.curr_feat)
 
     def predict(self):
         """Predicts the mean and covariance using Kalman filter."""
@@ -130,6 +134,7 @@ class BOTSORT(BYTETracker):
         proximity_thresh (float): Threshold for spatial proximity (IoU) between tracks and detections.
         appearance_thresh (float): Threshold for appearance similarity (ReID embeddings) between tracks and detections.
         encoder (object): Object to handle ReID embeddings, set to None if ReID is not enabled.
+        feature_store (FeatureStore): Array-backed appearance features of the tracks.
         gmc (GMC): An instance of the GMC algorithm for data association.
         args (object): Parsed command-line arguments containing tracking parameters.
 
@@ -138,6 +143,8 @@ class BOTSORT(BYTETracker):
         init_track(dets, scores, cls, img): Initialize track with detections, scores, and classes.
         get_dists(tracks, detections): Get distances between tracks and detections using IoU and (optionally) ReID.
         multi_predict(tracks): Predict and track multiple objects with YOLOv8 model.
+        update(results, img): Update the tracker and free the features of dropped tracks.
+        reset(): Reset the tracker, the GMC and the feature store.
 
     Usage:
         bot_sort = BOTSORT(args, frame_rate)
@@ -155,10 +162,16 @@ class BOTSORT(BYTETracker):
         self.proximity_thresh = args.proximity_thresh
         self.appearance_thresh = args.appearance_thresh
 
-        if args.with_reid:
-            # Haven't supported BoT-SORT(reid) yet
-            self.encoder = None
-        self.gmc = GMC(method=args.gmc_method)
+        # ReID encoder with an inference(img, dets) method, i.e. a NeckEmbedder set by the tracking callbacks
+        self.encoder = None
+        self.feature_store = FeatureStore(history=50)
+        self.gmc = GMC(
+            method=args.gmc_method,
+            interval=getattr(args, "gmc_interval", 1),
+            static=getattr(args, "gmc_static", 0),
+            mask=getattr(args, "gmc_mask", False),
+            regions=getattr(args, "gmc_regions", None),
+        )
 
     def get_kalmanfilter(self):
         """Returns an instance of KalmanFilterXYWH for object tracking."""
@@ -170,7 +183,9 @@ class BOTSORT(BYTETracker):
             return []
         if self.args.with_reid and self.encoder is not None:
             features_keep = self.encoder.inference(img, dets)
-            return [BOTrack(xyxy, s, c, f) for (xyxy, s, c, f) in zip(dets, scores, cls, features_keep)]  # detections
+            return [
+                BOTrack(xyxy, s, c, f, self.feature_store) for (xyxy, s, c, f) in zip(dets, scores, cls, features_keep)
+            ]  # detections
         else:
             return [BOTrack(xyxy, s, c) for (xyxy, s, c) in zip(dets, scores, cls)]  # detections
 
@@ -194,7 +209,14 @@ class BOTSORT(BYTETracker):
         """Predict and track multiple objects with YOLOv8 model."""
         BOTrack.multi_predict(tracks)
 
+    def update(self, results, img=None):
+        """Updates the tracker with new detections and frees the features of dropped tracks."""
+        tracks = super().update(results, img)
+        self.feature_store.retain([t.row for t in self.tracked_stracks + self.lost_stracks if t.row >= 0])
+        return tracks
+
     def reset(self):
         """Reset tracker."""
         super().reset()
         self.gmc.reset_params()
+        self.feature_store.clear()
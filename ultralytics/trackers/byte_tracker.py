@@ -228,6 +228,7 @@ class BYTETracker:
 
     Methods:
         update(results, img=None): Updates object tracker with new detections.
+        predict(): Advances the tracks by one frame without detections.
         get_kalmanfilter(): Returns a Kalman filter object for tracking bounding boxes.
         init_track(dets, scores, cls, img=None): Initialize object tracking with detections.
         get_dists(tracks, detections): Calculates the distance between tracks and detections.
@@ -364,6 +365,21 @@ class BYTETracker:
 
         return np.asarray([x.result for x in self.tracked_stracks if x.is_activated], dtype=np.float32)
 
+    def predict(self):
+        """
+        Advance the tracks by one frame with the Kalman filter only, for frames whose detections were not computed.
+
+        Tracks are neither matched, started nor marked lost, so a frame skipped by the motion gate carries them forward
+        instead of feeding them the detections of an earlier frame.
+
+        Returns:
+            (np.ndarray): Predicted confirmed tracks as returned by `update()`, the detection index refers to the frame
+                of their last update.
+        """
+        self.frame_id += 1
+        self.multi_predict(self.joint_stracks(self.tracked_stracks, self.lost_stracks))
+        return np.asarray([x.result for x in self.tracked_stracks if x.is_activated], dtype=np.float32)
+
     def get_kalmanfilter(self):
         """Returns a Kalman filter object for tracking bounding boxes."""
         return KalmanFilterXYAH()
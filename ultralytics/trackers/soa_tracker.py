@@ -0,0 +1,612 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import numpy as np
+
+from ..utils.metrics import batch_probiou, bbox_ioa
+from .basetrack import BaseTrack, TrackState
+from .utils import matching
+from .utils.kalman_filter import KalmanFilterXYAH
+
+
+class TrackStore:
+    """
+    Structure-of-arrays storage of the live tracks of a tracker.
+
+    Every field is a preallocated NumPy array with one row per track, rows [0, n) are in use. Rows are appended at the
+    end, capacity doubles when full, and `keep` compacts the arrays in place, so per-frame operations on all tracks are
+    single vectorized calls instead of loops over track objects.
+
+    Attributes:
+        n (int): Number of tracks in use.
+        mean (np.ndarray): Kalman filter state means, shape (capacity, 8).
+        covariance (np.ndarray): Kalman filter state covariances, shape (capacity, 8, 8).
+        track_id (np.ndarray): Track IDs.
+        state (np.ndarray): TrackState of every track.
+        activated (np.ndarray): Whether every track is confirmed.
+        score (np.ndarray): Confidence of the last matched detection.
+        cls (np.ndarray): Class of the last matched detection.
+        idx (np.ndarray): Index of the last matched detection in its frame.
+        angle (np.ndarray): Angle of the last matched oriented detection, NaN for axis-aligned boxes.
+        frame_id (np.ndarray): Frame of the last update.
+        start_frame (np.ndarray): Frame the track was started.
+        tracklet_len (np.ndarray): Number of consecutive updates.
+        order (np.ndarray): Position key of every track within the tracked or lost track list of its stream.
+        stream (np.ndarray): Index of the stream every track belongs to.
+
+    Methods:
+        append: Reserve rows for new tracks.
+        keep: Compact the store to the given rows.
+        clear: Remove all tracks.
+    """
+
+    fields = (  # name, row shape and dtype of every array
+        ("mean", (8,), np.float64),
+        ("covariance", (8, 8), np.float64),
+        ("track_id", (), np.int64),
+        ("state", (), np.int64),
+        ("activated", (), bool),
+        ("score", (), np.float32),
+        ("cls", (), np.float32),
+        ("idx", (), np.float32),
+        ("angle", (), np.float32),
+        ("frame_id", (), np.int64),
+        ("start_frame", (), np.int64),
+        ("tracklet_len", (), np.int64),
+        ("order", (), np.int64),
+        ("stream", (), np.int64),
+    )
+
+    def __init__(self, capacity=64):
+        """
+        Initializes an empty store.
+
+        Args:
+            capacity (int): Initially allocated rows, doubled when more tracks are stored.
+        """
+        self.n = 0
+        for k, shape, dtype in self.fields:
+            setattr(self, k, np.zeros((capacity, *shape), dtype=dtype))
+
+    def __len__(self):
+        """Return the number of stored tracks."""
+        return self.n
+
+    @property
+    def capacity(self):
+        """Return the number of allocated rows."""
+        return len(self.track_id)
+
+    def append(self, m):
+        """
+        Reserve m rows at the end of the store, growing the arrays if needed.
+
+        Args:
+            m (int): Number of rows.
+
+        Returns:
+            (np.ndarray): Indices of the new rows.
+        """
+        if self.n + m > self.capacity:
+            capacity = max(2 * self.capacity, self.n + m)
+            for k, *_ in self.fields:
+                old = getattr(self, k)
+                new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+                new[: self.n] = old[: self.n]
+                setattr(self, k, new)
+        rows = np.arange(self.n, self.n + m)
+        self.n += m
+        return rows
+
+    def keep(self, rows):
+        """
+        Compact the store in place to the given rows, in this order.
+
+        Args:
+            rows (np.ndarray): Indices of the rows to keep.
+        """
+        for k, *_ in self.fields:
+            a = getattr(self, k)
+            a[: len(rows)] = a[rows]
+        self.n = len(rows)
+
+    def clear(self):
+        """Remove all tracks."""
+        self.n = 0
+
+
+class SoATracker:
+    """
+    BYTETracker with all track state held in a structure-of-arrays TrackStore, optionally for many streams at once.
+
+    Implements the same two-stage ByteTrack association as BYTETracker and returns the same results, but Kalman
+    prediction, global motion compensation, measurement updates, cost matrices and the tracked/lost list operations are
+    single vectorized calls over all tracks instead of per-STrack Python loops, which keeps the per-frame overhead low
+    in dense scenes with hundreds of tracks. Selected with `tracker_type: bytetrack_soa`.
+
+    With `streams > 1` one tracker holds the tracks of many cameras in the same store, tagged by stream index.
+    `update_batch` then runs Kalman prediction and updates for all cameras in single calls, computes the IoU costs of
+    all cameras as one padded (streams, tracks, detections) array, and only solves the assignments per camera. Every
+    stream keeps its own frame counter and lists, so results are those of one tracker per stream.
+
+    Attributes:
+        tracks (TrackStore): Tracked and lost tracks of all streams, removed tracks are dropped.
+        streams (int): Number of streams.
+        frame_ids (np.ndarray): The current frame ID of every stream.
+        args (namespace): Tracker arguments.
+        max_time_lost (int): The maximum frames for a track to be considered as 'lost'.
+        kalman_filter (KalmanFilterXYAH): Kalman filter shared by all tracks.
+        removed_ids (List[np.ndarray]): IDs of the last removed tracks of every stream, at most 1000 each.
+        sparse_size (int): Track-detection pairs of an association above which only overlapping pairs are scored.
+
+    Methods:
+        update(results, img=None, stream=0): Updates one stream with new detections.
+        update_batch(results, imgs=None, streams=None): Updates several streams with new detections at once.
+        predict(stream=0): Advances the tracks of one stream by one frame without detections.
+        predict_batch(streams=None): Advances the tracks of several streams by one frame without detections.
+        get_kalmanfilter(): Returns a Kalman filter object for tracking bounding boxes.
+        init_track(dets, scores, cls, idx): Convert detections into measurement arrays.
+        associate(rows, detections, n, thresh, fuse=True): Matches tracks to detections of the same stream by IoU.
+        multi_predict(rows): Predicts the location of tracks.
+        multi_gmc(rows, H): Applies a camera motion homography to tracks.
+        reset(stream=None): Resets the tracker or one stream.
+
+    Examples:
+        >>> from ultralytics import YOLO
+        >>> model = YOLO("yolov8n.pt")
+        >>> results = model.track("path/to/video.mp4", tracker="bytetrack_soa.yaml")
+        >>> tracker = SoATracker(args, streams=32)  # one tracker for 32 cameras
+        >>> tracks = tracker.update_batch(boxes, streams=range(32))  # list of per-camera results
+    """
+
+    def __init__(self, args, frame_rate=30, streams=1):
+        """
+        Initialize the tracker with the given arguments and frame rate.
+
+        Args:
+            args (namespace): Tracker arguments.
+            frame_rate (int): Frame rate of the streams.
+            streams (int): Number of streams tracked by this tracker.
+        """
+        self.tracks = TrackStore()
+        self.streams = streams
+        self.frame_ids = np.zeros(streams, dtype=np.int64)
+        self.args = args
+        self.max_time_lost = int(frame_rate / 30.0 * args.track_buffer)
+        self.kalman_filter = self.get_kalmanfilter()
+        self.removed_ids = [np.zeros(0, dtype=np.int64) for _ in range(streams)]
+        self.sparse_size = getattr(args, "sparse_size", 100000)
+        self._order = 0  # next list position key
+        self.reset_id()
+
+    @property
+    def frame_id(self):
+        """The current frame ID of the first stream."""
+        return int(self.frame_ids[0])
+
+    def get_kalmanfilter(self):
+        """Returns a Kalman filter object for tracking bounding boxes."""
+        return KalmanFilterXYAH()
+
+    @staticmethod
+    def convert_coords(xywh):
+        """Convert boxes (x, y, w, h) of shape (n, 4) to Kalman filter measurements (x, y, aspect, h)."""
+        xyah = xywh.astype(np.float64)
+        xyah[:, 2] /= xyah[:, 3]
+        return xyah
+
+    @staticmethod
+    def state_to_xywh(mean):
+        """Convert Kalman filter states of shape (n, 8) to boxes (x, y, w, h)."""
+        xywh = mean[:, :4].copy()
+        xywh[:, 2] *= xywh[:, 3]
+        return xywh
+
+    def init_track(self, dets, scores, cls, idx):
+        """
+        Convert detections into the arrays used for association and track creation.
+
+        Args:
+            dets (np.ndarray): Boxes (x, y, w, h) or oriented boxes (x, y, w, h, angle) of shape (n, 4 | 5).
+            scores (np.ndarray): Confidences of shape (n, ).
+            cls (np.ndarray): Classes of shape (n, ).
+            idx (np.ndarray): Indices of the detections in the frame, shape (n, ).
+
+        Returns:
+            (dict): Detection arrays 'xywh', 'angle' (NaN for axis-aligned boxes), 'score', 'cls', 'idx' and
+                'measurement'.
+        """
+        xywh = dets[:, :4].astype(np.float32)
+        return {
+            "xywh": xywh,
+            "angle": dets[:, 4] if dets.shape[1] == 5 else np.full(len(dets), np.nan, dtype=np.float32),
+            "score": scores,
+            "cls": cls,
+            "idx": idx,
+            "measurement": self.convert_coords(xywh),
+        }
+
+    @staticmethod
+    def _boxes(xywh, angle):
+        """Return xywha boxes for oriented boxes or xyxy boxes otherwise, as float32."""
+        if len(angle) and not np.isnan(angle[0]):
+            return np.concatenate((xywh, angle[:, None]), 1).astype(np.float32)
+        return np.concatenate((xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2), 1).astype(np.float32)
+
+    def track_boxes(self, rows):
+        """Return the predicted boxes of the given track rows, see `_boxes()`."""
+        return self._boxes(self.state_to_xywh(self.tracks.mean[rows]), self.tracks.angle[rows])
+
+    @staticmethod
+    def _pad(x, n):
+        """Scatter rows of x, grouped by stream with n[i] rows for stream i, into a zero-padded (streams, max(n), ...)
+        array.
+        """
+        stream = np.repeat(np.arange(len(n)), n)
+        pos = np.arange(len(x)) - (np.cumsum(n) - n)[stream]
+        out = np.zeros((len(n), n.max(initial=0), *x.shape[1:]), dtype=x.dtype)
+        out[stream, pos] = x
+        return out
+
+    def iou_distance(self, a, b, na, nb):
+        """
+        Return the IoU cost 1 - IoU between boxes a and b of the same stream, probabilistic IoU for oriented boxes.
+
+        Args:
+            a (np.ndarray): Boxes grouped by stream, na[i] of them for stream i.
+            b (np.ndarray): Boxes grouped by stream, nb[i] of them for stream i.
+            na (np.ndarray): Number of boxes a of every stream.
+            nb (np.ndarray): Number of boxes b of every stream.
+
+        Returns:
+            (np.ndarray): Costs of shape (streams, max(na), max(nb)), 1 for padding.
+        """
+        pa, pb = self._pad(a, na), self._pad(b, nb)
+        if not pa.size or not pb.size:
+            return np.ones(pa.shape[:2] + pb.shape[1:2], dtype=np.float32)
+        if a.shape[1] == 5 and b.shape[1] == 5:
+            iou = np.stack([batch_probiou(x, y).numpy() for x, y in zip(pa, pb)])
+        else:
+            iou = bbox_ioa(pa, pb, iou=True)
+        valid = (np.arange(pa.shape[1]) < na[:, None])[:, :, None] & (np.arange(pb.shape[1]) < nb[:, None])[:, None]
+        return np.where(valid, 1 - iou, 1).astype(np.float32)
+
+    def sparse(self, a, b, na, nb, thresh):
+        """Return whether to only score overlapping axis-aligned boxes, beyond `sparse_size` pairs and thresh <= 1."""
+        return a.shape[1] == b.shape[1] == 4 and thresh <= 1 and (na * nb).sum() > self.sparse_size
+
+    def iou_pairs(self, a, b, na, nb, thresh):
+        """
+        Return the pairs of boxes a and b of the same stream with an IoU cost below `thresh`.
+
+        Args:
+            a (np.ndarray): Boxes grouped by stream, na[i] of them for stream i.
+            b (np.ndarray): Boxes grouped by stream, nb[i] of them for stream i.
+            na (np.ndarray): Number of boxes a of every stream.
+            nb (np.ndarray): Number of boxes b of every stream.
+            thresh (float): Maximum cost.
+
+        Returns:
+            i (np.ndarray): Indices into a.
+            j (np.ndarray): Indices into b.
+            cost (np.ndarray): IoU costs of the pairs.
+        """
+        if self.sparse(a, b, na, nb, thresh):
+            g = np.arange(len(na))
+            i, j, cost = matching.sparse_iou_distance(a, b, np.repeat(g, na), np.repeat(g, nb))
+            below = cost < thresh
+            return i[below], j[below], cost[below]
+        dists = self.iou_distance(a, b, na, nb)
+        g, i, j = np.nonzero(dists < thresh)
+        return i + (np.cumsum(na) - na)[g], j + (np.cumsum(nb) - nb)[g], dists[g, i, j]
+
+    def associate(self, rows, detections, n, thresh, fuse=True):
+        """
+        Match track rows, grouped by stream, to detections of the same stream by IoU.
+
+        Costs of streams holding more than `sparse_size` track-detection pairs are only computed for overlapping boxes,
+        found on a spatial grid, and every connected component of these pairs is solved on its own. Smaller problems
+        are solved densely per stream. Candidates are pruned by box overlap, not by Kalman gating, because
+        non-overlapping pairs can never match anyway and the tracks stay identical to those of BYTETracker.
+
+        Args:
+            rows (np.ndarray): Track rows grouped by stream.
+            detections (dict): Detection arrays grouped by stream, see `init_track()`.
+            n (np.ndarray): Number of detections of every stream.
+            thresh (float): Maximum cost of a match.
+            fuse (bool): Whether to fuse the IoU costs with the detection scores.
+
+        Returns:
+            matches (np.ndarray): Matched (track, detection) indices into rows and detections, shape (k, 2).
+            u_track (np.ndarray): Unmatched track indices.
+            u_detection (np.ndarray): Unmatched detection indices.
+        """
+        a, b = self.track_boxes(rows), self._boxes(detections["xywh"], detections["angle"])
+        na = np.bincount(self._group[rows], minlength=len(n))
+        if self.sparse(a, b, na, n, thresh):
+            i, j, cost = self.iou_pairs(a, b, na, n, thresh)
+            if fuse:
+                cost = 1 - (1 - cost) * detections["score"][j]
+            return matching.sparse_linear_assignment(i, j, cost, (len(a), len(b)), thresh)
+
+        dists = self.iou_distance(a, b, na, n)
+        if fuse:
+            dists = 1 - (1 - dists) * self._pad(detections["score"], n)[:, None]
+        sa, sb = np.cumsum(na) - na, np.cumsum(n) - n
+        matches, u_a, u_b = [], [], []
+        for i in np.flatnonzero(na | n):
+            m, ua, ub = matching.linear_assignment(dists[i, : na[i], : n[i]], thresh=thresh)
+            matches.append(np.asarray(m, dtype=int).reshape(-1, 2) + (sa[i], sb[i]))
+            u_a.append(np.asarray(ua, dtype=int) + sa[i])
+            u_b.append(np.asarray(ub, dtype=int) + sb[i])
+
+        def cat(x, *shape):
+            """Concatenate the per-stream index arrays, or return an empty one of the given shape."""
+            return np.concatenate(x) if x else np.zeros(shape, dtype=int)
+
+        return cat(matches, 0, 2), cat(u_a, 0), cat(u_b, 0)
+
+    def multi_predict(self, rows):
+        """Predict the next state of the given track rows with the Kalman filter."""
+        if len(rows):
+            t = self.tracks
+            mean = t.mean[rows]
+            mean[t.state[rows] != TrackState.Tracked, 7] = 0
+            t.mean[rows], t.covariance[rows] = self.kalman_filter.multi_predict(mean, t.covariance[rows])
+
+    def multi_gmc(self, rows, H=None):
+        """Update the positions and covariances of the given track rows with a camera motion homography."""
+        if H is not None and len(rows):  # no homography is the identity
+            t = self.tracks
+            R8x8 = np.kron(np.eye(4, dtype=float), H[:2, :2])
+            t.mean[rows] = t.mean[rows] @ R8x8.T
+            t.mean[rows, :2] += H[:2, 2]
+            t.covariance[rows] = R8x8 @ t.covariance[rows] @ R8x8.T
+
+    def _update(self, rows, detections, didx):
+        """Update matched track rows with detections `didx`, returning the rows that were lost and are refound."""
+        t = self.tracks
+        if not len(rows):
+            return rows
+        refind = t.state[rows] != TrackState.Tracked
+        t.mean[rows], t.covariance[rows] = self.kalman_filter.multi_update(
+            t.mean[rows], t.covariance[rows], detections["measurement"][didx]
+        )
+        t.tracklet_len[rows] = np.where(refind, 0, t.tracklet_len[rows] + 1)
+        t.state[rows] = TrackState.Tracked
+        t.activated[rows] = True
+        t.frame_id[rows] = self.frame_ids[t.stream[rows]]
+        for k in "score", "cls", "angle", "idx":
+            getattr(t, k)[rows] = detections[k][didx]
+        return rows[refind]
+
+    def _activate(self, detections, didx):
+        """Start new tracks from detections `didx`, returning their rows."""
+        t = self.tracks
+        rows = t.append(len(didx))
+        t.mean[rows], t.covariance[rows] = self.kalman_filter.multi_initiate(detections["measurement"][didx])
+        t.track_id[rows] = BaseTrack.next_ids(len(didx))
+        t.state[rows] = TrackState.Tracked
+        t.stream[rows] = detections["stream"][didx]
+        t.frame_id[rows] = t.start_frame[rows] = self.frame_ids[t.stream[rows]]
+        t.activated[rows] = t.frame_id[rows] == 1
+        t.tracklet_len[rows] = 0
+        for k in "score", "cls", "angle", "idx":
+            getattr(t, k)[rows] = detections[k][didx]
+        self._group = np.concatenate((self._group, self._group_of[t.stream[rows]]))
+        return rows
+
+    def _reorder(self, rows):
+        """Move the given rows to the end of their tracked or lost list."""
+        self.tracks.order[rows] = self._order + np.arange(len(rows))
+        self._order += len(rows)
+
+    def _rows(self, *states):
+        """Return the rows of the tracks in the given states of the updated streams, grouped by stream in list order."""
+        rows = np.flatnonzero(np.isin(self.tracks.state[: self.tracks.n], states) & (self._group >= 0))
+        return rows[np.lexsort((self.tracks.order[rows], self._group[rows]))]
+
+    def _split(self, rows, *parts):
+        """Concatenate row arrays, each grouped by stream, into one array grouped by stream, keeping part order."""
+        rows = np.concatenate((rows, *parts))
+        return rows[np.argsort(self._group[rows], kind="stable")]
+
+    def update(self, results, img=None, stream=0):
+        """
+        Updates one stream with new detections and returns its tracked object bounding boxes.
+
+        Args:
+            results (Boxes | OBB): Detections with `conf`, `cls` and `xywh` or `xywhr` attributes.
+            img (np.ndarray, optional): Frame, used for global motion compensation.
+            stream (int): Index of the stream.
+
+        Returns:
+            (np.ndarray): Tracks (x1, y1, x2, y2, id, score, cls, idx), or (x, y, w, h, angle, id, score, cls, idx) for
+                oriented boxes, of shape (n, 8 | 9).
+        """
+        return self.update_batch([results], [img], [stream])[0]
+
+    def update_batch(self, results, imgs=None, streams=None):
+        """
+        Updates several streams with new detections at once.
+
+        Args:
+            results (list): Detections of every updated stream, see `update()`.
+            imgs (list, optional): Frames of every updated stream, used for global motion compensation.
+            streams (list, optional): Distinct indices of the updated streams, defaults to 0, 1, ...
+
+        Returns:
+            (List[np.ndarray]): Tracks of every updated stream, see `update()`.
+        """
+        t = self.tracks
+        streams = np.arange(len(results)) if streams is None else np.asarray(streams, dtype=int)
+        imgs = [None] * len(results) if imgs is None else imgs
+        self._next_frame(streams)
+
+        # Detections of all streams, grouped by stream
+        scores = np.concatenate([r.conf for r in results])
+        bboxes = np.concatenate([r.xywhr if hasattr(r, "xywhr") else r.xywh for r in results])
+        cls = np.concatenate([r.cls for r in results])
+        idx = np.concatenate([np.arange(len(r.conf), dtype=np.float32) for r in results])
+        group = np.repeat(np.arange(len(results)), [len(r.conf) for r in results])
+
+        remain_inds = scores >= self.args.track_high_thresh
+        inds_second = (scores > self.args.track_low_thresh) & (scores < self.args.track_high_thresh)
+        detections = self.init_track(bboxes[remain_inds], scores[remain_inds], cls[remain_inds], idx[remain_inds])
+        detections_second = self.init_track(
+            bboxes[inds_second], scores[inds_second], cls[inds_second], idx[inds_second]
+        )
+        detections["stream"] = streams[group[remain_inds]]
+        n_det = np.bincount(group[remain_inds], minlength=len(streams))
+        n_second = np.bincount(group[inds_second], minlength=len(streams))
+
+        def count(rows):
+            """Return the number of the given track rows in every stream of the batch."""
+            return np.bincount(self._group[rows], minlength=len(streams))
+
+        # Step 1: Split tracks into confirmed, unconfirmed and lost, each in list order
+        tracked = self._rows(TrackState.Tracked)
+        unconfirmed, confirmed = tracked[~t.activated[tracked]], tracked[t.activated[tracked]]
+        lost = self._rows(TrackState.Lost, TrackState.Removed)  # tracks removed last frame can still be refound
+
+        # Step 2: First association, with high score detection boxes
+        strack_pool = self._split(confirmed, lost)
+        self.multi_predict(strack_pool)
+        if hasattr(self, "gmc"):
+            for i, img in enumerate(imgs):
+                if img is not None:
+                    dets = np.concatenate((bboxes, idx[:, None]), 1)[remain_inds & (group == i)]
+                    rows = np.concatenate((strack_pool, unconfirmed))
+                    self.multi_gmc(rows[self._group[rows] == i], self.gmc.apply(img, dets))
+
+        matches, u_track, u_detection = self.associate(strack_pool, detections, n_det, self.args.match_thresh)
+        refind = self._update(strack_pool[matches[:, 0]], detections, matches[:, 1])
+
+        # Step 3: Second association, with low score detection boxes
+        r_tracked = strack_pool[u_track]
+        r_tracked = r_tracked[t.state[r_tracked] == TrackState.Tracked]
+        matches, u_track, _ = self.associate(r_tracked, detections_second, n_second, 0.5, fuse=False)
+        self._update(r_tracked[matches[:, 0]], detections_second, matches[:, 1])
+        newly_lost = r_tracked[u_track]
+        t.state[newly_lost] = TrackState.Lost
+
+        # Deal with unconfirmed tracks, usually tracks with only one beginning frame
+        remaining = {k: v[u_detection] for k, v in detections.items()}
+        n_remaining = np.bincount(self._group_of[remaining["stream"]], minlength=len(streams))
+        matches, u_unconfirmed, u_detection = self.associate(unconfirmed, remaining, n_remaining, 0.7)
+        self._update(unconfirmed[matches[:, 0]], remaining, matches[:, 1])
+        removed = unconfirmed[u_unconfirmed]
+        t.state[removed] = TrackState.Removed
+
+        # Step 4: Init new tracks
+        new = self._activate(remaining, u_detection[remaining["score"][u_detection] >= self.args.new_track_thresh])
+
+        # Step 5: Update state, new and refound tracks join the end of the tracked list, newly lost ones the lost list
+        lost = lost[t.state[lost] != TrackState.Tracked]
+        expired = lost[self.frame_ids[t.stream[lost]] - t.frame_id[lost] > self.max_time_lost]
+        t.state[expired] = TrackState.Removed
+        self._reorder(self._split(new, refind, newly_lost))
+
+        # As in BYTETracker, tracks expired on this frame stay in the lost list until the next frame, and tracks removed
+        # on earlier frames, i.e. expired ones that were refound, are not kept once lost again
+        keep = t.state[: t.n] != TrackState.Removed
+        keep[expired] = True
+        tracked, lost = self._rows(TrackState.Tracked), self._rows(TrackState.Lost, TrackState.Removed)
+        lost = lost[keep[lost]]
+        gone = np.zeros(len(lost), dtype=bool)
+        for s in np.unique(t.stream[lost]):
+            i = t.stream[lost] == s
+            gone[i] = np.isin(t.track_id[lost[i]], self.removed_ids[s])
+        keep[lost[gone]] = False
+        lost = lost[~gone]
+
+        # Remove duplicates between tracked and lost tracks of the same stream, keeping the older one
+        p, q, _ = self.iou_pairs(self.track_boxes(tracked), self.track_boxes(lost), count(tracked), count(lost), 0.15)
+        p, q = tracked[p], lost[q]
+        age = t.frame_id - t.start_frame
+        older = age[p] > age[q]
+        keep[np.concatenate((p[~older], q[older]))] = False
+        removed = np.concatenate((removed, expired))
+        for s in np.unique(t.stream[removed]):
+            ids = np.concatenate((self.removed_ids[s], t.track_id[removed[t.stream[removed] == s]]))
+            self.removed_ids[s] = ids[-999:] if len(ids) > 1000 else ids  # clip removed track IDs to 1000 maximum
+        t.keep(np.flatnonzero(keep))
+        self._group = self._group[keep]
+
+        return self._results(len(streams))
+
+    def predict(self, stream=0):
+        """
+        Advances the tracks of one stream by one frame with the Kalman filter only, see `predict_batch()`.
+
+        Args:
+            stream (int): Index of the stream.
+
+        Returns:
+            (np.ndarray): Predicted tracks of the stream, see `update()`.
+        """
+        return self.predict_batch([stream])[0]
+
+    def predict_batch(self, streams=None):
+        """
+        Advances the tracks of several streams by one frame with the Kalman filter only, for frames without detections.
+
+        Used for frames skipped by the motion gate. Tracks are neither matched, started nor marked lost, and the
+        detection index of every returned track refers to the frame of its last update.
+
+        Args:
+            streams (list, optional): Distinct indices of the advanced streams, defaults to all streams.
+
+        Returns:
+            (List[np.ndarray]): Predicted tracks of every advanced stream, see `update()`.
+        """
+        t = self.tracks
+        streams = np.arange(self.streams) if streams is None else np.asarray(streams, dtype=int)
+        self._next_frame(streams)
+        tracked = self._rows(TrackState.Tracked)
+        self.multi_predict(self._split(tracked[t.activated[tracked]], self._rows(TrackState.Lost, TrackState.Removed)))
+        return self._results(len(streams))
+
+    def _next_frame(self, streams):
+        """Start a new frame of the given streams, grouping the tracks of these streams by their position in it."""
+        self.frame_ids[streams] += 1
+        self._group_of = np.full(self.streams, -1)  # stream index -> position in this batch
+        self._group_of[streams] = np.arange(len(streams))
+        self._group = self._group_of[self.tracks.stream[: self.tracks.n]]
+
+    def _results(self, n):
+        """Return the confirmed tracks of the n streams of the current frame, each in list order, see `update()`."""
+        t = self.tracks
+        rows = self._rows(TrackState.Tracked)
+        rows = rows[t.activated[rows]]
+        out = np.concatenate(
+            (self.track_boxes(rows), np.stack((t.track_id[rows], t.score[rows], t.cls[rows], t.idx[rows]), 1)),
+            1,
+            dtype=np.float32,
+        )
+        return np.split(out, np.cumsum(np.bincount(self._group[rows], minlength=n))[:-1])
+
+    @staticmethod
+    def reset_id():
+        """Resets the global track ID counter."""
+        BaseTrack.reset_id()
+
+    def reset(self, stream=None):
+        """
+        Reset tracker.
+
+        Args:
+            stream (int, optional): Only reset this stream, i.e. when it starts a new video, defaults to all streams.
+                Track IDs then keep counting so they stay unique across the other streams.
+        """
+        t = self.tracks
+        if stream is not None:
+            t.keep(np.flatnonzero(t.stream[: t.n] != stream))
+            self.frame_ids[stream] = 0
+            self.removed_ids[stream] = np.zeros(0, dtype=np.int64)
+            return
+        t.clear()
+        self.frame_ids[:] = 0
+        self.removed_ids = [np.zeros(0, dtype=np.int64) for _ in range(self.streams)]
+        self.kalman_filter = self.get_kalmanfilter()
+        self._order = 0
+        self.reset_id()
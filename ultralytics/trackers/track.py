@@ -5,14 +5,16 @@ from pathlib import Path
 
 import torch
 
-from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils import LOGGER, IterableSimpleNamespace, yaml_load
 from ultralytics.utils.checks import check_yaml
 
 from .bot_sort import BOTSORT
 from .byte_tracker import BYTETracker
+from .soa_tracker import SoATracker
+from .utils.reid import NeckEmbedder
 
 # A mapping of tracker types to corresponding tracker classes
-TRACKER_MAP = {"bytetrack": BYTETracker, "botsort": BOTSORT}
+TRACKER_MAP = {"bytetrack": BYTETracker, "botsort": BOTSORT, "bytetrack_soa": SoATracker}
 
 
 def on_predict_start(predictor: object, persist: bool = False) -> None:
@@ -24,7 +26,7 @@ def on_predict_start(predictor: object, persist: bool = False) -> None:
         persist (bool, optional): Whether to persist the trackers if they already exist. Defaults to False.
 
     Raises:
-        AssertionError: If the tracker_type is not 'bytetrack' or 'botsort'.
+        AssertionError: If the tracker_type is not 'bytetrack', 'botsort' or 'bytetrack_soa'.
     """
     if hasattr(predictor, "trackers") and persist:
         return
@@ -32,16 +34,23 @@ def on_predict_start(predictor: object, persist: bool = False) -> None:
     tracker = check_yaml(predictor.args.tracker)
     cfg = IterableSimpleNamespace(**yaml_load(tracker))
 
-    if cfg.tracker_type not in {"bytetrack", "botsort"}:
-        raise AssertionError(f"Only 'bytetrack' and 'botsort' are supported for now, but got '{cfg.tracker_type}'")
+    if cfg.tracker_type not in TRACKER_MAP:
+        raise AssertionError(
+            f"Only 'bytetrack', 'botsort' and 'bytetrack_soa' are supported for now, but got '{cfg.tracker_type}'"
+        )
 
     trackers = []
-    for _ in range(predictor.dataset.bs):
+    if predictor.dataset.mode == "stream" and hasattr(TRACKER_MAP[cfg.tracker_type], "update_batch"):
+        # one tracker updates all streams of a batch at once
+        trackers = [TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=30, streams=predictor.dataset.bs)]
+        trackers *= predictor.dataset.bs
+    for _ in range(predictor.dataset.bs - len(trackers)):
         tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=30)
         trackers.append(tracker)
         if predictor.dataset.mode != "stream":  # only need one tracker for other modes.
             break
     predictor.trackers = trackers
+    _setup_embedder(predictor, cfg)
     predictor.vid_path = [None] * predictor.dataset.bs  # for determining when to reset tracker on new video
 
 
@@ -49,6 +58,9 @@ def on_predict_postprocess_end(predictor: object, persist: bool = False) -> None
     """
     Postprocess detected boxes and update with object tracking.
 
+    Batches skipped by the motion gate replay the results of an earlier frame, so their tracks are only advanced by
+    the Kalman filter and keep the IDs of that frame's detections.
+
     Args:
         predictor (object): The predictor object containing the predictions.
         persist (bool, optional): Whether to persist the trackers if they already exist. Defaults to False.
@@ -57,25 +69,77 @@ def on_predict_postprocess_end(predictor: object, persist: bool = False) -> None
 
     is_obb = predictor.args.task == "obb"
     is_stream = predictor.dataset.mode == "stream"
-    for i in range(len(im0s)):
-        tracker = predictor.trackers[i if is_stream else 0]
+    batched = is_stream and getattr(predictor.trackers[0], "streams", 1) > 1  # one tracker shared by all streams
+    indices = getattr(predictor, "batch_indices", None) or range(len(im0s))  # source stream index of each image
+    skipped = getattr(predictor, "motion_skipped", False)  # replayed keyframe results, only predict the tracks
+    pending = []  # (image index, stream index, detections) updated at once by a shared tracker
+    for i, j in enumerate(indices):
+        j = j if is_stream else 0
+        tracker = predictor.trackers[j]
         vid_path = predictor.save_dir / Path(path[i]).name
-        if not persist and predictor.vid_path[i if is_stream else 0] != vid_path:
-            tracker.reset()
-            predictor.vid_path[i if is_stream else 0] = vid_path
-
+        if not persist and predictor.vid_path[j] != vid_path:
+            if batched:
+                tracker.reset(stream=j)
+            else:
+                tracker.reset()
+            predictor.vid_path[j] = vid_path
+
+        if skipped:
+            if batched:
+                pending.append((i, j, None))
+            else:
+                _update_result(predictor, i, tracker.predict(), is_obb)
+            continue
         det = (predictor.results[i].obb if is_obb else predictor.results[i].boxes).cpu().numpy()
         if len(det) == 0:
             continue
-        tracks = tracker.update(det, im0s[i])
-        if len(tracks) == 0:
-            continue
-        idx = tracks[:, -1].astype(int)
-        predictor.results[i] = predictor.results[i][idx]
+        if getattr(predictor, "embedder", None) is not None:
+            predictor.embedder.embed(i, det.xyxy, predictor.results[i].orig_shape)
+        if batched:
+            pending.append((i, j, det))
+        else:
+            _update_result(predictor, i, tracker.update(det, im0s[i]), is_obb)
+
+    if pending:
+        images, streams, dets = zip(*pending)
+        if skipped:
+            tracks = predictor.trackers[0].predict_batch(streams)
+        else:
+            tracks = predictor.trackers[0].update_batch(dets, [im0s[i] for i in images], streams)
+        for i, x in zip(images, tracks):
+            _update_result(predictor, i, x, is_obb)
+
+
+def _setup_embedder(predictor: object, cfg: IterableSimpleNamespace) -> None:
+    """Hook the detection head of PyTorch models to pool Re-ID embeddings from its neck feature maps for BoT-SORT."""
+    if getattr(predictor, "embedder", None) is not None:
+        predictor.embedder.remove()
+    predictor.embedder = None
+    if cfg.tracker_type != "botsort" or not cfg.with_reid:
+        return
+    pytorch = predictor.model.pt or predictor.model.nn_module
+    if not pytorch or any(predictor.args.get(k) for k in ("pipeline", "roi", "tile")):
+        LOGGER.warning(
+            "WARNING ⚠️ 'with_reid=True' requires a PyTorch model without 'pipeline', 'roi' or 'tile', disabling."
+        )
+        return
+    predictor.embedder = NeckEmbedder(predictor.model.model.model[-1])
+    for tracker in predictor.trackers:
+        tracker.encoder = predictor.embedder
+
+
+def _update_result(predictor: object, i: int, tracks, is_obb: bool) -> None:
+    """Keep the tracked detections of result i and replace its boxes by the tracks, which end with track ID, score,
+    class and detection index.
+    """
+    if len(tracks) == 0:
+        return
+    idx = tracks[:, -1].astype(int)
+    predictor.results[i] = predictor.results[i][idx]
 
-        update_args = dict()
-        update_args["obb" if is_obb else "boxes"] = torch.as_tensor(tracks[:, :-1])
-        predictor.results[i].update(**update_args)
+    update_args = dict()
+    update_args["obb" if is_obb else "boxes"] = torch.as_tensor(tracks[:, :-1])
+    predictor.results[i].update(**update_args)
 
 
 def register_tracker(model: object, persist: bool) -> None:
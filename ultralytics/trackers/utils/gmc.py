@@ -1,11 +1,13 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import copy
+from typing import Optional
 
 import cv2
 import numpy as np
 
 from ultralytics.utils import LOGGER
+from ultralytics.utils.ops import Profile
 
 
 class GMC:
@@ -15,17 +17,30 @@ class GMC:
     This class provides methods for tracking and detecting objects based on several tracking algorithms including ORB,
     SIFT, ECC, and Sparse Optical Flow. It also supports downscaling of frames for computational efficiency.
 
+    Estimation can be made adaptive: with `interval` > 1 the camera motion is only estimated every `interval` frames,
+    frames in between repeat the last per-frame motion and the next estimate corrects the drift. With `static` > 0 a
+    camera whose motion was negligible for `static` estimates in a row counts as static, returns the identity and is
+    only re-estimated every `static` frames to notice when it starts moving. Detection boxes and `regions` such as
+    overlays or timestamps can be excluded from estimation with `mask`.
+
     Attributes:
         method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow', 'none'.
         downscale (int): Factor by which to downscale the frames for processing.
+        interval (int): Frames between motion estimates.
+        static (int): Negligible motion estimates in a row after which the camera counts as static, 0 to disable.
+        mask (bool): Whether to exclude detection boxes from estimation, always done for 'orb' and 'sift'.
+        regions (list): Static regions excluded from estimation, as boxes (x1, y1, x2, y2) or polygons.
         prevFrame (np.ndarray): Stores the previous frame for tracking.
         prevKeyPoints (list): Stores the keypoints from the previous frame.
         prevDescriptors (np.ndarray): Stores the descriptors from the previous frame.
         initializedFirstFrame (bool): Flag to indicate if the first frame has been processed.
+        profile (Profile): Time of the last call to `apply` in `profile.dt` and of all calls in `profile.t`, seconds.
+        calls (int): Number of calls to `apply`.
+        estimates (int): Number of calls that estimated the motion, the others reused previous estimates.
 
     Methods:
-        __init__(self, method='sparseOptFlow', downscale=2): Initializes a GMC object with the specified method
-                                                              and downscale factor.
+        __init__(self, method='sparseOptFlow', downscale=2, interval=1, static=0, mask=False, regions=None): Initializes
+            a GMC object with the specified method, downscale factor and adaptive estimation settings.
         apply(self, raw_frame, detections=None): Applies the chosen method to a raw frame and optionally uses
                                                  provided detections.
         applyEcc(self, raw_frame, detections=None): Applies the ECC algorithm to a raw frame.
@@ -33,18 +48,36 @@ class GMC:
         applySparseOptFlow(self, raw_frame, detections=None): Applies the Sparse Optical Flow method to a raw frame.
     """
 
-    def __init__(self, method: str = "sparseOptFlow", downscale: int = 2) -> None:
+    def __init__(
+        self,
+        method: str = "sparseOptFlow",
+        downscale: int = 2,
+        interval: int = 1,
+        static: int = 0,
+        mask: bool = False,
+        regions: Optional[list] = None,
+    ) -> None:
         """
         Initialize a video tracker with specified parameters.
 
         Args:
             method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow', 'none'.
             downscale (int): Downscale factor for processing frames.
+            interval (int): Frames between motion estimates, 1 to estimate on every frame.
+            static (int): Negligible motion estimates in a row after which the camera counts as static, 0 to disable.
+            mask (bool): Whether to exclude detection boxes from estimation, always done for 'orb' and 'sift'.
+            regions (list, optional): Static regions excluded from estimation, as boxes (x1, y1, x2, y2) or polygons
+                [[x, y], ...] in frame pixels.
         """
         super().__init__()
 
         self.method = method
         self.downscale = max(1, int(downscale))
+        self.interval = max(1, int(interval))
+        self.static = max(0, int(static))
+        self.mask = mask
+        self.regions = [np.asarray(r, dtype=np.float64) for r in regions or []]
+        self.profile = Profile()
 
         if self.method == "orb":
             self.detector = cv2.FastFeatureDetector_create(20)
@@ -72,10 +105,7 @@ class GMC:
         else:
             raise ValueError(f"Error: Unknown GMC method:{method}")
 
-        self.prevFrame = None
-        self.prevKeyPoints = None
-        self.prevDescriptors = None
-        self.initializedFirstFrame = False
+        self.reset_params()
 
     def apply(self, raw_frame: np.array, detections: list = None) -> np.array:
         """
@@ -83,7 +113,8 @@ class GMC:
 
         Args:
             raw_frame (np.ndarray): The raw frame to be processed.
-            detections (list): List of detections to be used in the processing.
+            detections (np.ndarray, optional): Detection boxes (x, y, w, h, ...) of the frame, excluded from estimation
+                when masking.
 
         Returns:
             (np.ndarray): Processed frame.
@@ -94,21 +125,95 @@ class GMC:
             array([[1, 2, 3],
                    [4, 5, 6]])
         """
+        with self.profile:
+            self.calls += 1
+            if self.method is None:
+                return np.eye(2, 3)
+            period = self.static if self.static and self.still >= self.static else self.interval
+            if self.initializedFirstFrame and self.elapsed + 1 < period:
+                # Repeat the last per-frame motion until the next estimate
+                self.elapsed += 1
+                self.applied = self.step @ self.applied
+                return self.step[:2]
+            return self._estimate(raw_frame, detections)
+
+    def _estimate(self, raw_frame: np.array, detections: np.array = None) -> np.array:
+        """Estimate the motion since the last estimate and return the warp of the current frame, which corrects the
+        per-frame motion applied since.
+        """
+        self.estimates += 1
         if self.method in {"orb", "sift"}:
-            return self.applyFeatures(raw_frame, detections)
+            H = self.applyFeatures(raw_frame, detections)
         elif self.method == "ecc":
-            return self.applyEcc(raw_frame)
-        elif self.method == "sparseOptFlow":
-            return self.applySparseOptFlow(raw_frame)
+            H = self.applyEcc(raw_frame, detections)
         else:
-            return np.eye(2, 3)
+            H = self.applySparseOptFlow(raw_frame, detections)
+        motion = np.eye(3)
+        if H is not None:  # None if estimateAffinePartial2D failed
+            motion[:2] = H
+        frames = self.elapsed + 1  # frames covered by the estimate
+
+        # A camera is static after `static` negligible motions in a row, i.e. frame corners moved by less than 1 pixel
+        height, width = raw_frame.shape[:2]
+        corners = np.array([[0, 0, 1], [width, 0, 1], [0, height, 1], [width, height, 1]], dtype=np.float64).T
+        negligible = np.abs(motion[:2] @ corners - corners[:2]).max() < frames
+        self.still = self.still + 1 if negligible else 0
+
+        warp = motion @ np.linalg.inv(self.applied)
+        self.step = np.eye(3) if negligible or self.interval == 1 else self._root(motion, frames)
+        self.applied = np.eye(3)
+        self.elapsed = 0
+        return warp[:2]
+
+    @staticmethod
+    def _root(motion: np.ndarray, n: int) -> np.ndarray:
+        """Return the similarity transform that applied n times gives the similarity transform `motion`, 3x3."""
+        scale, angle = np.hypot(motion[0, 0], motion[1, 0]), np.arctan2(motion[1, 0], motion[0, 0])
+        scale, angle = scale ** (1 / n), angle / n
+        step = np.eye(3)
+        step[:2, :2] = scale * np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        powers = np.linalg.matrix_power
+        step[:2, 2] = np.linalg.solve(sum(powers(step[:2, :2], k) for k in range(n)), motion[:2, 2])
+        return step
+
+    def _mask(self, height: int, width: int, detections: np.array = None, border: float = 0.0) -> np.array:
+        """
+        Return the mask of a downscaled frame where motion is estimated, or None when all of it is used.
 
-    def applyEcc(self, raw_frame: np.array) -> np.array:
+        Args:
+            height (int): Height of the downscaled frame.
+            width (int): Width of the downscaled frame.
+            detections (np.ndarray, optional): Detection boxes (x, y, w, h, ...) in frame pixels to exclude.
+            border (float): Fraction of the frame size excluded at the borders.
+
+        Returns:
+            (np.ndarray | None): Mask of shape (height, width), 255 where motion is estimated.
+        """
+        masked = self.mask or self.method in {"orb", "sift"}
+        if not border and not self.regions and (not masked or detections is None or not len(detections)):
+            return None
+        mask = np.zeros((height, width), dtype=np.uint8)
+        mask[int(border * height) : int((1 - border) * height), int(border * width) : int((1 - border) * width)] = 255
+        if masked and detections is not None and len(detections):
+            xywh = np.asarray(detections, dtype=np.float64)[:, :4] / self.downscale
+            for x1, y1, x2, y2 in np.c_[xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2].astype(int):
+                mask[max(y1, 0) : max(y2, 0), max(x1, 0) : max(x2, 0)] = 0
+        for region in self.regions:
+            region = region / self.downscale
+            if region.ndim == 1:  # box
+                x1, y1, x2, y2 = region.astype(int)
+                mask[max(y1, 0) : max(y2, 0), max(x1, 0) : max(x2, 0)] = 0
+            else:  # polygon
+                cv2.fillPoly(mask, [region.round().astype(np.int32)], 0)
+        return mask
+
+    def applyEcc(self, raw_frame: np.array, detections: np.array = None) -> np.array:
         """
         Apply ECC algorithm to a raw frame.
 
         Args:
             raw_frame (np.ndarray): The raw frame to be processed.
+            detections (np.ndarray, optional): Detection boxes (x, y, w, h, ...) of the frame, excluded when masking.
 
         Returns:
             (np.ndarray): Processed frame.
@@ -143,10 +248,14 @@ class GMC:
         # Run the ECC algorithm. The results are stored in warp_matrix.
         # (cc, H) = cv2.findTransformECC(self.prevFrame, frame, H, self.warp_mode, self.criteria)
         try:
-            (_, H) = cv2.findTransformECC(self.prevFrame, frame, H, self.warp_mode, self.criteria, None, 1)
+            mask = self._mask(height, width, detections)
+            (_, H) = cv2.findTransformECC(self.prevFrame, frame, H, self.warp_mode, self.criteria, mask, 1)
+            H[:, 2] *= self.downscale
         except Exception as e:
             LOGGER.warning(f"WARNING: find transform failed. Set warp as identity {e}")
 
+        self.prevFrame = frame.copy()
+
         return H
 
     def applyFeatures(self, raw_frame: np.array, detections: list = None) -> np.array:
@@ -155,7 +264,7 @@ class GMC:
 
         Args:
             raw_frame (np.ndarray): The raw frame to be processed.
-            detections (list): List of detections to be used in the processing.
+            detections (np.ndarray, optional): Detection boxes (x, y, w, h, ...) of the frame, excluded from keypoints.
 
         Returns:
             (np.ndarray): Processed frame.
@@ -177,14 +286,7 @@ class GMC:
             height = height // self.downscale
 
         # Find the keypoints
-        mask = np.zeros_like(frame)
-        mask[int(0.02 * height) : int(0.98 * height), int(0.02 * width) : int(0.98 * width)] = 255
-        if detections is not None:
-            for det in detections:
-                tlbr = (det[:4] / self.downscale).astype(np.int_)
-                mask[tlbr[1] : tlbr[3], tlbr[0] : tlbr[2]] = 0
-
-        keypoints = self.detector.detect(frame, mask)
+        keypoints = self.detector.detect(frame, self._mask(height, width, detections, border=0.02))
 
         # Compute the descriptors
         keypoints, descriptors = self.extractor.compute(frame, keypoints)
@@ -291,12 +393,13 @@ class GMC:
 
         return H
 
-    def applySparseOptFlow(self, raw_frame: np.array) -> np.array:
+    def applySparseOptFlow(self, raw_frame: np.array, detections: np.array = None) -> np.array:
         """
         Apply Sparse Optical Flow method to a raw frame.
 
         Args:
             raw_frame (np.ndarray): The raw frame to be processed.
+            detections (np.ndarray, optional): Detection boxes (x, y, w, h, ...) of the frame, excluded when masking.
 
         Returns:
             (np.ndarray): Processed frame.
@@ -316,7 +419,8 @@ class GMC:
             frame = cv2.resize(frame, (width // self.downscale, height // self.downscale))
 
         # Find the keypoints
-        keypoints = cv2.goodFeaturesToTrack(frame, mask=None, **self.feature_params)
+        mask = self._mask(*frame.shape, detections)
+        keypoints = cv2.goodFeaturesToTrack(frame, mask=mask, **self.feature_params)
 
         # Handle first frame
         if not self.initializedFirstFrame or self.prevKeyPoints is None:
@@ -361,3 +465,9 @@ class GMC:
         self.prevKeyPoints = None
         self.prevDescriptors = None
         self.initializedFirstFrame = False
+        self.calls = 0
+        self.estimates = 0
+        self.elapsed = 0  # frames since the last estimate
+        self.still = 0  # negligible motion estimates in a row
+        self.step = np.eye(3)  # per-frame motion repeated until the next estimate
+        self.applied = np.eye(3)  # motion returned since the last estimate
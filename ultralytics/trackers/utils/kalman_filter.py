@@ -139,15 +139,74 @@ class KalmanFilterXYAH:
         ]
         sqr = np.square(np.r_[std_pos, std_vel]).T
 
-        motion_cov = [np.diag(sqr[i]) for i in range(len(mean))]
-        motion_cov = np.asarray(motion_cov)
+        motion_cov = sqr[:, None] * np.eye(sqr.shape[1])  # batch of diagonal matrices
 
         mean = np.dot(mean, self._motion_mat.T)
-        left = np.dot(self._motion_mat, covariance).transpose((1, 0, 2))
-        covariance = np.dot(left, self._motion_mat.T) + motion_cov
+        covariance = self._motion_mat @ covariance @ self._motion_mat.T + motion_cov
 
         return mean, covariance
 
+    def multi_initiate(self, measurement: np.ndarray) -> tuple:
+        """
+        Create tracks from unassociated measurements (Vectorized version).
+
+        Args:
+            measurement (ndarray): The Nx4 dimensional matrix of bounding boxes (x, y, a, h).
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx8 mean matrix and Nx8x8 covariance matrix of the new tracks.
+        """
+        h, ones = measurement[:, 3], np.ones(len(measurement))
+        std = [
+            2 * self._std_weight_position * h,
+            2 * self._std_weight_position * h,
+            1e-2 * ones,
+            2 * self._std_weight_position * h,
+            10 * self._std_weight_velocity * h,
+            10 * self._std_weight_velocity * h,
+            1e-5 * ones,
+            10 * self._std_weight_velocity * h,
+        ]
+        mean = np.concatenate((measurement, np.zeros_like(measurement)), 1)
+        return mean, np.square(std).T[:, None] * np.eye(8)
+
+    def multi_project(self, mean: np.ndarray, covariance: np.ndarray) -> tuple:
+        """
+        Project state distributions to measurement space (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the object states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the object states.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx4 projected mean and Nx4x4 projected covariance matrices.
+        """
+        h, ones = mean[:, 3], np.ones(len(mean))
+        std = [self._std_weight_position * h, self._std_weight_position * h, 1e-1 * ones, self._std_weight_position * h]
+        return mean[:, :4], covariance[:, :4, :4] + np.square(std).T[:, None] * np.eye(4)
+
+    def multi_update(self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray) -> tuple:
+        """
+        Run Kalman filter correction step (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the predicted states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the predicted states.
+            measurement (ndarray): The Nx4 dimensional matrix of measurements, one per state.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the measurement-corrected state distributions.
+        """
+        projected_mean, projected_cov = self.multi_project(mean, covariance)
+
+        # Gain K = P H^T S^-1, solved as K^T = S^-1 H P since S and P are symmetric and H selects the first 4 rows
+        kalman_gain = np.linalg.solve(projected_cov, covariance[:, :4]).transpose(0, 2, 1)
+        innovation = measurement - projected_mean
+
+        new_mean = mean + np.einsum("nij,nj->ni", kalman_gain, innovation)
+        new_covariance = covariance - kalman_gain @ projected_cov @ kalman_gain.transpose(0, 2, 1)
+        return new_mean, new_covariance
+
     def update(self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray) -> tuple:
         """
         Run Kalman filter correction step.
@@ -335,15 +394,52 @@ class KalmanFilterXYWH(KalmanFilterXYAH):
         ]
         sqr = np.square(np.r_[std_pos, std_vel]).T
 
-        motion_cov = [np.diag(sqr[i]) for i in range(len(mean))]
-        motion_cov = np.asarray(motion_cov)
+        motion_cov = sqr[:, None] * np.eye(sqr.shape[1])  # batch of diagonal matrices
 
         mean = np.dot(mean, self._motion_mat.T)
-        left = np.dot(self._motion_mat, covariance).transpose((1, 0, 2))
-        covariance = np.dot(left, self._motion_mat.T) + motion_cov
+        covariance = self._motion_mat @ covariance @ self._motion_mat.T + motion_cov
 
         return mean, covariance
 
+    def multi_initiate(self, measurement) -> tuple:
+        """
+        Create tracks from unassociated measurements (Vectorized version).
+
+        Args:
+            measurement (ndarray): The Nx4 dimensional matrix of bounding boxes (x, y, w, h).
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx8 mean matrix and Nx8x8 covariance matrix of the new tracks.
+        """
+        w, h = measurement[:, 2], measurement[:, 3]
+        std = [
+            2 * self._std_weight_position * w,
+            2 * self._std_weight_position * h,
+            2 * self._std_weight_position * w,
+            2 * self._std_weight_position * h,
+            10 * self._std_weight_velocity * w,
+            10 * self._std_weight_velocity * h,
+            10 * self._std_weight_velocity * w,
+            10 * self._std_weight_velocity * h,
+        ]
+        mean = np.concatenate((measurement, np.zeros_like(measurement)), 1)
+        return mean, np.square(std).T[:, None] * np.eye(8)
+
+    def multi_project(self, mean, covariance) -> tuple:
+        """
+        Project state distributions to measurement space (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the object states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the object states.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx4 projected mean and Nx4x4 projected covariance matrices.
+        """
+        w, h = mean[:, 2], mean[:, 3]
+        std = [self._std_weight_position * w, self._std_weight_position * h] * 2
+        return mean[:, :4], covariance[:, :4, :4] + np.square(std).T[:, None] * np.eye(4)
+
     def update(self, mean, covariance, measurement) -> tuple:
         """
         Run Kalman filter correction step.
@@ -2,6 +2,8 @@
 
 import numpy as np
 import scipy
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from scipy.spatial.distance import cdist
 
 from ultralytics.utils.metrics import batch_probiou, bbox_ioa
@@ -40,24 +42,176 @@ def linear_assignment(cost_matrix: np.ndarray, thresh: float, use_lap: bool = Tr
         # Use lap.lapjv
         # https://github.com/gatagat/lap
         _, x, y = lap.lapjv(cost_matrix, extend_cost=True, cost_limit=thresh)
-        matches = [[ix, mx] for ix, mx in enumerate(x) if mx >= 0]
-        unmatched_a = np.where(x < 0)[0]
-        unmatched_b = np.where(y < 0)[0]
+        matches = np.stack((np.flatnonzero(x >= 0), x[x >= 0]), 1)
+        unmatched_a = np.flatnonzero(x < 0)
+        unmatched_b = np.flatnonzero(y < 0)
     else:
         # Use scipy.optimize.linear_sum_assignment
         # https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.linear_sum_assignment.html
         x, y = scipy.optimize.linear_sum_assignment(cost_matrix)  # row x, col y
-        matches = np.asarray([[x[i], y[i]] for i in range(len(x)) if cost_matrix[x[i], y[i]] <= thresh])
-        if len(matches) == 0:
-            unmatched_a = list(np.arange(cost_matrix.shape[0]))
-            unmatched_b = list(np.arange(cost_matrix.shape[1]))
-        else:
-            unmatched_a = list(set(np.arange(cost_matrix.shape[0])) - set(matches[:, 0]))
-            unmatched_b = list(set(np.arange(cost_matrix.shape[1])) - set(matches[:, 1]))
+        matches = np.stack((x, y), 1)[cost_matrix[x, y] <= thresh]
+        matched_a, matched_b = np.zeros(cost_matrix.shape[0], bool), np.zeros(cost_matrix.shape[1], bool)
+        matched_a[matches[:, 0]] = matched_b[matches[:, 1]] = True
+        unmatched_a, unmatched_b = np.flatnonzero(~matched_a), np.flatnonzero(~matched_b)
 
     return matches, unmatched_a, unmatched_b
 
 
+def sparse_linear_assignment(rows: np.ndarray, cols: np.ndarray, costs: np.ndarray, shape: tuple, thresh: float):
+    """
+    Perform linear assignment on a sparse cost matrix, solving every connected component of candidate pairs separately.
+
+    Pairs that are not given are never matched, so this returns the same assignment as `linear_assignment()` on the
+    dense matrix whenever all omitted pairs cost at least `thresh`, e.g. non-overlapping boxes of an IoU cost.
+    Components with a single 'a' or 'b' take their cheapest pair directly and only larger components are solved with
+    lap.lapjv, which keeps association fast when thousands of tracks only compete with their few neighbours. The
+    candidate pairs come from `overlap_pairs()`; no Kalman gating is applied, so the result stays exact.
+
+    Args:
+        rows (np.ndarray): Indices into 'a' of the candidate pairs.
+        cols (np.ndarray): Indices into 'b' of the candidate pairs.
+        costs (np.ndarray): Costs of the candidate pairs.
+        shape (tuple): Number of 'a' and 'b' items (n, m).
+        thresh (float): Threshold for considering an assignment valid.
+
+    Returns:
+        Tuple with:
+            - matched indices of shape (k, 2), sorted by 'a'
+            - unmatched indices from 'a'
+            - unmatched indices from 'b'
+    """
+    n, m = shape
+    keep = costs < thresh
+    rows, cols, costs = rows[keep], cols[keep], costs[keep]
+    graph = coo_matrix((np.ones(len(rows)), (rows, cols + n)), shape=(n + m, n + m))
+    k, labels = connected_components(graph, directed=False)
+    a_nodes, a_start, a_rank = _group_nodes(labels[:n], k)
+    b_nodes, b_start, b_rank = _group_nodes(labels[n:], k)
+    label = labels[rows]  # component of every pair
+    order = np.lexsort((costs, label))
+    label, first = label[order], np.r_[True, label[order][1:] != label[order][:-1]]
+
+    # Components with a single 'a' or 'b' match their cheapest pair
+    star = (np.diff(a_start)[label] == 1) | (np.diff(b_start)[label] == 1)
+    best = order[first & star]
+    matches = [np.stack((rows[best], cols[best]), 1)]
+
+    # Larger components are solved one by one, on cost matrices cut from one flat buffer
+    pairs = order[~star]
+    c = np.unique(label[~star])
+    na, nb = np.diff(a_start)[c], np.diff(b_start)[c]
+    offset = np.r_[0, np.cumsum(na * nb)]
+    buffer = np.full(offset[-1], thresh + 1.0)
+    pos = np.searchsorted(c, labels[rows[pairs]])
+    buffer[offset[pos] + a_rank[rows[pairs]] * nb[pos] + b_rank[cols[pairs]]] = costs[pairs]
+    x = [
+        lap.lapjv(buffer[o : o + u * v].reshape(u, v), extend_cost=True, cost_limit=thresh)[1]
+        for o, u, v in zip(offset, na, nb)
+    ]
+    if x:
+        x = np.concatenate(x)
+        i = np.flatnonzero(x >= 0)
+        comp = np.repeat(np.arange(len(c)), na)[i]
+        rank = i - np.repeat(np.cumsum(na) - na, na)[i]
+        matches.append(np.stack((a_nodes[a_start[c[comp]] + rank], b_nodes[b_start[c[comp]] + x[i]]), 1))
+
+    matches = np.concatenate(matches).astype(int)
+    matches = matches[np.argsort(matches[:, 0])]  # in 'a' order as from lap.lapjv
+    matched_a, matched_b = np.zeros(n, bool), np.zeros(m, bool)
+    matched_a[matches[:, 0]] = matched_b[matches[:, 1]] = True
+    return matches, np.flatnonzero(~matched_a), np.flatnonzero(~matched_b)
+
+
+def _group_nodes(labels: np.ndarray, k: int):
+    """Return the nodes sorted by component, the start of every component in them and the rank of every node within
+    its component.
+    """
+    nodes = np.argsort(labels, kind="stable")
+    start = np.r_[0, np.cumsum(np.bincount(labels, minlength=k))]
+    rank = np.empty_like(nodes)
+    rank[nodes] = np.arange(len(nodes)) - start[labels[nodes]]
+    return nodes, start, rank
+
+
+def overlap_pairs(atlbrs: np.ndarray, btlbrs: np.ndarray, agroups=None, bgroups=None):
+    """
+    Find all pairs of overlapping boxes with a uniform spatial grid, without comparing every pair.
+
+    Every box is binned into the grid cells it covers and pairs sharing a cell are candidates. Overlapping candidates
+    are returned once, from the cell holding the top-left corner of their intersection. The cell size is twice the
+    median box size, so most boxes fall into a few cells.
+
+    The grid is used instead of Kalman gating with `KalmanFilterXYAH.gating_distance()`. Pairs without overlap have an
+    IoU cost of 1 and can never match, so dropping them changes nothing. A Mahalanobis gate is a statistical cut: it
+    could drop pairs that the dense IoU association matches, and it still computes one distance per track and
+    detection.
+
+    Args:
+        atlbrs (np.ndarray): Boxes 'a' (x1, y1, x2, y2) of shape (n, 4).
+        btlbrs (np.ndarray): Boxes 'b' (x1, y1, x2, y2) of shape (m, 4).
+        agroups (np.ndarray, optional): Group, i.e. stream, of every box 'a'. Only boxes of the same group are paired.
+        bgroups (np.ndarray, optional): Group of every box 'b'.
+
+    Returns:
+        (np.ndarray): Indices into 'a' of the overlapping pairs.
+        (np.ndarray): Indices into 'b' of the overlapping pairs.
+    """
+    if not len(atlbrs) or not len(btlbrs):
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    boxes = np.concatenate((atlbrs, btlbrs))
+    cell = max(2 * float(np.median((boxes[:, 2:] - boxes[:, :2]).max(1))), 1.0)
+    lo = np.floor(boxes[:, :2] / cell).astype(np.int64)
+    span = np.floor(boxes[:, 2:] / cell).astype(np.int64) - lo + 1
+    span = span.clip(1)
+    counts = span.prod(1)
+    box = np.repeat(np.arange(len(boxes)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    x, y = lo[box, 0] + k % span[box, 0], lo[box, 1] + k // span[box, 0]
+    key = (x - x.min()) * (y.max() - y.min() + 1) + y - y.min()  # cell index
+    if agroups is not None:
+        key += np.concatenate((agroups, bgroups)).astype(np.int64)[box] * (key.max() + 1)
+
+    # Join the cells of boxes 'a' and 'b'
+    n = len(atlbrs)
+    is_a = box < n
+    a, ka, xa, ya = box[is_a], key[is_a], x[is_a], y[is_a]
+    order = np.argsort(key[~is_a], kind="stable")
+    b, kb = box[~is_a][order] - n, key[~is_a][order]
+    start, stop = np.searchsorted(kb, ka, "left"), np.searchsorted(kb, ka, "right")
+    counts = stop - start
+    cell_a = np.repeat(np.arange(len(a)), counts)
+    i, j = a[cell_a], b[np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+
+    # Keep pairs that overlap, once each in the cell holding the top-left corner of their intersection
+    top_left = np.maximum(atlbrs[i, :2], btlbrs[j, :2])
+    overlap = (np.minimum(atlbrs[i, 2:], btlbrs[j, 2:]) > top_left).all(1)
+    corner = np.floor(top_left / cell).astype(np.int64)
+    overlap &= (corner[:, 0] == xa[cell_a]) & (corner[:, 1] == ya[cell_a])
+    return i[overlap], j[overlap]
+
+
+def sparse_iou_distance(atlbrs: np.ndarray, btlbrs: np.ndarray, agroups=None, bgroups=None):
+    """
+    Compute the IoU cost of all overlapping pairs of boxes, all other pairs cost 1.
+
+    Args:
+        atlbrs (np.ndarray): Boxes 'a' (x1, y1, x2, y2) of shape (n, 4).
+        btlbrs (np.ndarray): Boxes 'b' (x1, y1, x2, y2) of shape (m, 4).
+        agroups (np.ndarray, optional): Group, i.e. stream, of every box 'a'. Only boxes of the same group are paired.
+        bgroups (np.ndarray, optional): Group of every box 'b'.
+
+    Returns:
+        (np.ndarray): Indices into 'a' of the overlapping pairs.
+        (np.ndarray): Indices into 'b' of the overlapping pairs.
+        (np.ndarray): IoU costs of the overlapping pairs.
+    """
+    i, j = overlap_pairs(atlbrs, btlbrs, agroups, bgroups)
+    a, b = atlbrs[i].astype(np.float32), btlbrs[j].astype(np.float32)
+    inter = (np.minimum(a[:, 2:], b[:, 2:]) - np.maximum(a[:, :2], b[:, :2])).clip(0).prod(1)
+    union = (a[:, 2:] - a[:, :2]).prod(1) + (b[:, 2:] - b[:, :2]).prod(1) - inter
+    return i, j, 1 - inter / (union + 1e-7)
+
+
 def iou_distance(atracks: list, btracks: list) -> np.ndarray:
     """
     Compute cost based on Intersection over Union (IoU) between tracks.
@@ -0,0 +1,225 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import numpy as np
+import torch
+
+
+class FeatureStore:
+    """
+    Compact, array-backed appearance features of tracks.
+
+    Every track owns one row of preallocated NumPy arrays holding its smoothed embedding and a ring buffer of its last
+    `history` embeddings. Rows are recycled once their tracks are dropped, so memory stays bounded and the smoothed
+    embeddings of many tracks are gathered with one index operation instead of one Python object per feature.
+
+    Attributes:
+        history (int): Embeddings kept per track.
+        alpha (float): Smoothing factor of the exponential moving average of embeddings.
+        smooth (np.ndarray): L2-normalized smoothed embeddings, shape (rows, dim).
+        features (np.ndarray): Ring buffer of embeddings, shape (rows, history, dim).
+        lengths (np.ndarray): Number of stored embeddings of every row.
+        heads (np.ndarray): Next write index of every row.
+        free (list): Unused rows.
+
+    Methods:
+        add: Store the first embeddings of new tracks and return their rows.
+        update: Add embeddings to existing rows and update their smoothed embeddings.
+        retain: Free all rows but the given ones.
+        clear: Free all rows.
+
+    Examples:
+        >>> store = FeatureStore(history=50)
+        >>> rows = store.add(np.random.rand(3, 256))  # three new tracks
+        >>> store.update(rows[:2], np.random.rand(2, 256))
+        >>> store.smooth[rows]  # smoothed embeddings of the tracks
+        >>> store[rows[0]]  # embeddings of the first track, oldest first
+    """
+
+    def __init__(self, history=50, alpha=0.9, rows=64):
+        """
+        Initializes the store, the embedding size is set by the first added embeddings.
+
+        Args:
+            history (int): Embeddings kept per track.
+            alpha (float): Smoothing factor of the exponential moving average of embeddings.
+            rows (int): Initially allocated tracks, the arrays double when more are used.
+        """
+        self.history = history
+        self.alpha = alpha
+        self.rows = rows
+        self.clear()
+
+    def __getitem__(self, row):
+        """Return the stored embeddings of a row, oldest first."""
+        n = self.lengths[row]
+        return self.features[row, (self.heads[row] - n + np.arange(n)) % self.history]
+
+    def _allocate(self, dim):
+        """Allocate all arrays for embeddings of size dim, doubling the rows of existing arrays."""
+        n = len(self.lengths)
+        rows = max(2 * n, self.rows)
+        smooth, features, lengths, heads = self.smooth, self.features, self.lengths, self.heads
+        self.smooth = np.zeros((rows, dim), dtype=np.float32)
+        self.features = np.zeros((rows, self.history, dim), dtype=np.float32)
+        self.lengths, self.heads = np.zeros(rows, dtype=np.int64), np.zeros(rows, dtype=np.int64)
+        if n:
+            self.smooth[:n], self.features[:n], self.lengths[:n], self.heads[:n] = smooth, features, lengths, heads
+        self.free.extend(range(rows - 1, n - 1, -1))
+
+    @staticmethod
+    def _normalize(x):
+        """L2-normalize rows of x."""
+        return x / np.linalg.norm(x, axis=1, keepdims=True).clip(1e-12)
+
+    def add(self, feats):
+        """
+        Store the first embeddings of new tracks.
+
+        Args:
+            feats (np.ndarray): Embeddings of shape (n, dim).
+
+        Returns:
+            (np.ndarray): Rows of the new tracks, shape (n, ).
+        """
+        feats = np.asarray(feats, dtype=np.float32).reshape(len(feats), -1)
+        if self.smooth is None:
+            self._allocate(feats.shape[1])
+        while len(self.free) < len(feats):
+            self._allocate(feats.shape[1])
+        rows = np.array([self.free.pop() for _ in range(len(feats))], dtype=np.int64)
+        self.lengths[rows] = self.heads[rows] = 0
+        self.smooth[rows] = self._normalize(feats)
+        self._append(rows, feats)
+        return rows
+
+    def update(self, rows, feats):
+        """
+        Add embeddings to existing rows and update their smoothed embeddings.
+
+        Args:
+            rows (np.ndarray): Rows of shape (n, ), all distinct.
+            feats (np.ndarray): Embeddings of shape (n, dim).
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        feats = np.asarray(feats, dtype=np.float32).reshape(len(rows), -1)
+        self.smooth[rows] = self._normalize(self.alpha * self.smooth[rows] + (1 - self.alpha) * self._normalize(feats))
+        self._append(rows, feats)
+
+    def _append(self, rows, feats):
+        """Write normalized embeddings to the ring buffers of rows."""
+        self.features[rows, self.heads[rows]] = self._normalize(feats)
+        self.heads[rows] = (self.heads[rows] + 1) % self.history
+        self.lengths[rows] = np.minimum(self.lengths[rows] + 1, self.history)
+
+    def retain(self, rows):
+        """Free all rows except the given ones, i.e. those of the tracked and lost tracks."""
+        if self.smooth is None:
+            return
+        used = np.zeros(len(self.lengths), dtype=bool)
+        used[np.asarray(rows, dtype=np.int64)] = True
+        used[self.free] = True  # already free
+        self.free.extend(np.flatnonzero(~used)[::-1].tolist())
+
+    def clear(self):
+        """Free all rows and the embedding size."""
+        self.smooth = self.features = None
+        self.lengths = self.heads = np.zeros(0, dtype=np.int64)
+        self.free = []
+
+
+class NeckEmbedder:
+    """
+    Appearance embeddings of detections pooled from the detector's own neck feature maps.
+
+    A forward pre-hook on the detection head keeps the multi-scale feature maps (i.e. P3, P4 and P5) of the last forward
+    pass. Every detection box is pooled from each map with ROIAlign and centred on the mean activations of the image, as
+    raw activations are mostly positive and would make all embeddings alike. The pooled vectors are L2-normalized per
+    scale and concatenated, giving Re-ID embeddings from the same forward pass as the detections instead of a second
+    network.
+
+    Attributes:
+        head (nn.Module): The hooked detection head.
+        maps (List[torch.Tensor]): Feature maps of the last forward pass, each of shape (batch, channels, h, w).
+        output_size (int): ROIAlign output size, embeddings have `output_size ** 2` values per channel.
+        features (np.ndarray): Embeddings of all boxes of the current image, see `embed()`.
+
+    Methods:
+        embed: Compute the embeddings of the boxes of one image of the last forward pass.
+        inference: Return the embeddings of tracker detections, the encoder interface of BOTSORT.
+        remove: Remove the hook from the head.
+
+    Examples:
+        >>> from ultralytics import YOLO
+        >>> model = YOLO("yolov8n.pt")
+        >>> results = model.track("path/to/video.mp4", tracker="botsort.yaml")  # with_reid: True in the tracker yaml
+    """
+
+    def __init__(self, head, output_size=1):
+        """
+        Hook the detection head of a PyTorch model.
+
+        Args:
+            head (nn.Module): Detection head receiving the list of neck feature maps, with a `stride` attribute.
+            output_size (int): ROIAlign output size.
+        """
+        self.head = head
+        self.output_size = output_size
+        self.maps = None
+        self.features = np.zeros((0, 0), dtype=np.float32)
+        self.handle = head.register_forward_pre_hook(self._hook)
+
+    def _hook(self, module, inputs):
+        """Keep the feature maps passed to the head, which replaces the list items with its outputs."""
+        self.maps = list(inputs[0])
+
+    def remove(self):
+        """Remove the hook from the head."""
+        self.handle.remove()
+
+    def embed(self, i, boxes, shape):
+        """
+        Compute the embeddings of the boxes of image i of the last forward pass and keep them as current features.
+
+        Args:
+            i (int): Index of the image in the batch.
+            boxes (torch.Tensor | np.ndarray): Boxes (x1, y1, x2, y2) in original image pixels, shape (n, 4).
+            shape (tuple): Original image shape (height, width).
+
+        Returns:
+            (np.ndarray): Embeddings of shape (n, dim).
+        """
+        from torchvision.ops import roi_align
+
+        x = self.maps[0]
+        stride = self.head.stride.tolist()
+        height, width = x.shape[2] * stride[0], x.shape[3] * stride[0]  # letterboxed input size
+
+        # Boxes from original to input image pixels, the inverse of ops.scale_boxes()
+        gain = min(height / shape[0], width / shape[1])
+        pad = round((width - shape[1] * gain) / 2 - 0.1), round((height - shape[0] * gain) / 2 - 0.1)
+        boxes = torch.as_tensor(boxes, dtype=x.dtype, device=x.device).reshape(-1, 4) * gain
+        boxes += torch.tensor([*pad, *pad], dtype=x.dtype, device=x.device)
+        rois = torch.cat((torch.full_like(boxes[:, :1], i), boxes), 1)
+
+        with torch.no_grad():
+            feats = [
+                roi_align(m, rois, self.output_size, spatial_scale=1 / s, sampling_ratio=2, aligned=True).flatten(1)
+                - m[i].mean((1, 2)).repeat_interleave(self.output_size**2)
+                for m, s in zip(self.maps, stride)
+            ]
+            feats = torch.cat([torch.nn.functional.normalize(f.float(), dim=1) for f in feats], 1)
+        self.features = torch.nn.functional.normalize(feats, dim=1).cpu().numpy()
+        return self.features
+
+    def inference(self, img, dets):
+        """
+        Return the embeddings of tracker detections of the current image.
+
+        Args:
+            img (np.ndarray): The current image, unused as embeddings come from the detector's forward pass.
+            dets (np.ndarray): Tracker detections whose last column is the index of the detection in the image.
+
+        Returns:
+            (np.ndarray): Embeddings of shape (n, dim).
+        """
+        return self.features[dets[:, -1].astype(int)]
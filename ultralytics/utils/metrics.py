@@ -22,29 +22,29 @@ def bbox_ioa(box1, box2, iou=False, eps=1e-7):
     Calculate the intersection over box2 area given box1 and box2. Boxes are in x1y1x2y2 format.
 
     Args:
-        box1 (np.ndarray): A numpy array of shape (n, 4) representing n bounding boxes.
-        box2 (np.ndarray): A numpy array of shape (m, 4) representing m bounding boxes.
+        box1 (np.ndarray): A numpy array of shape (n, 4) representing n bounding boxes, or (..., n, 4) for batches.
+        box2 (np.ndarray): A numpy array of shape (m, 4) representing m bounding boxes, or (..., m, 4) for batches.
         iou (bool): Calculate the standard IoU if True else return inter_area/box2_area.
         eps (float, optional): A small value to avoid division by zero. Defaults to 1e-7.
 
     Returns:
-        (np.ndarray): A numpy array of shape (n, m) representing the intersection over box2 area.
+        (np.ndarray): A numpy array of shape (n, m) or (..., n, m) representing the intersection over box2 area.
     """
 
     # Get the coordinates of bounding boxes
-    b1_x1, b1_y1, b1_x2, b1_y2 = box1.T
-    b2_x1, b2_y1, b2_x2, b2_y2 = box2.T
+    b1_x1, b1_y1, b1_x2, b1_y2 = (x[..., None] for x in np.moveaxis(box1, -1, 0))
+    b2_x1, b2_y1, b2_x2, b2_y2 = (x[..., None, :] for x in np.moveaxis(box2, -1, 0))
 
     # Intersection area
-    inter_area = (np.minimum(b1_x2[:, None], b2_x2) - np.maximum(b1_x1[:, None], b2_x1)).clip(0) * (
-        np.minimum(b1_y2[:, None], b2_y2) - np.maximum(b1_y1[:, None], b2_y1)
+    inter_area = (np.minimum(b1_x2, b2_x2) - np.maximum(b1_x1, b2_x1)).clip(0) * (
+        np.minimum(b1_y2, b2_y2) - np.maximum(b1_y1, b2_y1)
     ).clip(0)
 
     # Box2 area
     area = (b2_x2 - b2_x1) * (b2_y2 - b2_y1)
     if iou:
         box1_area = (b1_x2 - b1_x1) * (b1_y2 - b1_y1)
-        area = area + box1_area[:, None] - inter_area
+        area = area + box1_area - inter_area
 
     # Intersection over box2 area
     return inter_area / (area + eps)
@@ -379,6 +379,164 @@ def scale_image(masks, im0_shape, ratio_pad=None):
     return masks
 
 
+def letterbox_batch(ims, new_shape=640, auto=False, stride=32, device=None, half=False):
+    """
+    Letterboxes a list of BGR images into a normalized RGB BCHW tensor with batched torch operations.
+
+    Equivalent to `LetterBox(new_shape, auto=auto, stride=stride)` applied per image followed by BGR to RGB, HWC to
+    BCHW and 0-255 to 0.0-1.0 conversion, so output shapes and padding match and `scale_boxes()` recovers the same
+    ratio and padding. Images are moved to `device` as uint8 and same-shape images are resized in a single call.
+
+    Args:
+        ims (List[np.ndarray]): BGR uint8 images of shape (h, w, 3).
+        new_shape (int | tuple): Target (h, w) size.
+        auto (bool): Pad to the minimum rectangle divisible by `stride` instead of `new_shape`, requires all images to
+            share one shape.
+        stride (int): Stride used when `auto=True`.
+        device (torch.device, optional): Device of the returned tensor.
+        half (bool): Return a float16 instead of float32 tensor.
+
+    Returns:
+        (torch.Tensor): Letterboxed images of shape (n, 3, h, w) with values in 0.0-1.0.
+    """
+    if isinstance(new_shape, int):
+        new_shape = (new_shape, new_shape)
+    groups = {}  # image shape -> batch indices
+    for i, im in enumerate(ims):
+        groups.setdefault(im.shape[:2], []).append(i)
+    assert not auto or len(groups) == 1, "letterbox_batch() auto=True requires images of one shape."
+
+    dtype, out = torch.float16 if half else torch.float32, None
+    for shape, idx in groups.items():
+        r = min(new_shape[0] / shape[0], new_shape[1] / shape[1])
+        new_unpad = int(round(shape[1] * r)), int(round(shape[0] * r))
+        dw, dh = new_shape[1] - new_unpad[0], new_shape[0] - new_unpad[1]  # wh padding
+        if auto:  # minimum rectangle
+            dw, dh = np.mod(dw, stride), np.mod(dh, stride)
+        dw, dh = dw / 2, dh / 2  # divide padding into 2 sides, rounded as in LetterBox
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+
+        x = torch.from_numpy(np.stack([ims[i] for i in idx])).to(device)  # uint8 transfer, (n, h, w, 3)
+        x = x.permute(0, 3, 1, 2)  # BHWC to BCHW, channels_last memory
+        if x.device.type != "cpu":
+            x = x.float()  # CPU has a fast uint8 resize path, other devices resize floats
+        if shape != new_unpad[::-1]:
+            x = F.interpolate(x, size=new_unpad[::-1], mode="bilinear", align_corners=False)
+        x = F.pad(x, (left, right, top, bottom), value=114)[:, [2, 1, 0]]  # add border, BGR to RGB
+        if len(groups) == 1:
+            out = x.to(dtype)
+        else:
+            if out is None:
+                out = torch.empty((len(ims), *x.shape[1:]), dtype=dtype, device=x.device)
+            out[idx] = x.to(dtype)
+    return out.div_(255)  # 0 - 255 to 0.0 - 1.0
+
+
+def tile_windows(region, size, overlap=0.2):
+    """
+    Splits a region into the fewest evenly spaced, overlapping windows of at most `size` pixels per side.
+
+    Args:
+        region (tuple): Region (x1, y1, x2, y2) in pixels.
+        size (int): Maximum window width and height.
+        overlap (float): Minimum overlap between neighbouring windows as a fraction of `size`.
+
+    Returns:
+        (List[tuple]): Windows (x1, y1, x2, y2) covering the region.
+    """
+    step = max(size - int(size * overlap), 1)
+    axes = []
+    for a, b in ((region[0], region[2]), (region[1], region[3])):
+        n = max(math.ceil((b - a - size) / step), 0) + 1  # windows along this axis
+        w = min(size, b - a)
+        axes.append([(int(round(x)), int(round(x)) + w) for x in np.linspace(a, b - w, n)])
+    return [(x1, y1, x2, y2) for y1, y2 in axes[1] for x1, x2 in axes[0]]
+
+
+def roi_windows(polygons, shape, size, overlap=0.2, pad=0.25):
+    """
+    Computes crop windows covering regions of interest, for inference on the regions only.
+
+    Each polygon bounding box is enlarged by `pad` of its size per side so objects overhanging the polygon are not
+    truncated, boxes are merged while their union is no larger than their summed areas, and merged regions larger
+    than `size` are tiled with `tile_windows()`.
+
+    Args:
+        polygons (List[np.ndarray]): Polygons of shape (n, 2) in pixels.
+        shape (tuple): Image (h, w) the windows are clipped to.
+        size (int): Maximum window width and height.
+        overlap (float): Overlap between tiles of large regions as a fraction of `size`.
+        pad (float): Padding added to each side of a polygon bounding box as a fraction of its width and height.
+
+    Returns:
+        (List[tuple]): Windows (x1, y1, x2, y2) in pixels.
+    """
+    h, w = shape[:2]
+    boxes = []
+    for p in polygons:
+        (x1, y1), (x2, y2) = p.min(0), p.max(0)
+        dx, dy = (x2 - x1) * pad, (y2 - y1) * pad
+        x1, y1, x2, y2 = max(int(x1 - dx), 0), max(int(y1 - dy), 0), min(int(x2 + dx) + 1, w), min(int(y2 + dy) + 1, h)
+        if x2 > x1 and y2 > y1:
+            boxes.append((x1, y1, x2, y2))
+
+    def area(b):
+        return (b[2] - b[0]) * (b[3] - b[1])
+
+    merged = True
+    while merged:  # greedily merge boxes while the union wastes no area
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                u = min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+                if area(u) <= area(a) + area(b):
+                    boxes[i], merged = u, True
+                    del boxes[j]
+                    break
+            if merged:
+                break
+    return [t for b in boxes for t in tile_windows(b, size, overlap)]
+
+
+def fuse_boxes(boxes, cut, thres=0.5, agnostic=False):
+    """
+    Fuses boxes split by crop edges with greedy non-maximum merging, for tiled inference.
+
+    Boxes are visited by descending confidence and absorb the remaining boxes of their class that cover more than
+    `thres` of the smaller box area, when either box was cut by a crop edge. A box grows to the union of the boxes it
+    absorbs.
+
+    Args:
+        boxes (torch.Tensor): Boxes of shape (n, 6) as (x1, y1, x2, y2, conf, cls).
+        cut (torch.Tensor): Boolean tensor of shape (n, ) marking boxes that touch a crop edge inside the image.
+        thres (float): Intersection over smaller area above which boxes are fused.
+        agnostic (bool): Fuse boxes regardless of their class.
+
+    Returns:
+        (torch.Tensor): Fused boxes of shape (m, 6), sorted by descending confidence.
+    """
+    order = boxes[:, 4].argsort(descending=True)
+    boxes, cut = boxes[order].clone(), cut[order]
+    if not cut.any():
+        return boxes
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    inter = (torch.min(boxes[:, None, 2:4], boxes[:, 2:4]) - torch.max(boxes[:, None, :2], boxes[:, :2])).clamp(0)
+    match = inter.prod(2) > thres * torch.min(area[:, None], area)  # intersection over smaller area
+    match &= (cut[:, None] | cut).triu(1)  # involves a cut box, pairs (i, j) with j after i
+    if not agnostic:
+        match &= boxes[:, None, 5] == boxes[:, 5]
+    keep = torch.ones(len(boxes), dtype=torch.bool, device=boxes.device)
+    for i in match.any(1).nonzero().squeeze(1).tolist():
+        j = match[i] & keep
+        if keep[i] and j.any():
+            boxes[i, :2] = torch.min(boxes[i, :2], boxes[j, :2].min(0)[0])
+            boxes[i, 2:4] = torch.max(boxes[i, 2:4], boxes[j, 2:4].max(0)[0])
+            keep &= ~j
+    return boxes[keep]
+
+
 def xyxy2xywh(x):
     """
     Convert bounding box coordinates from (x1, y1, x2, y2) format to (x, y, width, height) format where (x1, y1) is the
@@ -627,6 +785,28 @@ def resample_segments(segments, n=1000):
     return segments
 
 
+def inside_polygons(points, starts, ends, offsets=(0,)):
+    """
+    Return which polygons contain each point by the even-odd rule, for all points and polygons at once.
+
+    Args:
+        points (np.ndarray): Points (x, y) of shape (n, 2).
+        starts (np.ndarray): Start points of the edges of all polygons, concatenated, shape (e, 2).
+        ends (np.ndarray): End points of the same edges, i.e. the rolled polygon points, shape (e, 2).
+        offsets (list | np.ndarray): Index of the first edge of every polygon, a single polygon by default.
+
+    Returns:
+        (np.ndarray): Boolean array of shape (polygons, n).
+    """
+    (x1, y1), (x2, y2) = starts.T[..., None], ends.T[..., None]
+    px, py = points[None, :, 0], points[None, :, 1]
+    spans = (y1 > py) != (y2 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+    crossings = np.add.reduceat((spans & (px < x)).astype(np.int32), offsets, axis=0)
+    return (crossings % 2).astype(bool)
+
+
 def crop_mask(masks, boxes):
     """
     It takes a mask and a bounding box, and returns a mask that is cropped to the bounding box.